@@ -0,0 +1,132 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .fieldsets import get_fieldset_params
+
+
+class ConditionalGetMixin:
+    """
+    Adds ``ETag``/``Last-Modified`` validators to ``list`` and ``retrieve``.
+
+    Validators are computed from aggregates rather than from the serialized
+    payload: a collection is fingerprinted by its row count and the latest
+    ``last_modified_field``, a single object by that field alone. When the
+    client's ``If-None-Match`` or ``If-Modified-Since`` still holds, a
+    ``304 Not Modified`` is returned before the serializer runs.
+
+    Every other table the representation reads is listed in
+    ``fingerprint_models``; relations pulled in with ``?expand=`` are added
+    to it. Those tables are fingerprinted whole by their row count and
+    latest ``last_modified_field``, all in one query.
+
+    ``Last-Modified`` is only sent for an object whose representation reads
+    no other table. A deletion never moves a timestamp forward, so for a
+    collection, or for an object with related rows, only the ``ETag`` can
+    tell that something changed.
+    """
+    last_modified_field = 'updated_at'
+    fingerprint_models = ()
+
+    def get_fingerprint_models(self):
+        """The models besides the view's own whose rows the response shows."""
+        models = list(self.fingerprint_models)
+        opts = self.queryset.model._meta
+        for name in get_fieldset_params(self.request)[1]:
+            try:
+                related_model = opts.get_field(name).related_model
+            except FieldDoesNotExist:
+                continue
+            if related_model is not None and related_model not in models:
+                models.append(related_model)
+        return models
+
+    def get_tables_fingerprint(self, models, using):
+        """Return the row count and latest ``last_modified_field`` of each table."""
+        if not models:
+            return []
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        columns = []
+        for model in models:
+            table = quote(model._meta.db_table)
+            columns.append(f"(SELECT COUNT(*) FROM {table})")
+            try:
+                column = quote(model._meta.get_field(self.last_modified_field).column)
+            except FieldDoesNotExist:
+                continue
+            columns.append(f"(SELECT MAX({column}) FROM {table})")
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {', '.join(columns)}")
+            return list(cursor.fetchone())
+
+    def get_collection_fingerprint(self, queryset):
+        """Return ``(parts, last_modified)`` for the filtered collection."""
+        aggregate = queryset.order_by().aggregate(
+            count=Count('pk'), last_modified=Max(self.last_modified_field)
+        )
+        parts = [aggregate['count'], aggregate['last_modified']]
+        parts.extend(self.get_tables_fingerprint(self.get_fingerprint_models(), queryset.db))
+        return parts, None
+
+    def get_object_fingerprint(self, queryset, lookup):
+        """Return ``(parts, last_modified)`` for one object, or ``None`` if missing."""
+        last_modified = queryset.filter(**lookup).values_list(self.last_modified_field, flat=True)[:1]
+        if not last_modified:
+            return None
+        models = self.get_fingerprint_models()
+        if not models:
+            return [lookup, last_modified[0]], last_modified[0]
+        return [lookup, last_modified[0], *self.get_tables_fingerprint(models, queryset.db)], None
+
+    def make_etag(self, request, parts):
+        # The path carries the query string (cursor, page size, filters) and
+        # the media type distinguishes JSON from the browsable API.
+        source = repr((parts, request.get_full_path(), getattr(request, 'accepted_media_type', '')))
+        return '"%s"' % hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def conditional_response(self, request, fingerprint):
+        parts, last_modified = fingerprint
+        self.validators = {'ETag': self.make_etag(request, parts), 'Cache-Control': 'no-cache'}
+        if last_modified is not None:
+            self.validators['Last-Modified'] = http_date(last_modified.timestamp())
+
+        unchanged = HttpResponse()
+        for header, value in self.validators.items():
+            unchanged[header] = value
+        response = get_conditional_response(
+            request,
+            etag=self.validators['ETag'],
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+            response=unchanged,
+        )
+        return None if response is unchanged else response
+
+    def with_validators(self, response):
+        if 200 <= response.status_code < 300:
+            for header, value in self.validators.items():
+                response[header] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        response = self.conditional_response(request, self.get_collection_fingerprint(queryset))
+        if response is not None:
+            return response
+        return self.with_validators(super().list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        fingerprint = self.get_object_fingerprint(self.filter_queryset(self.get_queryset()), lookup)
+        if fingerprint is None:
+            return super().retrieve(request, *args, **kwargs)
+        response = self.conditional_response(request, fingerprint)
+        if response is not None:
+            return response
+        return self.with_validators(super().retrieve(request, *args, **kwargs))
@@ -0,0 +1,164 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def get_fieldset_params(request):
+    """Return the ``(fields, expand)`` name lists of a safe request."""
+    if request is None or request.method not in SAFE_METHODS:
+        return [], []
+    return parse_names(request.query_params.get('fields')), parse_names(request.query_params.get('expand'))
+
+
+def related_paths(serializer, prefix):
+    """
+    Return the ``(select_related, prefetch_related)`` paths, under
+    ``prefix``, of the relations a nested ``serializer`` reads for each row.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    opts = serializer.Meta.model._meta
+    joined, prefetched = set(), set()
+    for field in serializer.fields.values():
+        relation, _, attribute = field.source.partition('.')
+        try:
+            model_field = opts.get_field(relation)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+        path = f'{prefix}__{relation}'
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetched.add(path)
+        elif attribute or isinstance(field, serializers.BaseSerializer):
+            joined.add(path)
+    return joined, prefetched
+
+
+class FieldsetModelSerializer(serializers.ModelSerializer):
+    """
+    A ModelSerializer that honours ``?fields=`` and ``?expand=`` on reads.
+
+    ``fields`` keeps only the listed fields. ``expand`` replaces a relation's
+    primary key with the serializer named for it in ``Meta.expandable_fields``,
+    given as a class or a dotted path.
+    Both apply only to the serializer the view builds for the request;
+    expanded and nested serializers are rendered whole.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_request_root():
+            return fields
+        requested, expand = get_fieldset_params(self._context.get('request'))
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        unknown = [name for name in expand if name not in expandable]
+        if unknown:
+            raise serializers.ValidationError({'expand': f"Cannot expand: {', '.join(unknown)}."})
+        for name in expand:
+            serializer_class = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            model_field = self.Meta.model._meta.get_field(name)
+            many = model_field.many_to_many or model_field.one_to_many
+            fields[name] = serializer_class(many=many, read_only=True)
+
+        if requested:
+            unknown = [name for name in requested if name not in fields]
+            if unknown:
+                raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}."})
+            fields = {name: field for name, field in fields.items() if name in requested or name in expand}
+        return fields
+
+    def _is_request_root(self):
+        if 'request' not in getattr(self, '_context', {}):
+            return False
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+class FieldsetViewMixin:
+    """
+    Narrows the queryset of reads to what ``?fields=``/``?expand=`` need.
+
+    Only the columns behind the rendered fields (plus the primary key and
+    the ordering used by the paginator) are selected, forward relations are
+    joined and many-valued ones prefetched, each in one query for the whole
+    page. The relations an expanded serializer reads itself are loaded the
+    same way. A field whose columns cannot be worked out, such as a
+    ``SerializerMethodField``, leaves the columns alone.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested, expand = get_fieldset_params(self.request)
+        if not requested and not expand:
+            return queryset
+        serializer = self.get_serializer()
+        if not isinstance(serializer, FieldsetModelSerializer):
+            return queryset
+        return self.narrow_queryset(queryset, serializer.fields)
+
+    def narrow_queryset(self, queryset, fields):
+        opts = queryset.model._meta
+        columns = {opts.pk.name}
+        for name in getattr(self, 'ordering', None) or opts.ordering:
+            columns.add(name.lstrip('-'))
+        joined, prefetched, attributes = set(), set(), set()
+        # Cleared by a field whose columns cannot be worked out; relations
+        # are still loaded in bulk, but every column is selected.
+        narrow = True
+
+        for field in fields.values():
+            if field.source == '*':
+                narrow = False
+                continue
+            relation, _, attribute = field.source.partition('.')
+            try:
+                model_field = opts.get_field(relation)
+            except FieldDoesNotExist:
+                narrow = False
+                continue
+            if model_field.many_to_many or model_field.one_to_many:
+                prefetched.add(relation)
+                if isinstance(field, serializers.BaseSerializer):
+                    prefetched.update(*related_paths(field, relation))
+            elif model_field.one_to_one and not model_field.concrete:
+                narrow = False
+            elif isinstance(field, serializers.BaseSerializer):
+                columns.add(relation)
+                joined.add(relation)
+                nested_joined, nested_prefetched = related_paths(field, relation)
+                joined.update(nested_joined)
+                prefetched.update(nested_prefetched)
+            elif '.' in attribute:
+                narrow = False
+            elif attribute:
+                columns.add(relation)
+                attributes.add((relation, attribute))
+            else:
+                columns.add(relation)
+
+        expanded = set(joined)
+        for relation, attribute in attributes:
+            # Expanded relations are loaded whole; others only for the
+            # attributes being read.
+            joined.add(relation)
+            if relation not in expanded:
+                columns.add(f'{relation}__{attribute}')
+
+        if narrow:
+            queryset = queryset.select_related(None).prefetch_related(None)
+        if joined:
+            queryset = queryset.select_related(*joined)
+        if prefetched:
+            queryset = queryset.prefetch_related(*prefetched)
+        return queryset.only(*columns) if narrow else queryset
@@ -0,0 +1,153 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a composite keyset such as
+    ``(-published_at, -created_at, id)``.
+
+    DRF's ``CursorPagination`` only keys on the first ordering field and falls
+    back to an offset for ties, and it cannot page over nullable columns.
+    This class stores the full ordering tuple of the boundary row in the
+    cursor and filters with ``(a, b, c) > (x, y, z)`` style predicates, so a
+    deep page costs the same as the first one and no ``COUNT(*)`` is run.
+
+    The ordering is taken from the view's ``ordering`` attribute, falling
+    back to the model's ``Meta.ordering``; the primary key is appended as a
+    tie-breaker. NULLs sort last in forward order.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.keys = self.get_keys(queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if self.cursor is not None:
+            boundary = self.decode_position(self.cursor.position)
+            after = self.get_after_filter(boundary, reverse)
+            if after is None:
+                queryset = queryset.none()
+            else:
+                queryset = queryset.filter(after)
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', None) or queryset.model._meta.ordering or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        pk_name = queryset.model._meta.pk.name
+        ordering = [
+            name.replace('pk', pk_name) if name.lstrip('-') == 'pk' else name
+            for name in ordering
+        ]
+        if not any(name.lstrip('-') == pk_name for name in ordering):
+            ordering.append(pk_name)
+        return tuple(ordering)
+
+    def get_keys(self, queryset, view):
+        """Return ``(field, descending)`` pairs for the ordering tuple."""
+        self.ordering = self.get_ordering(self.request, queryset, view)
+        opts = queryset.model._meta
+        return [
+            (opts.get_field(name.lstrip('-')), name.startswith('-'))
+            for name in self.ordering
+        ]
+
+    def get_order_by(self, reverse):
+        order_by = []
+        for field, descending in self.keys:
+            if reverse:
+                descending = not descending
+            # NULLs sort last going forward and therefore first in reverse.
+            nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+            if not field.null:
+                nulls = {}
+            expression = F(field.attname)
+            order_by.append(expression.desc(**nulls) if descending else expression.asc(**nulls))
+        return order_by
+
+    def get_after_filter(self, boundary, reverse):
+        """
+        Build the predicate selecting rows strictly after ``boundary``.
+
+        Returns ``None`` when no row can follow the boundary.
+        """
+        terms = []
+        equal = Q()
+        for (field, descending), value in zip(self.keys, boundary):
+            if reverse:
+                descending = not descending
+            nulls_last = not reverse
+            name = field.attname
+            if value is None:
+                step = None if nulls_last else Q(**{f'{name}__isnull': False})
+            else:
+                step = Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+                if field.null and nulls_last:
+                    step |= Q(**{f'{name}__isnull': True})
+            if step is not None:
+                terms.append(equal & step)
+            if value is None:
+                equal &= Q(**{f'{name}__isnull': True})
+            else:
+                equal &= Q(**{name: value})
+        if not terms:
+            return None
+        return reduce(or_, terms)
+
+    def encode_position(self, instance):
+        values = []
+        for field, _ in self.keys:
+            value = getattr(instance, field.attname)
+            values.append(None if value is None else field.value_to_string(instance))
+        return json.dumps(values, separators=(',', ':'))
+
+    def decode_position(self, position):
+        try:
+            values = json.loads(position)
+            if len(values) != len(self.keys):
+                raise ValueError
+            return [
+                None if value is None else field.to_python(value)
+                for (field, _), value in zip(self.keys, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        cursor = Cursor(offset=0, reverse=False, position=self.encode_position(self.page[-1]))
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        cursor = Cursor(offset=0, reverse=True, position=self.encode_position(self.page[0]))
+        return self.encode_cursor(cursor)
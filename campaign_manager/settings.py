@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "campaign_manager.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -123,9 +124,44 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploaded files (attachments)
+
+MEDIA_URL = "media/"
+
+MEDIA_ROOT = BASE_DIR / "media"
+
+# The process-local lookup and tag index snapshots (content/versioned_cache.py)
+# learn about writes from version counters in the default cache, so it must
+# be shared by every worker process. The file-based cache is shared on one
+# host; use Redis or Memcached when workers run on several hosts.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "var" / "cache",
+    }
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+REST_FRAMEWORK = {
+    "DEFAULT_PAGINATION_CLASS": "campaign_manager.pagination.KeysetPagination",
+    "PAGE_SIZE": 100,
+    # orjson when installed, the stdlib json module otherwise.
+    "DEFAULT_RENDERER_CLASSES": [
+        "campaign_manager.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "campaign_manager.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Responses smaller than this are sent uncompressed.
+COMPRESSION_MIN_SIZE = 1024
+
 N8N_WEBHOOK_URL = "http://localhost:5678/webhook/approve-handler"
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Q
 from unfold.admin import ModelAdmin
 from .models import (
     Campaign,
@@ -11,6 +12,11 @@ from .models import (
     Attachment,
     Comment,
     AutomationLog,
+    OutboxEvent,
+    AutomationLogDailySummary,
+    CampaignStat,
+    Blob,
+    UploadSession,
 )
 
 @admin.register(Campaign)
@@ -40,10 +46,17 @@ class TagAdmin(ModelAdmin):
 
 @admin.register(Post)
 class PostAdmin(ModelAdmin):
-    list_display = ('title', 'campaign', 'platform', 'status', 'scheduled_at', 'published_at')
+    list_display = ('title', 'campaign', 'platform', 'status', 'scheduled_at', 'published_at', 'comment_count')
     list_filter = ('campaign', 'platform', 'status')
     search_fields = ('title', 'campaign__name')
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        from .fulltext import search_posts
+        ids = [hit.post_id for hit in search_posts(search_term, limit=1000)]
+        return queryset.filter(Q(id__in=ids) | Q(campaign__name__icontains=search_term)), False
+
 @admin.register(PostTag)
 class PostTagAdmin(ModelAdmin):
     list_display = ('post', 'tag')
@@ -55,6 +68,18 @@ class AttachmentAdmin(ModelAdmin):
     list_filter = ('type',)
     search_fields = ('post__title',)
 
+@admin.register(Blob)
+class BlobAdmin(ModelAdmin):
+    list_display = ('sha256', 'size', 'file', 'created_at')
+    search_fields = ('sha256',)
+    readonly_fields = ('sha256', 'size', 'file', 'created_at')
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(ModelAdmin):
+    list_display = ('filename', 'post', 'type', 'received', 'size', 'updated_at')
+    list_filter = ('type',)
+    search_fields = ('filename', 'post__title')
+
 @admin.register(Comment)
 class CommentAdmin(ModelAdmin):
     list_display = ('post', 'author', 'created_at')
@@ -64,4 +89,21 @@ class CommentAdmin(ModelAdmin):
 class AutomationLogAdmin(ModelAdmin):
     list_display = ('post', 'action', 'status', 'executed_at')
     list_filter = ('action', 'status')
-    search_fields = ('post__title',)
\ No newline at end of file
+    search_fields = ('post__title',)
+
+@admin.register(AutomationLogDailySummary)
+class AutomationLogDailySummaryAdmin(ModelAdmin):
+    list_display = ('date', 'action', 'status', 'count')
+    list_filter = ('action', 'status')
+    date_hierarchy = 'date'
+
+@admin.register(CampaignStat)
+class CampaignStatAdmin(ModelAdmin):
+    list_display = ('campaign', 'dimension', 'key', 'count')
+    list_filter = ('dimension', 'campaign')
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(ModelAdmin):
+    list_display = ('event', 'status', 'attempts', 'created_at', 'available_at', 'delivered_at')
+    list_filter = ('event', 'status')
+    readonly_fields = ('created_at', 'delivered_at', 'last_error')
@@ -0,0 +1,155 @@
+"""
+Per-campaign post counts kept in the CampaignStat summary table.
+
+Every post contributes one to its campaign's status, platform and post type
+rows, and one to the week (starting Monday) of its ``scheduled_at`` and
+``published_at``. Saving or deleting a post applies the difference between
+its old and new contributions with ``F()`` updates. Bulk writes that skip
+signals (``bulk_create``, ``update()``) call ``record_changes`` themselves;
+``rebuild_campaign_analytics`` recomputes the table when it drifts.
+"""
+import datetime
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Campaign, CampaignStat, Post
+
+FIELDS = ('campaign_id', 'status_id', 'platform_id', 'post_type_id', 'scheduled_at', 'published_at')
+TRACKED_FIELDS = {'campaign', 'status', 'platform', 'post_type', 'scheduled_at', 'published_at'}
+
+
+def week_of(value):
+    """The ISO date of the Monday starting the week of ``value``."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    day = value.date()
+    return (day - datetime.timedelta(days=day.weekday())).isoformat()
+
+
+def row_of(post):
+    return tuple(getattr(post, field) for field in FIELDS)
+
+
+def contributions(row):
+    campaign_id, status_id, platform_id, post_type_id, scheduled_at, published_at = row
+    keys = [
+        (campaign_id, 'status', str(status_id)),
+        (campaign_id, 'platform', str(platform_id)),
+        (campaign_id, 'post_type', str(post_type_id)),
+    ]
+    if scheduled_at is not None:
+        keys.append((campaign_id, 'scheduled_week', week_of(scheduled_at)))
+    if published_at is not None:
+        keys.append((campaign_id, 'published_week', week_of(published_at)))
+    return keys
+
+
+def record_changes(before=(), after=()):
+    """
+    Apply the change from the ``before`` rows to the ``after`` rows.
+
+    Rows are tuples of ``FIELDS``. Only keys whose count actually moves are
+    written, so editing a post's title costs nothing here.
+    """
+    delta = Counter()
+    for row in before:
+        delta.subtract(contributions(row))
+    for row in after:
+        delta.update(contributions(row))
+    changes = sorted((key, count) for key, count in delta.items() if count)
+    if not changes:
+        return
+    with transaction.atomic(savepoint=False):
+        for (campaign_id, dimension, key), count in changes:
+            _add(campaign_id, dimension, key, count)
+
+
+def _add(campaign_id, dimension, key, count):
+    rows = CampaignStat.objects.filter(campaign_id=campaign_id, dimension=dimension, key=key)
+    if rows.update(count=F('count') + count) or count < 0:
+        # A decrement without a row means the table drifted; a rebuild fixes it.
+        return
+    try:
+        with transaction.atomic():
+            CampaignStat.objects.create(campaign_id=campaign_id, dimension=dimension, key=key, count=count)
+    except IntegrityError:
+        # Another writer created the row first.
+        rows.update(count=F('count') + count)
+
+
+def snapshot(posts):
+    """Return the ``FIELDS`` rows of the ``posts`` queryset."""
+    return list(posts.values_list(*FIELDS))
+
+
+def record_bulk_update(before, **changes):
+    """Record an ``update(**changes)`` applied to the posts whose rows were ``before``."""
+    positions = [FIELDS.index(field) for field in changes]
+    after = []
+    for row in before:
+        row = list(row)
+        for position, value in zip(positions, changes.values()):
+            row[position] = value
+        after.append(tuple(row))
+    record_changes(before, after)
+
+
+def rebuild(campaign_ids=None):
+    """Recompute the summary rows of ``campaign_ids`` (default: every campaign)."""
+    posts = Post.objects.order_by()
+    stats = CampaignStat.objects.all()
+    if campaign_ids is not None:
+        posts = posts.filter(campaign_id__in=campaign_ids)
+        stats = stats.filter(campaign_id__in=campaign_ids)
+
+    counts = Counter()
+    for row in posts.values_list(*FIELDS).iterator(chunk_size=5000):
+        counts.update(contributions(row))
+    with transaction.atomic():
+        stats.delete()
+        CampaignStat.objects.bulk_create(
+            [
+                CampaignStat(campaign_id=campaign_id, dimension=dimension, key=key, count=count)
+                for (campaign_id, dimension, key), count in counts.items()
+            ],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+def campaign_summary(campaign_id):
+    """
+    Return the analytics of one campaign from the summary table, or ``None``
+    if the campaign does not exist.
+    """
+    summary = defaultdict(dict)
+    for dimension, key, count in CampaignStat.objects.filter(
+        campaign_id=campaign_id, count__gt=0
+    ).values_list('dimension', 'key', 'count'):
+        summary[dimension][key] = count
+    if not summary and not Campaign.objects.filter(pk=campaign_id).exists():
+        return None
+    return {dimension: dict(sorted(summary[dimension].items())) for dimension, _ in CampaignStat.DIMENSION_CHOICES}
+
+
+def post_pre_save(sender, instance, update_fields=None, **kwargs):
+    instance._analytics_before = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not TRACKED_FIELDS.intersection(update_fields):
+        return
+    instance._analytics_before = Post.objects.filter(pk=instance.pk).values_list(*FIELDS).first()
+
+
+def post_saved(sender, instance, created, **kwargs):
+    before = getattr(instance, '_analytics_before', None)
+    if not created and before is None:
+        return
+    record_changes([before] if before else [], [row_of(instance)])
+
+
+def post_deleted(sender, instance, **kwargs):
+    record_changes([row_of(instance)], [])
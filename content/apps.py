@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class ContentConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "content"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+        from . import analytics, comments, fulltext, lookups, tag_index
+        from .models import Campaign, Comment, Platform, Post, PostStatus, PostTag, PostType, Tag
+
+        post_save.connect(fulltext.post_saved, sender=Post, dispatch_uid="content_post_fulltext_saved")
+        post_delete.connect(fulltext.post_deleted, sender=Post, dispatch_uid="content_post_fulltext_deleted")
+        post_migrate.connect(fulltext.repair_schema, sender=self, dispatch_uid="content_post_fulltext_repair")
+        pre_save.connect(analytics.post_pre_save, sender=Post, dispatch_uid="content_post_analytics_pre_save")
+        post_save.connect(analytics.post_saved, sender=Post, dispatch_uid="content_post_analytics_saved")
+        post_delete.connect(analytics.post_deleted, sender=Post, dispatch_uid="content_post_analytics_deleted")
+        post_save.connect(tag_index.invalidate, sender=Tag, dispatch_uid="content_Tag_tag_index_saved")
+        post_delete.connect(tag_index.invalidate, sender=Tag, dispatch_uid="content_Tag_tag_index_deleted")
+        post_save.connect(tag_index.usage_changed, sender=PostTag, dispatch_uid="content_PostTag_tag_index_saved")
+        post_delete.connect(tag_index.usage_changed, sender=PostTag, dispatch_uid="content_PostTag_tag_index_deleted")
+        post_save.connect(comments.comment_saved, sender=Comment, dispatch_uid="content_comment_count_saved")
+        post_delete.connect(comments.comment_deleted, sender=Comment, dispatch_uid="content_comment_count_deleted")
+        for model in (Campaign, Platform, PostType, PostStatus):
+            post_save.connect(lookups.invalidate, sender=model, dispatch_uid=f"content_{model.__name__}_lookups_saved")
+            post_delete.connect(lookups.invalidate, sender=model, dispatch_uid=f"content_{model.__name__}_lookups_deleted")
@@ -0,0 +1,42 @@
+"""
+Keeps ``Post.comment_count`` current.
+
+Counts move by one per saved or deleted comment with an ``F()`` update, so
+concurrent writers never overwrite each other. ``updated_at`` is bumped as
+well, because the count is part of the post's representation and its ETag.
+``bulk_create`` and raw SQL bypass the signals; call ``recount_comments()``
+after those.
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Comment, Post
+
+
+def adjust_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta, updated_at=timezone.now()
+    )
+
+
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_comment_count(instance.post_id, 1)
+
+
+def comment_deleted(sender, instance, **kwargs):
+    adjust_comment_count(instance.post_id, -1)
+
+
+def recount_comments(posts=None):
+    """Recompute ``comment_count`` from the Comment table for ``posts`` (default: all)."""
+    counts = (
+        Comment.objects.filter(post=OuterRef('pk'))
+        .order_by()
+        .values('post')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    posts = Post.objects.all() if posts is None else posts
+    return posts.update(comment_count=Coalesce(Subquery(counts), 0), updated_at=timezone.now())
@@ -0,0 +1,283 @@
+"""
+Full-text search over Post title and body.
+
+On SQLite with FTS5 the posts are mirrored into an FTS5 table kept in sync
+by triggers on ``content_post``, so every write path (``save()``,
+``bulk_create()``, ``update()``, raw SQL) is indexed. The table and triggers
+are created by migration ``0013_post_fts``. Elsewhere an in-process inverted
+index with BM25 ranking is used, kept current by signals and by catching up
+on posts whose ``updated_at`` moved since the last query.
+
+Snippets are HTML: the post text is escaped and matches are wrapped in
+``<mark>``.
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import NamedTuple
+
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils.html import escape
+
+from .models import Post
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+TITLE_WEIGHT = 5
+SNIPPET_WORDS = 16
+# Private-use characters FTS5 puts around matches in place of the markup,
+# so the snippet text can be escaped before the markup goes in.
+MARK_START, MARK_END = '\ue000', '\ue001'
+
+
+class SearchHit(NamedTuple):
+    post_id: int
+    rank: float
+    snippet: str
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+class SQLiteFTSIndex:
+    table = 'content_post_fts'
+    triggers = {
+        'content_post_fts_ai': """
+            CREATE TRIGGER IF NOT EXISTS content_post_fts_ai AFTER INSERT ON content_post BEGIN
+                INSERT INTO content_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+            END
+        """,
+        'content_post_fts_ad': """
+            CREATE TRIGGER IF NOT EXISTS content_post_fts_ad AFTER DELETE ON content_post BEGIN
+                DELETE FROM content_post_fts WHERE rowid = old.id;
+            END
+        """,
+        'content_post_fts_au': """
+            CREATE TRIGGER IF NOT EXISTS content_post_fts_au AFTER UPDATE OF title, body ON content_post BEGIN
+                DELETE FROM content_post_fts WHERE rowid = old.id;
+                INSERT INTO content_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+            END
+        """,
+    }
+
+    @classmethod
+    def available(cls, connection=connection):
+        """Whether the FTS5 table exists; see migration ``0013_post_fts``."""
+        if connection.vendor != 'sqlite':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [cls.table])
+            return cursor.fetchone() is not None
+
+    @classmethod
+    def repair_triggers(cls, connection=connection):
+        """
+        Recreate missing triggers and rebuild the index if any were missing.
+
+        Django rebuilds ``content_post`` for some migrations, which drops its
+        triggers; this runs after every ``migrate`` so writes made without
+        them are not lost.
+        """
+        if not cls.available(connection):
+            return
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'content_post'"
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            missing = [name for name in cls.triggers if name not in existing]
+            for name in missing:
+                cursor.execute(cls.triggers[name])
+            if missing:
+                cls._rebuild(cursor)
+
+    def rebuild(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._rebuild(cursor)
+
+    @classmethod
+    def _rebuild(cls, cursor):
+        cursor.execute(f"DELETE FROM {cls.table}")
+        cursor.execute(
+            f"INSERT INTO {cls.table}(rowid, title, body) SELECT id, title, body FROM content_post"
+        )
+
+    @staticmethod
+    def match_expression(query):
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        # Every term must match; the last one as a prefix for search-as-you-type.
+        return ' '.join(f'"{token}"' for token in tokens) + '*'
+
+    def search(self, query, limit, offset):
+        match = self.match_expression(query)
+        if match is None:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, bm25({self.table}, %s, 1.0) AS score, "
+                f"snippet({self.table}, -1, %s, %s, '…', %s) "
+                f"FROM {self.table} WHERE {self.table} MATCH %s "
+                "ORDER BY score LIMIT %s OFFSET %s",
+                [float(TITLE_WEIGHT), MARK_START, MARK_END, SNIPPET_WORDS, match, limit, offset],
+            )
+            # bm25() is lower-is-better; flip it so a higher rank is better.
+            return [
+                SearchHit(post_id, -score, mark_up(snippet)) for post_id, score, snippet in cursor.fetchall()
+            ]
+
+
+def mark_up(snippet):
+    """Escape an FTS5 snippet and turn its match delimiters into ``<mark>``."""
+    return escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+class InMemoryIndex:
+    """Inverted index with BM25 scoring for databases without FTS5."""
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.lengths = {}
+        self.doc_terms = {}
+        self.vocabulary = []
+        self.synced_at = None
+        self.lock = threading.RLock()
+
+    def add(self, post_id, title, body):
+        frequencies = Counter(tokenize(body))
+        for token in tokenize(title):
+            frequencies[token] += TITLE_WEIGHT
+        with self.lock:
+            self.remove(post_id)
+            for term, tf in frequencies.items():
+                if term not in self.postings:
+                    bisect.insort(self.vocabulary, term)
+                self.postings[term][post_id] = tf
+            self.lengths[post_id] = sum(frequencies.values())
+            self.doc_terms[post_id] = list(frequencies)
+
+    def remove(self, post_id):
+        with self.lock:
+            for term in self.doc_terms.pop(post_id, ()):
+                docs = self.postings[term]
+                docs.pop(post_id, None)
+                if not docs:
+                    del self.postings[term]
+                    index = bisect.bisect_left(self.vocabulary, term)
+                    del self.vocabulary[index]
+            self.lengths.pop(post_id, None)
+
+    def catch_up(self):
+        """Index posts created or changed since the last call."""
+        posts = Post.objects.only('id', 'title', 'body', 'updated_at')
+        if self.synced_at is not None:
+            posts = posts.filter(updated_at__gte=self.synced_at)
+        latest = posts.aggregate(latest=Max('updated_at'))['latest']
+        for post in posts.iterator(chunk_size=2000):
+            self.add(post.id, post.title, post.body)
+        if latest is not None:
+            self.synced_at = latest
+
+    def expand(self, token, prefix):
+        if not prefix:
+            return [token] if token in self.postings else []
+        start = bisect.bisect_left(self.vocabulary, token)
+        end = bisect.bisect_left(self.vocabulary, token + '\uffff')
+        return self.vocabulary[start:end]
+
+    def search(self, query, limit, offset):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        self.catch_up()
+        with self.lock:
+            groups = [
+                self.expand(token, prefix=i == len(tokens) - 1) for i, token in enumerate(tokens)
+            ]
+            if not all(groups):
+                return []
+            candidates = None
+            for group in sorted(groups, key=lambda g: sum(len(self.postings[t]) for t in g)):
+                docs = set().union(*(self.postings[term].keys() for term in group))
+                candidates = docs if candidates is None else candidates & docs
+                if not candidates:
+                    return []
+
+            total = len(self.lengths)
+            average = sum(self.lengths.values()) / total
+            scores = defaultdict(float)
+            for group in groups:
+                for term in group:
+                    docs = self.postings[term]
+                    idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for post_id in candidates.intersection(docs):
+                        tf = docs[post_id]
+                        norm = self.k1 * (1 - self.b + self.b * self.lengths[post_id] / average)
+                        scores[post_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            ranked = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])[offset:]
+
+        bodies = dict(Post.objects.filter(id__in=[post_id for post_id, _ in ranked]).values_list('id', 'body'))
+        terms = {term for group in groups for term in group}
+        return [
+            SearchHit(post_id, score, make_snippet(bodies[post_id], terms))
+            for post_id, score in ranked
+            if post_id in bodies
+        ]
+
+
+def make_snippet(text, terms):
+    """Return an escaped window of ``text`` around the first matching term, with matches marked."""
+    words = text.split()
+    first = next(
+        (i for i, word in enumerate(words) if any(t in terms for t in tokenize(word))), 0
+    )
+    start = max(0, first - SNIPPET_WORDS // 2)
+    window = words[start:start + SNIPPET_WORDS]
+    marked = [
+        f'<mark>{escape(word)}</mark>' if any(t in terms for t in tokenize(word)) else escape(word)
+        for word in window
+    ]
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if start + SNIPPET_WORDS < len(words) else ''
+    return prefix + ' '.join(marked) + suffix
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SQLiteFTSIndex() if SQLiteFTSIndex.available() else InMemoryIndex()
+        return _index
+
+
+def search_posts(query, limit=20, offset=0):
+    """Return ranked SearchHits for ``query``, best first."""
+    return get_index().search(query, limit, offset)
+
+
+def repair_schema(sender, using, **kwargs):
+    """``post_migrate`` receiver: put back FTS triggers a table rebuild dropped."""
+    SQLiteFTSIndex.repair_triggers(connections[using])
+
+
+def post_saved(sender, instance, **kwargs):
+    index = _index
+    if isinstance(index, InMemoryIndex) and index.synced_at is not None:
+        index.add(instance.id, instance.title, instance.body)
+
+
+def post_deleted(sender, instance, **kwargs):
+    index = _index
+    if isinstance(index, InMemoryIndex):
+        index.remove(instance.id)
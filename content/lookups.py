@@ -0,0 +1,82 @@
+"""
+Process-local cache of the small lookup tables: Campaign, Platform, PostType
+and PostStatus.
+
+Each process loads the tables whole and resolves ids and names from memory.
+The snapshot is a ``VersionedSnapshot``: the save and delete signals of
+these models bump its version, and it also expires after
+``LOOKUP_CACHE_TTL`` seconds. An id or name missing from the snapshot is
+looked up in the database before it is reported as unknown, so rows
+created by another process are found before the snapshot catches up.
+
+Cached instances are shared between threads and must not be modified.
+"""
+from django.conf import settings
+
+from .models import Campaign, Platform, PostStatus, PostType
+from .versioned_cache import VersionedSnapshot, bump_on_commit
+
+VERSION_KEY = 'content:lookups:version'
+MODELS = (Campaign, Platform, PostType, PostStatus)
+
+
+class LookupTables:
+    def __init__(self):
+        self.rows = {}
+        self.by_id = {}
+        self.by_name = {}
+        for model in MODELS:
+            rows = list(model.objects.all())
+            self.rows[model] = rows
+            self.by_id[model] = {row.pk: row for row in rows}
+            # Names are not unique everywhere; the oldest row wins, as it
+            # would for a query ordered by id.
+            by_name = {}
+            for row in sorted(rows, key=lambda row: row.pk):
+                by_name.setdefault(row.name, row)
+            self.by_name[model] = by_name
+
+
+_tables = VersionedSnapshot(
+    LookupTables,
+    keys={VERSION_KEY: 0},
+    ttl=lambda: getattr(settings, 'LOOKUP_CACHE_TTL', 300),
+)
+
+
+def get_tables():
+    """Return the current snapshot, reloading it if the version moved or it expired."""
+    return _tables.get()
+
+
+def get(model, pk):
+    """The ``model`` row with primary key ``pk``, or ``None``."""
+    row = get_tables().by_id[model].get(pk)
+    if row is None:
+        row = model.objects.filter(pk=pk).first()
+    return row
+
+
+def get_by_name(model, name):
+    row = get_tables().by_name[model].get(name)
+    if row is None:
+        row = model.objects.filter(name=name).order_by('pk').first()
+    return row
+
+
+def all_rows(model):
+    """Every ``model`` row, in the model's default ordering."""
+    return get_tables().rows[model]
+
+
+def get_or_create(model, name, defaults=None):
+    """Like ``model.objects.get_or_create(name=name)``, without a query when the row is cached."""
+    row = get_tables().by_name[model].get(name)
+    if row is not None:
+        return row, False
+    return model.objects.get_or_create(name=name, defaults=defaults)
+
+
+def invalidate(*args, **kwargs):
+    """Signal receiver: bump the version so every process reloads the tables."""
+    bump_on_commit(VERSION_KEY)
@@ -0,0 +1,235 @@
+import datetime
+import io
+import json
+import platform
+import statistics
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import URLResolver, get_resolver
+
+# Latency is compared against the baseline relatively; queries per request
+# must not grow at all.
+LATENCY_METRIC = 'p95_ms'
+
+
+def router_endpoints():
+    """
+    Yield ``(name, url, model, lookup_field)`` for the list and detail routes
+    of every DRF router included in the project's URLconf.
+    """
+    for pattern in get_resolver().url_patterns:
+        if not isinstance(pattern, URLResolver):
+            continue
+        router = getattr(pattern.urlconf_module, 'router', None)
+        if router is None:
+            continue
+        prefix = '/' + str(pattern.pattern)
+        app = prefix.strip('/').split('/')[-1]
+        for route, viewset, basename in router.registry:
+            model = viewset.queryset.model
+            lookup_field = getattr(viewset, 'lookup_field', 'pk')
+            yield f'{app}:{route}-list', f'{prefix}{route}/', None, None
+            yield f'{app}:{route}-detail', f'{prefix}{route}/{{}}/', model, lookup_field
+
+
+def summarize(samples, queries, elapsed):
+    """Return the latency percentiles (ms), throughput and queries of a run."""
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {
+        'requests': len(samples),
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'rps': round(len(samples) / elapsed, 1),
+        'queries': round(queries / len(samples), 2),
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Return a message for each endpoint whose p95 latency grew by more than
+    ``threshold`` (a fraction) or whose queries per request grew at all.
+    Endpoints missing from either side are ignored.
+    """
+    regressions = []
+    for name, current in sorted(results['endpoints'].items()):
+        before = baseline.get('endpoints', {}).get(name)
+        if before is None:
+            continue
+        if before[LATENCY_METRIC] and current[LATENCY_METRIC] > before[LATENCY_METRIC] * (1 + threshold):
+            regressions.append(
+                f"{name}: {LATENCY_METRIC} {before[LATENCY_METRIC]:.2f} -> {current[LATENCY_METRIC]:.2f} ms"
+            )
+        if current['queries'] > before['queries']:
+            regressions.append(f"{name}: queries {before['queries']:g} -> {current['queries']:g}")
+    return regressions
+
+
+class Command(BaseCommand):
+    """
+    Drives every router endpoint in-process and reports latency and query counts.
+    Usage: python manage.py benchmark_api --posts 5000 --rows 20000 --output bench.json
+           python manage.py benchmark_api --baseline bench.json --threshold 0.25
+    """
+    help = (
+        'Seeds a throwaway database and times the list and detail route of every API router, '
+        'optionally failing on regressions against a saved baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=1000,
+            help='Posts to seed.',
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=5000,
+            help='Change items, discovered content and fetch logs to seed, each.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=1,
+            help='Random seed for the dataset.',
+        )
+        parser.add_argument(
+            '--current-db',
+            action='store_true',
+            help='Benchmark the configured database as it is instead of seeding a test database.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Timed requests per endpoint.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=3,
+            help='Untimed requests per endpoint before timing starts.',
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            help='Only run endpoints whose name contains this text. May be given more than once.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results to this JSON file.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON results of an earlier run to compare against.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Allowed p95 latency growth over the baseline, as a fraction.',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError("--requests must be at least 2.")
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        if options['current_db']:
+            results = self.run(options)
+        else:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                self.seed(options)
+                results = self.run(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+                f.write('\n')
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        if baseline is not None:
+            regressions = find_regressions(results, baseline, options['threshold'])
+            if regressions:
+                for message in regressions:
+                    self.stdout.write(self.style.ERROR(f"  {message}"))
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}."))
+        self.stdout.write(self.style.SUCCESS("API benchmark complete."))
+
+    def seed(self, options):
+        self.stdout.write(f"Seeding {options['posts']} posts and {options['rows']} rows per table...")
+        call_command(
+            'seed_data', '--bulk', '--seed', options['seed'], '--number', options['posts'],
+            '--change-items', options['rows'], '--discovered', options['rows'], '--fetch-logs', options['rows'],
+            stdout=io.StringIO(),
+        )
+
+    def run(self, options):
+        client = Client()
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        endpoints = {}
+        with override_settings(ALLOWED_HOSTS=['testserver']), connection.execute_wrapper(count_queries):
+            for name, url, model, lookup_field in router_endpoints():
+                if options['endpoints'] and not any(text in name for text in options['endpoints']):
+                    continue
+                if model is not None:
+                    lookup = model._default_manager.order_by('pk').values_list(lookup_field, flat=True).first()
+                    if lookup is None:
+                        continue
+                    url = url.format(lookup)
+
+                for _ in range(options['warmup']):
+                    self.get(client, name, url)
+                samples, queries = [], 0
+                started = time.perf_counter()
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    self.get(client, name, url)
+                    samples.append(time.perf_counter() - start)
+                endpoints[name] = summarize(samples, queries, time.perf_counter() - started)
+                self.write_row(name, endpoints[name])
+
+        return {
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'dataset': {
+                'current_db': options['current_db'],
+                'posts': options['posts'],
+                'rows': options['rows'],
+                'seed': options['seed'],
+            },
+            'endpoints': endpoints,
+        }
+
+    def get(self, client, name, url):
+        response = client.get(url, HTTP_ACCEPT='application/json')
+        if response.status_code != 200:
+            raise CommandError(f"{name}: GET {url} returned {response.status_code}.")
+
+    def write_row(self, name, result):
+        self.stdout.write(
+            f"  {name:<40} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms"
+            f"  p99 {result['p99_ms']:8.2f} ms  {result['rps']:8.1f} req/s  {result['queries']:6.2f} queries"
+        )
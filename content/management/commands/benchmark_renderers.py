@@ -0,0 +1,90 @@
+import gzip
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from campaign_manager import renderers
+from campaign_manager.middleware import brotli
+from content.models import Post
+from content.serializers import PostSerializer
+from github.models import ChangeItem
+from github.serializers import ChangeItemSerializer
+from search.models import DiscoveredContent
+from search.serializers import DiscoveredContentSerializer
+
+DATASETS = {
+    'post': (Post.objects.select_related('campaign', 'platform', 'status').prefetch_related('tags'), PostSerializer),
+    'discoveredcontent': (DiscoveredContent.objects.all(), DiscoveredContentSerializer),
+    'changeitem': (ChangeItem.objects.all(), ChangeItemSerializer),
+}
+
+
+class Command(BaseCommand):
+    """
+    Times the JSON renderers and response compression on serializer output.
+    Usage: python manage.py benchmark_renderers --rows 1000 --repeat 20
+    """
+    help = 'Compares the stdlib and orjson renderers, and gzip and brotli, on real serializer output.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dataset',
+            choices=sorted(DATASETS),
+            action='append',
+            help='Dataset to render. May be given more than once; defaults to all.',
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000,
+            help='Number of rows serialized per dataset.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Timed runs per renderer; the median is reported.',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed; FastJSONRenderer uses the stdlib."))
+
+        for name in options['dataset'] or sorted(DATASETS):
+            queryset, serializer_class = DATASETS[name]
+            data = serializer_class(queryset.all()[:options['rows']], many=True).data
+            if not data:
+                self.stdout.write(self.style.WARNING(f"{name}: no rows, run seed_data first."))
+                continue
+
+            self.stdout.write(f"{name}: {len(data)} rows")
+            timings = {}
+            for label, renderer in (('stdlib', JSONRenderer()), ('fast', renderers.FastJSONRenderer())):
+                body, timings[label] = self.measure(lambda: renderer.render(data), options['repeat'])
+                self.stdout.write(f"  render {label:<8} {timings[label] * 1000:9.2f} ms  {len(body):>10} bytes")
+            self.stdout.write(f"  speedup         {timings['stdlib'] / timings['fast']:9.2f}x")
+
+            compressors = [('gzip', lambda: gzip.compress(body, compresslevel=6, mtime=0))]
+            if brotli is not None:
+                compressors.append(('brotli', lambda: brotli.compress(body, quality=5)))
+            for label, compress in compressors:
+                compressed, seconds = self.measure(compress, options['repeat'])
+                self.stdout.write(
+                    f"  {label:<15} {seconds * 1000:9.2f} ms  {len(compressed):>10} bytes"
+                    f"  ({len(compressed) / len(body):.1%})"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Renderer benchmark complete."))
+
+    def measure(self, func, repeat):
+        result = func()  # warm up
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            samples.append(time.perf_counter() - start)
+        return result, statistics.median(samples)
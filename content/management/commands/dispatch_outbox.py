@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+from content.utils import build_webhook_session, dispatch_outbox, outbox_stats
+
+
+class Command(BaseCommand):
+    """
+    Delivers queued n8n webhooks from the outbox.
+    Usage: python manage.py dispatch_outbox [--once] [--batch-size 100]
+    """
+    help = 'Delivers pending outbox events to n8n with retries and exponential backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='The number of events to claim per round.'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=8,
+            help='Give up on an event after this many failed deliveries.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when the outbox has nothing due.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Deliver everything currently due and exit.',
+        )
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'N8N_WEBHOOK_URL', None):
+            self.stdout.write(self.style.WARNING("N8N_WEBHOOK_URL not set in settings.py"))
+            return
+
+        session = build_webhook_session()
+        totals = {'delivered': 0, 'retried': 0, 'failed': 0}
+        try:
+            while True:
+                result = dispatch_outbox(
+                    session,
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts'],
+                )
+                for key, value in result.items():
+                    totals[key] += value
+                if any(result.values()):
+                    stats = outbox_stats()
+                    self.stdout.write(
+                        f"delivered={result['delivered']} retried={result['retried']} "
+                        f"failed={result['failed']} pending={stats['pending']} "
+                        f"lag={stats['lag_seconds']:.1f}s"
+                    )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            session.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Outbox dispatcher stopped: {totals['delivered']} delivered, "
+            f"{totals['retried']} retried, {totals['failed']} failed."
+        ))
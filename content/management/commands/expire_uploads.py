@@ -0,0 +1,27 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from content.uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    """
+    Deletes abandoned chunked uploads and their partial files.
+    Usage: python manage.py expire_uploads --hours 24
+    """
+    help = 'Deletes unfinished upload sessions that have not received a chunk for --hours.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Keep unfinished uploads for this many hours after their last chunk.'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(hours=options['hours'])
+        total = expire_uploads(cutoff)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} abandoned uploads."))
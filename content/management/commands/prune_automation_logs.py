@@ -0,0 +1,37 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from content.utils import rollup_automation_logs
+
+
+class Command(BaseCommand):
+    """
+    Rolls old automation logs up into daily summaries and deletes them.
+    Usage: python manage.py prune_automation_logs --days 90
+    """
+    help = 'Rolls AutomationLog rows older than --days into daily per-action and per-status counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Keep raw logs for this many days.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='The number of rows to roll up and delete per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        cutoff = timezone.make_aware(
+            datetime.datetime.combine(today - datetime.timedelta(days=options['days']), datetime.time.min)
+        )
+        self.stdout.write(f"Rolling up automation logs executed before {cutoff:%Y-%m-%d}...")
+        total = rollup_automation_logs(cutoff, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rolled up and deleted {total} automation logs."))
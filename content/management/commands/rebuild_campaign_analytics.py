@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from content.analytics import rebuild
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the CampaignStat summary table from the posts.
+    Usage: python manage.py rebuild_campaign_analytics [--campaign ID ...]
+    """
+    help = 'Rebuilds per-campaign post counts, repairing drift in the analytics summary table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaign',
+            type=int,
+            action='append',
+            dest='campaigns',
+            help='Only rebuild this campaign. May be given more than once.',
+        )
+
+    def handle(self, *args, **options):
+        rows = rebuild(options['campaigns'])
+        self.stdout.write(self.style.SUCCESS(f"Campaign analytics rebuilt: {rows} summary rows."))
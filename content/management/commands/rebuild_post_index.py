@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from content.fulltext import SQLiteFTSIndex, get_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the full-text index of post titles and bodies.
+    Usage: python manage.py rebuild_post_index
+    """
+    help = 'Rebuilds the SQLite FTS5 index for posts from the content_post table.'
+
+    def handle(self, *args, **options):
+        index = get_index()
+        if not isinstance(index, SQLiteFTSIndex):
+            self.stdout.write(self.style.WARNING(
+                "The FTS5 table does not exist (no FTS5 support, or migrations not applied); "
+                "posts are indexed in memory by each process."
+            ))
+            return
+        index.rebuild()
+        self.stdout.write(self.style.SUCCESS("Post full-text index rebuilt."))
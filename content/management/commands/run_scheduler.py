@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+
+from content.scheduler import PostScheduler
+
+
+class Command(BaseCommand):
+    """
+    Long-running scheduler that hands due posts to n8n for publishing.
+    Usage: python manage.py run_scheduler [--once] [--lease 60]
+    """
+    help = 'Fires posts whose scheduled_at has come due.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lease',
+            type=int,
+            default=60,
+            help='Seconds a claimed post stays reserved for this process.'
+        )
+        parser.add_argument(
+            '--horizon',
+            type=int,
+            default=600,
+            help='How many seconds ahead to keep upcoming posts in memory.'
+        )
+        parser.add_argument(
+            '--refresh',
+            type=int,
+            default=30,
+            help='Seconds between reloads of the upcoming schedule.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='The maximum number of upcoming posts to load per reload.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Fire the posts that are due now and exit.',
+        )
+
+    def handle(self, *args, **options):
+        scheduler = PostScheduler(
+            lease_seconds=options['lease'],
+            horizon_seconds=options['horizon'],
+            refresh_seconds=options['refresh'],
+            batch_size=options['batch_size'],
+        )
+        if options['once']:
+            fired = scheduler.run_once()
+            self.stdout.write(self.style.SUCCESS(f"Fired {fired} due posts."))
+            return
+
+        self.stdout.write(f"Scheduler {scheduler.owner} started.")
+        try:
+            scheduler.run_forever(on_fired=lambda n: self.stdout.write(f"Fired {n} due posts."))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Scheduler stopped."))
@@ -1,5 +1,7 @@
 import random
-from django.core.management.base import BaseCommand
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from faker import Faker
 import datetime
@@ -9,13 +11,20 @@ from django.contrib.auth.models import User
 from content.models import (
     Campaign, Platform, PostType, PostStatus, Tag, Post, Comment, PostTag
 )
+from content import analytics, lookups, seeding, tag_index
+from content.comments import recount_comments
 from learning.models import Topic, Chapter, Lesson
 from github.models import Repository, ChangeItem
+from search.models import (
+    Topic as SearchTopic, TopicQuery, ContentSource, DiscoveredContent, CrawlJob, FetchLog
+)
 
 class Command(BaseCommand):
     """
     Custom command to seed the database with sample data.
     Usage: python manage.py seed_data --number 100 --clean
+           python manage.py seed_data --bulk --seed 42 --workers 4 --number 100000 \
+               --change-items 1000000 --discovered 1000000 --fetch-logs 1000000
     """
     help = 'Seeds the database with a specified number of posts and related data.'
 
@@ -31,12 +40,69 @@ class Command(BaseCommand):
             action='store_true',
             help='Clean the database before seeding.',
         )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed; the same seed produces the same dataset. A random one is picked and printed by default.',
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='High-throughput mode: insert rows with bulk_create in batches.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows generated and inserted per batch in bulk mode.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes generating rows in bulk mode.',
+        )
+        parser.add_argument(
+            '--change-items',
+            type=int,
+            default=0,
+            help='GitHub change items to create in bulk mode.',
+        )
+        parser.add_argument(
+            '--discovered',
+            type=int,
+            default=0,
+            help='Discovered content rows to create in bulk mode.',
+        )
+        parser.add_argument(
+            '--fetch-logs',
+            type=int,
+            default=0,
+            help='Fetch log rows to create in bulk mode.',
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
+        if options['seed'] is None:
+            # Pick a fresh seed and report it, so an unseeded run differs
+            # from the last one but can still be repeated.
+            options['seed'] = random.SystemRandom().randrange(2 ** 32)
+            self.stdout.write(f"Using --seed {options['seed']}")
+        random.seed(options['seed'])
+        Faker.seed(options['seed'])
+        fake = Faker()
+
+        if options['bulk']:
+            if options['batch_size'] < 1 or options['workers'] < 1:
+                raise CommandError("--batch-size and --workers must be at least 1.")
+            return self._seed_bulk(fake, options)
+        if options['change_items'] or options['discovered'] or options['fetch_logs']:
+            raise CommandError("--change-items, --discovered and --fetch-logs require --bulk.")
+        with transaction.atomic():
+            self._seed(fake, options)
+
+    def _seed(self, fake, options):
         number_of_posts = options['number']
         clean_db = options['clean']
-        fake = Faker()
 
         self.stdout.write(self.style.SUCCESS(f"Starting to seed the database with {number_of_posts} posts..."))
 
@@ -90,6 +156,118 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f"Successfully seeded the database with {number_of_posts} posts."))
 
+    def _seed_bulk(self, fake, options):
+        """Seeds with batched bulk inserts, generating rows in worker processes if asked."""
+        if options['clean']:
+            self.stdout.write(self.style.WARNING("Cleaning the database..."))
+            with transaction.atomic():
+                self._clean_search_data()
+                self._clean_database()
+
+        self.stdout.write("Creating base data...")
+        with transaction.atomic():
+            refs = {
+                'users': [user.id for user in self._create_users(fake)],
+                'campaigns': [obj.id for obj in self._create_campaigns(fake)],
+                'platforms': [obj.id for obj in self._create_platforms()],
+                'post_types': [obj.id for obj in self._create_post_types(fake)],
+                'statuses': [obj.id for obj in self._create_post_statuses()],
+                'tags': [obj.id for obj in self._create_tags(fake)],
+                'lessons': [obj.id for obj in self._create_learning_items(fake)],
+                'repositories': [obj.id for obj in self._create_repositories(fake)],
+            }
+            refs.update(self._create_search_base(fake))
+        self.stdout.write(self.style.SUCCESS("Base data created successfully."))
+
+        words = fake.get_words_list()
+        self.executor = ProcessPoolExecutor(options['workers']) if options['workers'] > 1 else None
+        try:
+            self._bulk_insert(
+                'change_items', options['change_items'], refs, words, options, self._insert_change_items,
+                offset=ChangeItem.objects.count(),
+            )
+            refs['change_items'] = list(ChangeItem.objects.order_by('id').values_list('id', flat=True)[:1000])
+            self._bulk_insert('posts', options['number'], refs, words, options, self._insert_posts)
+            self._bulk_insert(
+                'discovered_content', options['discovered'], refs, words, options, self._insert_discovered_content,
+                offset=DiscoveredContent.objects.count(),
+            )
+            self._bulk_insert('fetch_logs', options['fetch_logs'], refs, words, options, self._insert_fetch_logs)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+
+        # bulk_create skips the signals that keep these current.
+        self.stdout.write("Refreshing comment counts and campaign analytics...")
+        recount_comments()
+        analytics.rebuild()
+        lookups.invalidate()
+        tag_index.invalidate()
+        self.stdout.write(self.style.SUCCESS("Bulk seeding complete."))
+
+    def _bulk_insert(self, kind, total, refs, words, options, insert, offset=0):
+        if total <= 0:
+            return
+        self.stdout.write(f"Creating {total} {kind.replace('_', ' ')}...")
+        specs = seeding.chunk_specs(kind, total, options['batch_size'], options['seed'], refs, words, offset)
+        done = 0
+        for spec, chunk in zip(specs, self._generate(specs, options['workers'] * 2)):
+            with transaction.atomic():
+                insert(chunk, options['batch_size'])
+            done += spec.count
+            self.stdout.write(f"  {done}/{total} {kind.replace('_', ' ')} created...")
+
+    def _generate(self, specs, window):
+        """
+        Yields the generated chunks in order, so ids are assigned the same way
+        on every run. At most ``window`` chunks are in flight, so finished
+        chunks do not pile up in memory ahead of the inserts.
+        """
+        if self.executor is None:
+            yield from map(seeding.generate, specs)
+            return
+        pending = deque()
+        for spec in specs:
+            if len(pending) >= window:
+                yield pending.popleft().result()
+            pending.append(self.executor.submit(seeding.generate, spec))
+        while pending:
+            yield pending.popleft().result()
+
+    def _insert_posts(self, chunk, batch_size):
+        posts, post_tags, comments = chunk
+        created = Post.objects.bulk_create([Post(**row) for row in posts], batch_size=batch_size)
+        ids = [post.id for post in created]
+        PostTag.objects.bulk_create(
+            [PostTag(post_id=ids[row['post']], tag_id=row['tag_id']) for row in post_tags],
+            batch_size=batch_size,
+        )
+        Comment.objects.bulk_create(
+            [
+                Comment(post_id=ids[row['post']], author_id=row['author_id'], text=row['text'])
+                for row in comments
+            ],
+            batch_size=batch_size,
+        )
+
+    def _insert_change_items(self, rows, batch_size):
+        ChangeItem.objects.bulk_create([ChangeItem(**row) for row in rows], batch_size=batch_size)
+
+    def _insert_discovered_content(self, rows, batch_size):
+        DiscoveredContent.objects.bulk_create([DiscoveredContent(**row) for row in rows], batch_size=batch_size)
+
+    def _insert_fetch_logs(self, rows, batch_size):
+        FetchLog.objects.bulk_create([FetchLog(**row) for row in rows], batch_size=batch_size)
+
+    def _clean_search_data(self):
+        """Deletes the search app's crawl data."""
+        FetchLog.objects.all().delete()
+        DiscoveredContent.objects.all().delete()
+        CrawlJob.objects.all().delete()
+        TopicQuery.objects.all().delete()
+        ContentSource.objects.all().delete()
+        SearchTopic.objects.all().delete()
+
     def _clean_database(self):
         """Deletes all data from the relevant models."""
         Comment.objects.all().delete()
@@ -109,9 +287,11 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("Database cleaned successfully."))
 
     def _create_users(self, fake, count=10):
-        users = []
         for _ in range(count):
-            users.append(User.objects.create_user(username=fake.user_name(), email=fake.email(), password='password'))
+            username, email = fake.user_name(), fake.email()
+            # A repeated --seed produces the same names again.
+            if not User.objects.filter(username=username).exists():
+                User.objects.create_user(username=username, email=email, password='password')
         # Ensure at least one superuser
         if not User.objects.filter(is_superuser=True).exists():
             User.objects.create_superuser('admin', 'admin@example.com', 'admin')
@@ -153,6 +333,48 @@ class Command(BaseCommand):
                     lessons.append(lesson)
         return lessons
 
+    def _create_repositories(self, fake, count=20):
+        existing = Repository.objects.count()
+        return [
+            Repository.objects.create(
+                owner=fake.user_name(),
+                name=fake.slug(),
+                full_name=f"{fake.user_name()}/{fake.slug()}-{existing + i}",
+                default_branch='main',
+            )
+            for i in range(count)
+        ]
+
+    def _create_search_base(self, fake, topics=10, queries_per_topic=3, sources=20, crawl_jobs=30):
+        existing = SearchTopic.objects.count()
+        search_topics = [
+            SearchTopic.objects.create(name=f"{fake.word().title()} {existing + i}", description=fake.sentence())
+            for i in range(topics)
+        ]
+        topic_queries = [
+            TopicQuery.objects.create(topic=topic, query_text=' '.join(fake.words(nb=3)))
+            for topic in search_topics
+            for _ in range(queries_per_topic)
+        ]
+        hosts = [f"{fake.domain_word()}-{i}.example.com" for i in range(sources)]
+        content_sources = [
+            ContentSource.objects.create(
+                name=fake.company(),
+                source_type=random.choice(['RSS', 'WEB', 'API']),
+                base_url=f"https://{host}/",
+                feed_url=f"https://{host}/feed.xml",
+            )
+            for host in hosts
+        ]
+        jobs = [CrawlJob.objects.create(status='SUCCEEDED') for _ in range(crawl_jobs)]
+        return {
+            'topics': [obj.id for obj in search_topics],
+            'topic_queries': [obj.id for obj in topic_queries],
+            'sources': [obj.id for obj in content_sources],
+            'hosts': hosts,
+            'crawl_jobs': [obj.id for obj in jobs],
+        }
+
     def _create_github_items(self, fake, repos=2, items_per_repo=5):
         change_items = []
         for _ in range(repos):
@@ -174,4 +396,5 @@ class Command(BaseCommand):
                     raw_payload={'message': fake.text()}
                 )
                 change_items.append(item)
-        return change_items
\ No newline at end of file
+        return change_items
+
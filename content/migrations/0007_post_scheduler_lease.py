@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_outboxevent'),
+        ('github', '0001_initial'),
+        ('learning', '0002_chapter_processed_lesson_processed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='locked_by',
+            field=models.CharField(blank=True, help_text='Scheduler process holding the publish lease.', max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, help_text="When the scheduler's publish lease expires.", null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'scheduled_at'], name='content_pos_status__d28554_idx'),
+        ),
+    ]
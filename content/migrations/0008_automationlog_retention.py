@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0007_post_scheduler_lease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutomationLogDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('action', models.CharField(choices=[('publish', 'Publish'), ('retry', 'Retry'), ('notify', 'Notify')], max_length=10)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('failed', 'Failed')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Automation log daily summaries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='automationlog',
+            index=models.Index(fields=['token'], name='content_aut_token_ae7a0e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='automationlog',
+            index=models.Index(fields=['executed_at'], name='content_aut_execute_eaf02a_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='automationlogdailysummary',
+            unique_together={('date', 'action', 'status')},
+        ),
+    ]
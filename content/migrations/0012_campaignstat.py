@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+import datetime
+import django.db.models.deletion
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def week_of(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    day = value.date()
+    return (day - datetime.timedelta(days=day.weekday())).isoformat()
+
+
+def build_campaign_stats(apps, schema_editor):
+    Post = apps.get_model('content', 'Post')
+    CampaignStat = apps.get_model('content', 'CampaignStat')
+    counts = Counter()
+    rows = Post.objects.order_by().values_list(
+        'campaign_id', 'status_id', 'platform_id', 'post_type_id', 'scheduled_at', 'published_at'
+    )
+    for campaign_id, status_id, platform_id, post_type_id, scheduled_at, published_at in rows.iterator(
+        chunk_size=5000
+    ):
+        counts[campaign_id, 'status', str(status_id)] += 1
+        counts[campaign_id, 'platform', str(platform_id)] += 1
+        counts[campaign_id, 'post_type', str(post_type_id)] += 1
+        if scheduled_at is not None:
+            counts[campaign_id, 'scheduled_week', week_of(scheduled_at)] += 1
+        if published_at is not None:
+            counts[campaign_id, 'published_week', week_of(published_at)] += 1
+    CampaignStat.objects.bulk_create(
+        [
+            CampaignStat(campaign_id=campaign_id, dimension=dimension, key=key, count=count)
+            for (campaign_id, dimension, key), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0011_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('status', 'Status'), ('platform', 'Platform'), ('post_type', 'Post type'), ('scheduled_week', 'Scheduled per week'), ('published_week', 'Published per week')], max_length=20)),
+                ('key', models.CharField(help_text='Object id, or the Monday of the week as YYYY-MM-DD.', max_length=32)),
+                ('count', models.IntegerField(default=0)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='content.campaign')),
+            ],
+            options={
+                'unique_together': {('campaign', 'dimension', 'key')},
+            },
+        ),
+        migrations.RunPython(build_campaign_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:20
+
+from django.db import migrations
+
+TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS content_post_fts_ai AFTER INSERT ON content_post BEGIN
+        INSERT INTO content_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS content_post_fts_ad AFTER DELETE ON content_post BEGIN
+        DELETE FROM content_post_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS content_post_fts_au AFTER UPDATE OF title, body ON content_post BEGIN
+        DELETE FROM content_post_fts WHERE rowid = old.id;
+        INSERT INTO content_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+
+def fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_post_fts(apps, schema_editor):
+    if not fts5_available(schema_editor.connection):
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS content_post_fts USING fts5(title, body, tokenize='unicode61')"
+    )
+    for trigger in TRIGGERS:
+        schema_editor.execute(trigger)
+    schema_editor.execute("DELETE FROM content_post_fts")
+    schema_editor.execute(
+        "INSERT INTO content_post_fts(rowid, title, body) SELECT id, title, body FROM content_post"
+    )
+
+
+def drop_post_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in ('content_post_fts_ai', 'content_post_fts_ad', 'content_post_fts_au'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    schema_editor.execute("DROP TABLE IF EXISTS content_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0012_campaignstat'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_post_fts, drop_post_fts),
+    ]
@@ -1,15 +1,20 @@
+import secrets
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 class Campaign(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
 
 class Platform(models.Model):
     name = models.CharField(max_length=255)  # LinkedIn, Instagram, etc.
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -17,6 +22,7 @@ class Platform(models.Model):
 class PostType(models.Model):
     name = models.CharField(max_length=255)  # text, image, video, carousel
     description = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -24,6 +30,7 @@ class PostType(models.Model):
 class PostStatus(models.Model):
     name = models.CharField(max_length=255)  # draft, review, approved, scheduled, published
     order = models.IntegerField()  # The order to display in a Kanban board
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
@@ -33,6 +40,7 @@ class PostStatus(models.Model):
 
 class Tag(models.Model):
     name = models.CharField(max_length=255, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -72,8 +80,16 @@ class Post(models.Model):
     scheduled_at = models.DateTimeField(null=True, blank=True)
     published_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     tags = models.ManyToManyField(Tag, through='PostTag')
+    locked_by = models.CharField(max_length=255, null=True, blank=True, help_text="Scheduler process holding the publish lease.")
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="When the scheduler's publish lease expires.")
+    comment_count = models.PositiveIntegerField(default=0, editable=False, help_text="Maintained by comment signals.")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'scheduled_at']),
+        ]
 
     def __str__(self):
         return self.title
@@ -81,13 +97,46 @@ class Post(models.Model):
 class PostTag(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
     tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ('post', 'tag')
 
+class CampaignStat(models.Model):
+    """A post count of one campaign, maintained by content.analytics."""
+    DIMENSION_CHOICES = (
+        ('status', 'Status'),
+        ('platform', 'Platform'),
+        ('post_type', 'Post type'),
+        ('scheduled_week', 'Scheduled per week'),
+        ('published_week', 'Published per week'),
+    )
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='stats')
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=32, help_text="Object id, or the Monday of the week as YYYY-MM-DD.")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('campaign', 'dimension', 'key')
+
+    def __str__(self):
+        return f"{self.campaign_id} {self.dimension}={self.key}: {self.count}"
+
+class Blob(models.Model):
+    """A stored file addressed by the SHA-256 of its content, shared by identical attachments."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='blobs/')
+    size = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
 class Attachment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='attachments')
     file = models.FileField(upload_to='attachments/')
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, null=True, blank=True, related_name='attachments')
     TYPE_CHOICES = (
         ('image', 'Image'),
         ('video', 'Video'),
@@ -97,12 +146,32 @@ class Attachment(models.Model):
     def __str__(self):
         return f"{self.type} for post {self.post.id}"
 
+class UploadSession(models.Model):
+    """A resumable, chunked upload that becomes an Attachment once complete."""
+    token = models.CharField(max_length=64, unique=True, default=secrets.token_hex, editable=False)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='upload_sessions')
+    type = models.CharField(max_length=5, choices=Attachment.TYPE_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(help_text="Total size of the file in bytes.")
+    received = models.PositiveBigIntegerField(default=0, help_text="Bytes received so far; the offset of the next chunk.")
+    attachment = models.OneToOneField(Attachment, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_session')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload {self.filename} ({self.received}/{self.size})"
+
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'created_at']),
+        ]
+
     def __str__(self):
         return f"Comment by {self.author.username} on {self.post.title}"
 
@@ -123,5 +192,51 @@ class AutomationLog(models.Model):
     message = models.TextField()
     executed_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['token']),
+            models.Index(fields=['executed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.action} on {self.post.title} - {self.status}"
+
+
+class AutomationLogDailySummary(models.Model):
+    """Per-day counts of AutomationLog rows rolled up by prune_automation_logs."""
+    date = models.DateField()
+    action = models.CharField(max_length=10, choices=AutomationLog.ACTION_CHOICES)
+    status = models.CharField(max_length=10, choices=AutomationLog.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'action', 'status')
+        verbose_name_plural = "Automation log daily summaries"
+
+    def __str__(self):
+        return f"{self.date} {self.action} {self.status}: {self.count}"
+
+class OutboxEvent(models.Model):
+    """A webhook waiting to be delivered to n8n by the dispatch_outbox command."""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('delivered', 'Delivered'),
+        ('failed', 'Failed'),
+    )
+
+    event = models.CharField(max_length=50)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Earliest time of the next delivery attempt.")
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
     def __str__(self):
-        return f"{self.action} on {self.post.title} - {self.status}"
\ No newline at end of file
+        return f"{self.event} ({self.status})"
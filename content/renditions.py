@@ -0,0 +1,177 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from PIL import Image, ImageOps
+
+from .models import Blob
+
+# name: (width, height, mode, format). "crop" fills the box exactly,
+# "fit" scales down to fit inside it.
+DEFAULT_RENDITIONS = {
+    'thumbnail': (320, 320, 'fit', 'WEBP'),
+    'linkedin': (1200, 627, 'crop', 'JPEG'),
+    'instagram': (1080, 1080, 'crop', 'JPEG'),
+    'instagram_portrait': (1080, 1350, 'crop', 'JPEG'),
+}
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png'}
+CONTENT_TYPES = {'WEBP': 'image/webp', 'JPEG': 'image/jpeg', 'PNG': 'image/png'}
+
+MAX_TRACKED_DIGESTS = 256
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='rendition')
+_inflight = {}
+# SHA-256 of attachments stored before content addressing, by file name,
+# kept until a request picks the result up. Least recently used entries are
+# dropped past MAX_TRACKED_DIGESTS; a dropped file is hashed again.
+_digests = OrderedDict()
+_lock = threading.Lock()
+
+
+class SourceUnavailable(Exception):
+    """The attachment's file could not be read."""
+
+
+def get_renditions():
+    return getattr(settings, 'IMAGE_RENDITIONS', DEFAULT_RENDITIONS)
+
+
+def hash_stored_file(name):
+    from .uploads import hash_file
+    with default_storage.open(name, 'rb') as fh:
+        return hash_file(fh)
+
+
+def source_marker(name):
+    """Where a failure to read the stored file ``name`` is recorded."""
+    return rendition_root() / 'sources' / hashlib.sha1(name.encode('utf-8')).hexdigest()
+
+
+def source_blob(attachment):
+    """
+    Returns the Blob behind ``attachment``, or ``None`` while it is not known
+    yet. Attachments uploaded before content addressing are hashed once on
+    the background pool; the request that finds the hash ready stores their
+    Blob. Raises ``SourceUnavailable`` if the file could not be read, until
+    the failure expires like a failed rendition.
+    """
+    if attachment.blob_id:
+        return attachment.blob
+    name = attachment.file.name
+    marker = source_marker(name)
+    error = rendition_failure(marker)
+    if error is not None:
+        raise SourceUnavailable(error)
+    with _lock:
+        future = _digests.get(name)
+        if future is None:
+            future = _digests[name] = _executor.submit(hash_stored_file, name)
+            while len(_digests) > MAX_TRACKED_DIGESTS:
+                _digests.popitem(last=False)
+        _digests.move_to_end(name)
+    if not future.done():
+        return None
+    with _lock:
+        _digests.pop(name, None)
+    try:
+        digest, size = future.result(), attachment.file.size
+    except OSError as e:
+        record_failure(marker, e)
+        raise SourceUnavailable(f'{type(e).__name__}: {e}') from e
+    blob, _ = Blob.objects.get_or_create(sha256=digest, defaults={'file': name, 'size': size})
+    attachment.blob = blob
+    attachment.save(update_fields=['blob'])
+    return blob
+
+
+def rendition_root():
+    return Path(getattr(settings, 'RENDITION_ROOT', None) or Path(settings.MEDIA_ROOT) / 'renditions')
+
+
+def rendition_name(digest, name):
+    width, height, _, fmt = get_renditions()[name]
+    return f'{digest[:2]}/{digest}-{name}-{width}x{height}.{EXTENSIONS[fmt]}'
+
+
+def rendition_path(digest, name):
+    return rendition_root() / rendition_name(digest, name)
+
+
+def open_rendition(digest, name):
+    """Opens a generated rendition; the caller owns the returned file."""
+    return FileSystemStorage(location=rendition_root()).open(rendition_name(digest, name), 'rb')
+
+
+def failure_path(target):
+    return target.with_name(f'{target.name}.failed')
+
+
+def rendition_failure(target):
+    """
+    The error recorded when ``target`` last failed to render, or ``None``.
+    Failures are retried after ``RENDITION_FAILURE_TTL`` seconds.
+    """
+    marker = failure_path(target)
+    try:
+        if time.time() - marker.stat().st_mtime > getattr(settings, 'RENDITION_FAILURE_TTL', 3600):
+            return None
+        return marker.read_text() or 'unknown error'
+    except FileNotFoundError:
+        return None
+
+
+def record_failure(target, error):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    failure_path(target).write_text(f'{type(error).__name__}: {error}')
+
+
+def render(source_name, target, name):
+    try:
+        return _render(source_name, target, name)
+    except Exception as e:
+        record_failure(target, e)
+        raise
+
+
+def _render(source_name, target, name):
+    width, height, mode, fmt = get_renditions()[name]
+    with default_storage.open(source_name, 'rb') as fh, Image.open(fh) as image:
+        image = ImageOps.exif_transpose(image)
+        if mode == 'crop':
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail((width, height), Image.Resampling.LANCZOS)
+        if fmt == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write beside the target and rename, so readers never see a partial file.
+        partial = target.with_name(f'{target.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        image.save(partial, fmt, quality=85)
+    os.replace(partial, target)
+    failure_path(target).unlink(missing_ok=True)
+    return target
+
+
+def schedule_rendition(blob, name):
+    """
+    Generates rendition ``name`` of ``blob`` on the background pool.
+
+    Concurrent requests for the same rendition share one Future. A failure
+    is recorded beside the target, see ``rendition_failure``.
+    """
+    target = rendition_path(blob.sha256, name)
+    key = str(target)
+    with _lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = _executor.submit(render, blob.file.name, target, name)
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
+    return future
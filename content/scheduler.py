@@ -0,0 +1,260 @@
+import datetime
+import heapq
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import lookups
+from .analytics import record_bulk_update, row_of
+from .models import Post, PostStatus, AutomationLog, OutboxEvent
+
+
+def queued_status_name():
+    return getattr(settings, "SCHEDULER_QUEUED_STATUS", "Publishing")
+
+
+def done_status_name():
+    return getattr(settings, "SCHEDULER_DONE_STATUS", "Published")
+
+
+def confirm_publish(post_id, published_at, succeeded=True, message=''):
+    """
+    Record n8n's report on publishing a post the scheduler handed to it.
+
+    On success a post in the queued status moves to the done status with
+    ``published_at`` set; on failure it stays queued and the error is
+    logged. Reports for posts that are not queued (already confirmed, or
+    never fired) change nothing, so n8n may retry them. Returns whether
+    the post was queued.
+    """
+    queued = lookups.get_by_name(PostStatus, queued_status_name())
+    if queued is None:
+        return False
+    with transaction.atomic():
+        post = (
+            Post.objects.select_for_update()
+            .filter(id=post_id, status_id=queued.id)
+            .first()
+        )
+        if post is None:
+            return False
+        if not succeeded:
+            AutomationLog.objects.create(
+                post=post, action='publish', status='failed',
+                message=message or "n8n reported that publishing failed.",
+            )
+            return True
+        done_status, _ = lookups.get_or_create(
+            PostStatus, done_status_name(), defaults={'order': 5}
+        )
+        before = row_of(post)
+        Post.objects.filter(id=post.id).update(
+            status=done_status, published_at=published_at, updated_at=timezone.now()
+        )
+        record_bulk_update([before], status_id=done_status.id, published_at=published_at)
+        AutomationLog.objects.create(
+            post=post, action='publish', status='success',
+            message=message or "Published by n8n.",
+        )
+    return True
+
+
+class PostScheduler:
+    """
+    Hands posts to n8n for publishing when their ``scheduled_at`` comes due.
+
+    Posts in the due status (``SCHEDULER_DUE_STATUS``, "Scheduled" by default)
+    that fall within ``horizon`` are kept in a heap ordered by scheduled time,
+    loaded through the ``(status, scheduled_at)`` index. The scheduler sleeps
+    until the head of the heap is due, or until the heap is reloaded to pick
+    up newly scheduled posts.
+
+    Due posts are claimed with a lease (``locked_by``/``locked_until``) by a
+    conditional UPDATE, so several schedulers can run against the same
+    database and each post is fired by exactly one of them. Firing queues a
+    ``publish`` outbox event, moves the post to the queued status
+    (``SCHEDULER_QUEUED_STATUS``, "Publishing" by default) and records one
+    ``AutomationLog`` row per post, all in bulk. The post only becomes
+    published when n8n reports back; see ``confirm_publish``.
+
+    A post whose firing fails is held back for an exponentially growing
+    delay (``SCHEDULER_RETRY_BASE_SECONDS`` doubled per earlier failure, up to
+    ``SCHEDULER_RETRY_MAX_SECONDS``) instead of being retried on every pass.
+    """
+
+    def __init__(self, owner=None, lease_seconds=60, horizon_seconds=600,
+                 refresh_seconds=30, batch_size=500, clock=timezone.now):
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = datetime.timedelta(seconds=lease_seconds)
+        self.horizon = datetime.timedelta(seconds=horizon_seconds)
+        self.refresh_interval = datetime.timedelta(seconds=refresh_seconds)
+        self.batch_size = batch_size
+        self.clock = clock
+        self.heap = []
+        self.refreshed_at = None
+        self.truncated = False
+        self.due_status_name = getattr(settings, "SCHEDULER_DUE_STATUS", "Scheduled")
+        self.queued_status_name = queued_status_name()
+
+    def due_status_id(self):
+        status = lookups.get_by_name(PostStatus, self.due_status_name)
+        return status.id if status is not None else None
+
+    def refresh(self, now):
+        """Reload the heap with the next posts due within the horizon."""
+        due_status_id = self.due_status_id()
+        upcoming = (
+            Post.objects.filter(
+                status_id=due_status_id,
+                scheduled_at__lte=now + self.horizon,
+            )
+            .filter(Q(locked_until__isnull=True) | Q(locked_until__lte=now))
+            .order_by('scheduled_at', 'id')
+            .values_list('scheduled_at', 'id')[:self.batch_size]
+        )
+        self.heap = list(upcoming) if due_status_id is not None else []
+        heapq.heapify(self.heap)
+        self.refreshed_at = now
+        # A full batch means more posts may be waiting behind this one.
+        self.truncated = len(self.heap) == self.batch_size
+
+    def needs_refresh(self, now):
+        if self.refreshed_at is None or now >= self.refreshed_at + self.refresh_interval:
+            return True
+        return not self.heap and self.truncated
+
+    def next_wakeup(self):
+        """When the next post is due, or the heap must be reloaded."""
+        if not self.heap and self.truncated:
+            return self.refreshed_at
+        wakeup = self.refreshed_at + self.refresh_interval
+        if self.heap and self.heap[0][0] < wakeup:
+            wakeup = self.heap[0][0]
+        return wakeup
+
+    def pop_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap)[1])
+        return due
+
+    def claim(self, post_ids, now):
+        """Take the lease on whichever of ``post_ids`` no one else holds."""
+        Post.objects.filter(
+            id__in=post_ids,
+            status_id=self.due_status_id(),
+            scheduled_at__lte=now,
+        ).filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lte=now)
+        ).update(locked_by=self.owner, locked_until=now + self.lease)
+        return list(
+            Post.objects.select_related('platform').filter(
+                id__in=post_ids, locked_by=self.owner, locked_until__gt=now
+            )
+        )
+
+    def fire(self, posts, now):
+        """
+        Move ``posts`` to the queued status, then queue the publish events
+        and logs for the ones that really moved. A post whose lease was taken
+        over by another scheduler is left to it. Returns the number fired.
+        """
+        queued_status, _ = lookups.get_or_create(
+            PostStatus, self.queued_status_name, defaults={'order': 5}
+        )
+        with transaction.atomic():
+            # Lock the rows still leased to us so the ids read here are
+            # exactly the rows the UPDATE below changes.
+            held = set(
+                Post.objects.select_for_update()
+                .filter(id__in=[post.id for post in posts], locked_by=self.owner, status_id=self.due_status_id())
+                .values_list('id', flat=True)
+            )
+            posts = [post for post in posts if post.id in held]
+            if not posts:
+                return 0
+            Post.objects.filter(id__in=held).update(
+                status=queued_status,
+                updated_at=now,
+                locked_by=None,
+                locked_until=None,
+            )
+            record_bulk_update(
+                [row_of(post) for post in posts], status_id=queued_status.id
+            )
+            OutboxEvent.objects.bulk_create([
+                OutboxEvent(event='publish', payload={
+                    'post_id': post.id,
+                    'title': post.title,
+                    'body': post.body,
+                    'platform': post.platform.name,
+                    'scheduled_at': post.scheduled_at.isoformat(),
+                })
+                for post in posts
+            ])
+            AutomationLog.objects.bulk_create([
+                AutomationLog(
+                    post=post,
+                    action='publish',
+                    status='success',
+                    message=f"Handed to n8n for publishing by {self.owner}.",
+                )
+                for post in posts
+            ])
+        return len(posts)
+
+    def retry_delay(self, failures):
+        base = getattr(settings, "SCHEDULER_RETRY_BASE_SECONDS", 30)
+        cap = getattr(settings, "SCHEDULER_RETRY_MAX_SECONDS", 3600)
+        return datetime.timedelta(seconds=min(cap, base * 2 ** (failures - 1)))
+
+    def fail(self, posts, error, now):
+        """Log why firing ``posts`` failed and hold them back before the next try."""
+        AutomationLog.objects.bulk_create([
+            AutomationLog(post=post, action='publish', status='failed', message=str(error))
+            for post in posts
+        ])
+        failures = dict(
+            AutomationLog.objects.filter(post__in=posts, action='publish', status='failed')
+            .values_list('post').annotate(total=Count('id')).order_by()
+        )
+        by_count = {}
+        for post in posts:
+            by_count.setdefault(failures.get(post.id, 1), []).append(post.id)
+        # Keeping locked_until while dropping the owner makes the post
+        # unclaimable by anyone until the delay has passed.
+        for count, ids in by_count.items():
+            Post.objects.filter(id__in=ids, locked_by=self.owner).update(
+                locked_by=None, locked_until=now + self.retry_delay(count)
+            )
+
+    def run_once(self):
+        """Fire every post that is due now. Returns the number fired."""
+        now = self.clock()
+        if self.needs_refresh(now):
+            self.refresh(now)
+        due = self.pop_due(now)
+        if not due:
+            return 0
+        posts = self.claim(due, now)
+        if not posts:
+            return 0
+        try:
+            return self.fire(posts, now)
+        except Exception as e:
+            self.fail(posts, e, now)
+            return 0
+
+    def run_forever(self, on_fired=None):
+        while True:
+            fired = self.run_once()
+            if fired and on_fired:
+                on_fired(fired)
+            delay = (self.next_wakeup() - self.clock()).total_seconds()
+            if delay > 0:
+                time.sleep(delay)
@@ -0,0 +1,159 @@
+"""
+Row generators for ``seed_data --bulk``.
+
+Each generator turns one chunk specification into plain dicts of field
+values. It uses no database and no Django models, so chunks can be built in
+worker processes, and it draws from a ``random.Random`` seeded with the run's
+seed, the kind of row and the chunk's start. The same seed therefore yields
+the same rows whatever the number of workers or the order chunks finish in.
+"""
+import datetime
+import hashlib
+import random
+
+# Dates are spread around a fixed point so seeded datasets are reproducible.
+EPOCH = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class ChunkSpec:
+    def __init__(self, kind, seed, start, count, refs, words):
+        self.kind = kind
+        self.seed = seed
+        self.start = start
+        self.count = count
+        self.refs = refs
+        self.words = words
+
+
+def chunk_specs(kind, total, chunk_size, seed, refs, words, offset=0):
+    """
+    Splits rows ``offset`` to ``offset + total`` into chunks. Pass the number
+    of rows already present as ``offset`` so unique values do not repeat.
+    """
+    end = offset + total
+    return [
+        ChunkSpec(kind, seed, start, min(chunk_size, end - start), refs, words)
+        for start in range(offset, end, chunk_size)
+    ]
+
+
+def _rng(spec):
+    return random.Random(f'{spec.seed}:{spec.kind}:{spec.start}')
+
+
+def _sentence(rng, words, low, high):
+    return ' '.join(rng.choices(words, k=rng.randint(low, high))).capitalize() + '.'
+
+
+def _paragraph(rng, words, sentences):
+    return ' '.join(_sentence(rng, words, 6, 14) for _ in range(sentences))
+
+
+def _moment(rng, days_before, days_after):
+    return EPOCH + datetime.timedelta(seconds=rng.randint(-days_before * 86400, days_after * 86400))
+
+
+def generate_posts(spec):
+    """
+    Returns ``(posts, post_tags, comments)`` for the chunk. Tag and comment
+    rows name their post by its position within ``posts``.
+    """
+    rng, refs, words = _rng(spec), spec.refs, spec.words
+    posts, post_tags, comments = [], [], []
+    for index in range(spec.count):
+        posts.append({
+            'campaign_id': rng.choice(refs['campaigns']),
+            'platform_id': rng.choice(refs['platforms']),
+            'post_type_id': rng.choice(refs['post_types']),
+            'status_id': rng.choice(refs['statuses']),
+            'lesson_id': rng.choice(refs['lessons']) if refs['lessons'] else None,
+            'change_item_id': rng.choice(refs['change_items']) if refs['change_items'] else None,
+            'title': _sentence(rng, words, 4, 8)[:255],
+            'body': _paragraph(rng, words, 5),
+            'scheduled_at': _moment(rng, 0, 365),
+        })
+        if refs['tags']:
+            for tag_id in rng.sample(refs['tags'], k=rng.randint(1, min(5, len(refs['tags'])))):
+                post_tags.append({'post': index, 'tag_id': tag_id})
+        for _ in range(rng.randint(0, 7)):
+            comments.append({
+                'post': index,
+                'author_id': rng.choice(refs['users']),
+                'text': _sentence(rng, words, 5, 12),
+            })
+    return posts, post_tags, comments
+
+
+def generate_change_items(spec):
+    rng, refs, words = _rng(spec), spec.refs, spec.words
+    rows = []
+    for number in range(spec.start, spec.start + spec.count):
+        rows.append({
+            'repository_id': rng.choice(refs['repositories']),
+            'item_type': rng.choice(['commit', 'pr', 'issue']),
+            # The global row number keeps (repository, type, id) unique.
+            'source_item_id': hashlib.sha1(f'{spec.seed}:{number}'.encode()).hexdigest(),
+            'title': _sentence(rng, words, 4, 10)[:255],
+            'summary': _paragraph(rng, words, 3),
+            'url': f'https://github.com/example/repo/commit/{number}',
+            'changed_at': _moment(rng, 3 * 365, 0),
+            'raw_payload': {'message': _sentence(rng, words, 6, 16)},
+        })
+    return rows
+
+
+def generate_discovered_content(spec):
+    rng, refs, words = _rng(spec), spec.refs, spec.words
+    rows = []
+    for number in range(spec.start, spec.start + spec.count):
+        slug = '-'.join(rng.choices(words, k=4))
+        url = f'https://{rng.choice(refs["hosts"])}/{number}/{slug}'
+        rows.append({
+            'canonical_url': url,
+            'url_hash': hashlib.sha256(url.encode('utf-8')).hexdigest(),
+            'title': _sentence(rng, words, 5, 12)[:500],
+            'excerpt': _paragraph(rng, words, 2),
+            'published_at': _moment(rng, 2 * 365, 0) if rng.random() > 0.05 else None,
+            'source_id': rng.choice(refs['sources']),
+            'topic_id': rng.choice(refs['topics']),
+            'topic_query_id': rng.choice(refs['topic_queries']),
+            'language': 'en',
+            'content_type': rng.choice(['ARTICLE', 'ARTICLE', 'ARTICLE', 'VIDEO', 'PODCAST']),
+            'relevance_score': round(rng.random(), 4),
+            'quality_score': round(rng.random(), 4),
+            'raw_payload': {'summary': _sentence(rng, words, 10, 30)},
+        })
+    return rows
+
+
+def generate_fetch_logs(spec):
+    rng, refs = _rng(spec), spec.refs
+    rows = []
+    for number in range(spec.start, spec.start + spec.count):
+        status = rng.choices(['SUCCESS', 'RATE_LIMITED', 'ERROR'], weights=[90, 5, 5])[0]
+        started_at = _moment(rng, 365, 0)
+        rows.append({
+            'crawl_job_id': rng.choice(refs['crawl_jobs']),
+            'topic_id': rng.choice(refs['topics']),
+            'topic_query_id': rng.choice(refs['topic_queries']),
+            'source_id': rng.choice(refs['sources']),
+            'request_signature': f'GET https://{rng.choice(refs["hosts"])}/feed?page={number}',
+            'status': status,
+            'items_found': rng.randint(0, 50) if status == 'SUCCESS' else 0,
+            'started_at': started_at,
+            'finished_at': started_at + datetime.timedelta(milliseconds=rng.randint(50, 5000)),
+            'error_detail': 'Upstream returned an error.' if status == 'ERROR' else None,
+        })
+    return rows
+
+
+GENERATORS = {
+    'posts': generate_posts,
+    'change_items': generate_change_items,
+    'discovered_content': generate_discovered_content,
+    'fetch_logs': generate_fetch_logs,
+}
+
+
+def generate(spec):
+    return GENERATORS[spec.kind](spec)
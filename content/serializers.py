@@ -1,4 +1,6 @@
+from django.urls import reverse
 from rest_framework import serializers
+from campaign_manager.fieldsets import FieldsetModelSerializer
 from .models import (
     Campaign,
     Platform,
@@ -11,9 +13,31 @@ from .models import (
     Comment,
     AutomationLog,
     DraftBatch,
+    UploadSession,
 )
 
 
+class LookupRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    A primary key field for the lookup tables that validates ids against
+    the process-local cache in ``content.lookups``; only ids missing from
+    the cache cost a query.
+    """
+
+    def to_internal_value(self, data):
+        from .lookups import get
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        row = get(self.get_queryset().model, pk)
+        if row is None:
+            self.fail('does_not_exist', pk_value=data)
+        return row
+
+
 class DraftBatchCreateSerializer(serializers.ModelSerializer):
     chapter_id = serializers.IntegerField(write_only=True)
     lesson_ids = serializers.ListField(
@@ -37,58 +61,169 @@ class DraftBatchReviseSerializer(serializers.Serializer):
     token = serializers.CharField()
     feedback = serializers.CharField()
 
+class PublishResultSerializer(serializers.Serializer):
+    post_id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=AutomationLog.STATUS_CHOICES)
+    # When n8n leaves it out, the time the report arrives is used.
+    published_at = serializers.DateTimeField(required=False)
+    message = serializers.CharField(required=False, allow_blank=True, default='')
+
+class PostSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField()
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    offset = serializers.IntegerField(min_value=0, max_value=10000, default=0)
+
+class TagAutocompleteQuerySerializer(serializers.Serializer):
+    q = serializers.CharField()
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+class PostBoardQuerySerializer(serializers.Serializer):
+    campaign = serializers.IntegerField(required=False)
+    platform = serializers.IntegerField(required=False)
+    status = serializers.IntegerField(required=False)
+
+class PostTransitionFilterSerializer(serializers.Serializer):
+    campaign = serializers.IntegerField(required=False)
+    platform = serializers.IntegerField(required=False)
+    post_type = serializers.IntegerField(required=False)
+    status = serializers.IntegerField(required=False)
+    scheduled_before = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        # An empty filter would select every post.
+        if not data:
+            raise serializers.ValidationError("Provide at least one filter criterion.")
+        return data
+
+class PostTransitionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filter = PostTransitionFilterSerializer(required=False)
+    status = LookupRelatedField(queryset=PostStatus.objects.all())
+    # Omit to leave published_at alone; null clears it.
+    published_at = serializers.DateTimeField(required=False, allow_null=True)
+    log_action = serializers.ChoiceField(choices=AutomationLog.ACTION_CHOICES, required=False)
+
+    def validate(self, data):
+        if ('ids' in data) == ('filter' in data):
+            raise serializers.ValidationError("Provide exactly one of 'ids' or 'filter'.")
+        return data
+
 class AutomationLogCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = AutomationLog
         fields = ('token', 'status', 'message')
 
+class AutomationLogBatchSerializer(serializers.ModelSerializer):
+    # A plain id instead of a related field, so a batch checks all of its
+    # posts in one query rather than one per entry.
+    post_id = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = AutomationLog
+        fields = ('post_id', 'token', 'action', 'status', 'message')
+
 
-class CampaignSerializer(serializers.ModelSerializer):
+class CampaignSerializer(FieldsetModelSerializer):
     class Meta:
         model = Campaign
         fields = '__all__'
 
-class PlatformSerializer(serializers.ModelSerializer):
+class PlatformSerializer(FieldsetModelSerializer):
     class Meta:
         model = Platform
         fields = '__all__'
 
-class PostTypeSerializer(serializers.ModelSerializer):
+class PostTypeSerializer(FieldsetModelSerializer):
     class Meta:
         model = PostType
         fields = '__all__'
 
-class PostStatusSerializer(serializers.ModelSerializer):
+class PostStatusSerializer(FieldsetModelSerializer):
     class Meta:
         model = PostStatus
         fields = '__all__'
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(FieldsetModelSerializer):
     class Meta:
         model = Tag
         fields = '__all__'
 
-class PostTagSerializer(serializers.ModelSerializer):
+class PostTagSerializer(FieldsetModelSerializer):
     class Meta:
         model = PostTag
         fields = '__all__'
+        expandable_fields = {'post': 'content.serializers.PostSerializer', 'tag': TagSerializer}
+
+class AttachmentSerializer(FieldsetModelSerializer):
+    renditions = serializers.SerializerMethodField()
 
-class AttachmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attachment
         fields = '__all__'
+        expandable_fields = {'post': 'content.serializers.PostSerializer'}
+        read_only_fields = ('blob',)
+
+    def get_renditions(self, obj):
+        if obj.type != 'image' or obj.pk is None:
+            return {}
+        from .renditions import get_renditions
+        request = self.context.get('request')
+        urls = {}
+        for name in get_renditions():
+            url = reverse('attachment-rendition', args=[obj.pk, name])
+            urls[name] = request.build_absolute_uri(url) if request else url
+        return urls
+
+    def create(self, validated_data):
+        from .uploads import store_blob
+        upload = validated_data.pop('file')
+        blob = store_blob(upload, upload.name)
+        return Attachment.objects.create(file=blob.file.name, blob=blob, **validated_data)
+
+    def update(self, instance, validated_data):
+        # A replaced file is stored like a new one, so ``blob`` follows it.
+        upload = validated_data.pop('file', None)
+        if upload is not None:
+            from .uploads import store_blob
+            blob = store_blob(upload, upload.name)
+            instance.file, instance.blob = blob.file.name, blob
+        return super().update(instance, validated_data)
+
+class UploadSessionSerializer(FieldsetModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ('token', 'post', 'type', 'filename', 'size', 'received', 'attachment')
+        read_only_fields = ('received', 'attachment')
+
+class CommentSerializer(FieldsetModelSerializer):
+    author_username = serializers.CharField(source='author.username', read_only=True)
 
-class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
-        fields = '__all__'
+        fields = ('id', 'post', 'author', 'author_username', 'text', 'created_at')
+        expandable_fields = {'post': 'content.serializers.PostSerializer'}
+
+    def validate_post(self, value):
+        # comment_count is kept per post, so a comment stays where it was made.
+        if self.instance is not None and value.pk != self.instance.post_id:
+            raise serializers.ValidationError("Comments cannot be moved to another post.")
+        return value
+
+class PostCommentSerializer(CommentSerializer):
+    class Meta(CommentSerializer.Meta):
+        read_only_fields = ('post',)
 
-class AutomationLogSerializer(serializers.ModelSerializer):
+class AutomationLogSerializer(FieldsetModelSerializer):
     class Meta:
         model = AutomationLog
         fields = '__all__'
+        expandable_fields = {'post': 'content.serializers.PostSerializer'}
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(FieldsetModelSerializer):
+    campaign = LookupRelatedField(queryset=Campaign.objects.all())
+    platform = LookupRelatedField(queryset=Platform.objects.all())
+    post_type = LookupRelatedField(queryset=PostType.objects.all())
+    status = LookupRelatedField(queryset=PostStatus.objects.all())
     campaign_name = serializers.CharField(source='campaign.name', read_only=True)
     platform_name = serializers.CharField(source='platform.name', read_only=True)
     status_name = serializers.CharField(source='status.name', read_only=True)
@@ -98,6 +233,13 @@ class PostSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'change_item', 'campaign', 'platform', 'post_type', 'status',
             'lesson', 'title', 'body', 'scheduled_at', 'published_at',
-            'created_at', 'updated_at', 'tags', 'campaign_name', 'platform_name',
-            'status_name'
+            'created_at', 'updated_at', 'tags', 'comment_count', 'campaign_name',
+            'platform_name', 'status_name'
         ]
+        expandable_fields = {
+            'campaign': CampaignSerializer,
+            'platform': PlatformSerializer,
+            'post_type': PostTypeSerializer,
+            'status': PostStatusSerializer,
+            'tags': TagSerializer,
+        }
@@ -0,0 +1,93 @@
+"""
+In-process prefix index over Tag names for autocomplete.
+
+Tags are held in a list sorted by case-folded name, so a prefix maps to a
+contiguous slice found with ``bisect``. The best-used tags for every one-
+and two-character prefix are precomputed, because those slices cover most
+of the table.
+
+The index is a ``VersionedSnapshot``. Tag writes rebuild it on the next
+call. PostTag writes only change usage counts, which rank the matches but
+do not decide them, so they rebuild it at most once every
+``TAG_INDEX_USAGE_INTERVAL`` seconds instead of on every tagged post. The
+index is also rebuilt after ``TAG_INDEX_TTL`` seconds.
+"""
+import bisect
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count
+
+from .models import Tag, PostTag
+from .versioned_cache import VersionedSnapshot, bump_on_commit
+
+VERSION_KEY = 'content:tag-index:version'
+USAGE_VERSION_KEY = 'content:tag-index:usage-version'
+MAX_LIMIT = 50
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+
+class TagPrefixIndex:
+    def __init__(self, tags):
+        """``tags`` is an iterable of ``(id, name, usage)`` tuples."""
+        rows = sorted((name.casefold(), tag_id, name, usage) for tag_id, name, usage in tags)
+        self.keys = [row[0] for row in rows]
+        self.rows = [(tag_id, name, usage) for _, tag_id, name, usage in rows]
+        buckets = defaultdict(list)
+        for position, key in enumerate(self.keys):
+            for length in range(1, min(PRECOMPUTED_PREFIX_LENGTH, len(key)) + 1):
+                buckets[key[:length]].append(position)
+        self.top = {
+            prefix: self._best(positions, MAX_LIMIT) for prefix, positions in buckets.items()
+        }
+
+    def _best(self, positions, limit):
+        # Most used first, then alphabetically.
+        return heapq.nsmallest(
+            limit, positions, key=lambda position: (-self.rows[position][2], self.keys[position])
+        )
+
+    def search(self, prefix, limit=10):
+        prefix = prefix.casefold()
+        if not prefix:
+            return []
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            positions = self.top.get(prefix, [])[:limit]
+        else:
+            start = bisect.bisect_left(self.keys, prefix)
+            end = bisect.bisect_left(self.keys, prefix + '\U0010ffff')
+            positions = self._best(range(start, end), limit)
+        return [self.rows[position] for position in positions]
+
+
+def build_index():
+    usage = dict(PostTag.objects.values_list('tag').annotate(total=Count('id')).order_by())
+    return TagPrefixIndex(
+        (tag_id, name, usage.get(tag_id, 0)) for tag_id, name in Tag.objects.values_list('id', 'name')
+    )
+
+
+_index = VersionedSnapshot(
+    build_index,
+    keys={
+        VERSION_KEY: 0,
+        USAGE_VERSION_KEY: lambda: getattr(settings, 'TAG_INDEX_USAGE_INTERVAL', 30),
+    },
+    ttl=lambda: getattr(settings, 'TAG_INDEX_TTL', 600),
+)
+
+
+def get_index():
+    """Return the current index, rebuilding it if it is out of date."""
+    return _index.get()
+
+
+def invalidate(*args, **kwargs):
+    """Signal receiver for Tag: every process rebuilds its index on the next call."""
+    bump_on_commit(VERSION_KEY)
+
+
+def usage_changed(*args, **kwargs):
+    """Signal receiver for PostTag: usage counts are refreshed, throttled."""
+    bump_on_commit(USAGE_VERSION_KEY)
@@ -1,3 +1,1184 @@
-from django.test import TestCase
+import datetime
+import gzip
+import io
+import json
+import shutil
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from campaign_manager.renderers import FastJSONParser, FastJSONRenderer
+from github.models import ChangeItem
+from learning.models import Topic, Chapter, Lesson
+from search.models import DiscoveredContent, FetchLog
+from .models import (
+    Campaign, Platform, PostType, PostStatus, Tag, Post, PostTag, DraftBatch, OutboxEvent,
+    AutomationLog, AutomationLogDailySummary, Attachment, Blob, Comment, UploadSession,
+)
+from . import analytics, fulltext, lookups, renditions, tag_index, uploads, versioned_cache
+from .comments import recount_comments
+from .scheduler import PostScheduler
+from .utils import dispatch_outbox, outbox_stats, rollup_automation_logs
+from .serializers import PostSerializer
+from .views import PostViewSet
+
+
+class ContentFixturesMixin:
+    """Creates a small set of lookup rows shared by the content tests."""
+
+    def create_lookups(self):
+        self.campaign = Campaign.objects.create(name='Launch', description='Launch campaign')
+        self.platform = Platform.objects.create(name='LinkedIn')
+        self.post_type = PostType.objects.create(name='Text', description='Plain text post')
+        self.draft = PostStatus.objects.create(name='Draft', order=1)
+        self.published = PostStatus.objects.create(name='Published', order=2)
+
+    def create_posts(self, count, status=None, tags=()):
+        posts = Post.objects.bulk_create([
+            Post(
+                campaign=self.campaign,
+                platform=self.platform,
+                post_type=self.post_type,
+                status=status or self.draft,
+                title=f'Post {i}',
+                body=f'Body {i}',
+            )
+            for i in range(count)
+        ])
+        PostTag.objects.bulk_create([
+            PostTag(post=post, tag=tag) for post in posts for tag in tags
+        ])
+        return posts
+
+
+class PostViewSetQueryCountTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.tags = [Tag.objects.create(name=f'tag-{i}') for i in range(3)]
+
+    # Two aggregate queries for the ETag, then the page and its tags.
+    def test_list_query_count_is_constant(self):
+        self.create_posts(5, tags=self.tags)
+        with self.assertNumQueries(4):
+            small = self.client.get(reverse('post-list'))
+        self.create_posts(45, tags=self.tags)
+        with self.assertNumQueries(4):
+            large = self.client.get(reverse('post-list'))
+
+        self.assertEqual(small.status_code, 200)
+        self.assertEqual(len(large.data['results']), 50)
+        row = large.data['results'][0]
+        self.assertEqual(row['campaign_name'], 'Launch')
+        self.assertEqual(row['platform_name'], 'LinkedIn')
+        self.assertEqual(row['status_name'], 'Draft')
+        self.assertEqual(sorted(row['tags']), sorted(t.id for t in self.tags))
+
+    def test_retrieve_query_count(self):
+        post = self.create_posts(1, tags=self.tags)[0]
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('post-detail', args=[post.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['tags']), 3)
+
+
+class PostBoardViewTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.create_posts(7, status=self.draft)
+        self.create_posts(2, status=self.published)
+
+    def test_board_returns_counts_and_first_cards(self):
+        lookups.get_tables()
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('post-board') + '?page_size=3')
+        self.assertEqual(response.status_code, 200)
+        draft, published = response.data
+        self.assertEqual((draft['name'], draft['count'], len(draft['results'])), ('Draft', 7, 3))
+        self.assertEqual((published['count'], len(published['results'])), (2, 2))
+        self.assertIsNone(published['next'])
+
+        ids = [card['id'] for card in draft['results']]
+        url = draft['next']
+        while url:
+            page = self.client.get(url).data
+            ids.extend(card['id'] for card in page['results'])
+            url = page['next']
+        self.assertEqual(
+            ids, list(Post.objects.filter(status=self.draft).order_by('id').values_list('id', flat=True))
+        )
+
+    def test_board_filters_by_campaign(self):
+        other = Campaign.objects.create(name='Other', description='')
+        response = self.client.get(reverse('post-board'), {'campaign': other.id})
+        self.assertEqual([column['count'] for column in response.data], [0, 0])
+
+
+class DraftBatchApproveViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        topic = Topic.objects.create(name='Django')
+        self.chapter = Chapter.objects.create(topic=topic, name='Models')
+        self.lesson = Lesson.objects.create(chapter=self.chapter, name='Fields', content='...')
+        self.batch = DraftBatch.objects.create(
+            token='batch-1',
+            chapter=self.chapter,
+            posts=[{'title': f'Draft {i}', 'body': 'Body'} for i in range(50)],
+        )
+        self.batch.lessons.set([self.lesson])
+        # Rows cached by an earlier test may have been rolled back since.
+        lookups.invalidate()
+
+    def test_approve_creates_posts_once(self):
+        url = reverse('draft-batch-approve')
+        response = self.client.post(url, {'token': 'batch-1'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Post.objects.filter(lesson=self.lesson).count(), 50)
+        self.lesson.refresh_from_db()
+        self.chapter.refresh_from_db()
+        self.assertTrue(self.lesson.processed)
+        self.assertTrue(self.chapter.processed)
+        self.assertEqual(OutboxEvent.objects.filter(event='approved').count(), 1)
+
+        # Savepoint, the locked batch lookup and the release; nothing else.
+        with self.assertNumQueries(3):
+            response = self.client.post(url, {'token': 'batch-1'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Post.objects.count(), 50)
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+    def test_unknown_token_is_not_found(self):
+        response = self.client.post(reverse('draft-batch-approve'), {'token': 'nope'}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(N8N_WEBHOOK_URL='http://n8n.test/webhook', OUTBOX_RETRY_BASE_SECONDS=5)
+class DispatchOutboxTests(TestCase):
+    def setUp(self):
+        self.session = mock.Mock()
+        for i in range(3):
+            OutboxEvent.objects.create(event='approved', payload={'token': f'batch-{i}'})
+
+    def test_delivers_due_events(self):
+        result = dispatch_outbox(self.session)
+        self.assertEqual(result, {'delivered': 3, 'retried': 0, 'failed': 0})
+        self.assertEqual(self.session.post.call_count, 3)
+        self.assertEqual(OutboxEvent.objects.filter(status='delivered').count(), 3)
+        self.assertEqual(outbox_stats()['lag_seconds'], 0)
+
+    def test_failed_delivery_backs_off_then_gives_up(self):
+        self.session.post.side_effect = requests.ConnectionError('refused')
+        result = dispatch_outbox(self.session, max_attempts=2)
+        self.assertEqual(result['retried'], 3)
+        # Backed-off events are not due yet.
+        self.assertEqual(dispatch_outbox(self.session, max_attempts=2)['retried'], 0)
+
+        OutboxEvent.objects.update(available_at=timezone.now())
+        result = dispatch_outbox(self.session, max_attempts=2)
+        self.assertEqual(result['failed'], 3)
+        stats = outbox_stats()
+        self.assertEqual((stats['pending'], stats['failed']), (0, 3))
+
+    def test_outcomes_are_saved_per_event(self):
+        delivered_before = []
+
+        def post(*args, **kwargs):
+            delivered_before.append(OutboxEvent.objects.filter(status='delivered').count())
+            return mock.Mock()
+
+        self.session.post.side_effect = post
+        dispatch_outbox(self.session, timeout=5)
+        self.assertEqual(delivered_before, [0, 1, 2])
+
+    def test_events_past_the_lease_are_left_for_the_next_claim(self):
+        start = timezone.now()
+        times = [start, start]
+        late = start + datetime.timedelta(hours=1)
+        with mock.patch('content.utils.timezone.now', side_effect=lambda: times.pop(0) if times else late):
+            result = dispatch_outbox(self.session, batch_size=3, timeout=5)
+        self.assertEqual(result['delivered'], 1)
+        self.assertEqual(self.session.post.call_count, 1)
+        self.assertEqual(OutboxEvent.objects.filter(status='pending').count(), 2)
+
+
+class PostSchedulerTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_lookups()
+        self.scheduled = PostStatus.objects.create(name='Scheduled', order=3)
+        self.now = timezone.now()
+        posts = self.create_posts(4, status=self.scheduled)
+        for i, post in enumerate(posts):
+            post.scheduled_at = self.now + datetime.timedelta(minutes=i - 2)
+        Post.objects.bulk_update(posts, ['scheduled_at'])
+        self.posts = posts
+
+    def test_fires_only_due_posts(self):
+        scheduler = PostScheduler(owner='a', refresh_seconds=300, clock=lambda: self.now)
+        self.assertEqual(scheduler.run_once(), 3)
+        self.assertEqual(scheduler.next_wakeup(), self.posts[3].scheduled_at)
+        self.assertEqual(Post.objects.filter(status__name='Publishing').count(), 3)
+        self.assertFalse(Post.objects.filter(published_at__isnull=False).exists())
+        self.assertEqual(AutomationLog.objects.filter(action='publish', status='success').count(), 3)
+        self.assertEqual(OutboxEvent.objects.filter(event='publish').count(), 3)
+
+    def test_posts_are_published_when_n8n_reports_success(self):
+        PostScheduler(owner='a', clock=lambda: self.now).run_once()
+        client = APIClient()
+        published_at = self.now + datetime.timedelta(minutes=1)
+        response = client.post(reverse('publish-result'), {
+            'post_id': self.posts[0].id, 'status': 'success', 'published_at': published_at.isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        post = Post.objects.get(id=self.posts[0].id)
+        self.assertEqual(post.status.name, 'Published')
+        self.assertEqual(post.published_at, published_at)
+
+        # A failure report leaves the post queued; a repeated report is ignored.
+        client.post(reverse('publish-result'), {
+            'post_id': self.posts[1].id, 'status': 'failed', 'message': 'rate limited',
+        }, format='json')
+        client.post(reverse('publish-result'), {'post_id': self.posts[0].id, 'status': 'failed'}, format='json')
+        self.assertEqual(Post.objects.get(id=self.posts[1].id).status.name, 'Publishing')
+        self.assertEqual(Post.objects.get(id=self.posts[0].id).status.name, 'Published')
+        failed = AutomationLog.objects.filter(action='publish', status='failed')
+        self.assertEqual(list(failed.values_list('post', 'message')), [(self.posts[1].id, 'rate limited')])
+        self.assertEqual(
+            client.post(reverse('publish-result'), {'post_id': 0, 'status': 'success'}, format='json').status_code,
+            404,
+        )
+
+    def test_leased_posts_are_not_fired_twice(self):
+        first = PostScheduler(owner='a', clock=lambda: self.now)
+        second = PostScheduler(owner='b', clock=lambda: self.now)
+        first.refresh(self.now)
+        second.refresh(self.now)
+        claimed = first.claim(first.pop_due(self.now), self.now)
+        self.assertEqual(len(claimed), 3)
+        self.assertEqual(second.run_once(), 0)
+        self.assertEqual(Post.objects.filter(locked_by='a').count(), 3)
+
+    def test_posts_whose_lease_was_taken_over_are_not_logged(self):
+        first = PostScheduler(owner='a', clock=lambda: self.now)
+        first.refresh(self.now)
+        claimed = first.claim(first.pop_due(self.now), self.now)
+        Post.objects.filter(id=claimed[0].id).update(locked_by='b')
+        self.assertEqual(first.fire(claimed, self.now), 2)
+        self.assertEqual(OutboxEvent.objects.filter(event='publish').count(), 2)
+        self.assertFalse(AutomationLog.objects.filter(post=claimed[0]).exists())
+        self.assertEqual(Post.objects.get(id=claimed[0].id).status, self.scheduled)
+
+    @override_settings(SCHEDULER_RETRY_BASE_SECONDS=30)
+    def test_failing_posts_back_off(self):
+        scheduler = PostScheduler(owner='a', refresh_seconds=0, clock=lambda: self.now)
+        with mock.patch.object(PostScheduler, 'fire', side_effect=RuntimeError('n8n down')):
+            self.assertEqual(scheduler.run_once(), 0)
+            # Held back, so the next pass does not pick them up again.
+            self.assertEqual(scheduler.run_once(), 0)
+        self.assertEqual(AutomationLog.objects.filter(status='failed').count(), 3)
+        held = Post.objects.filter(locked_until=self.now + datetime.timedelta(seconds=30))
+        self.assertEqual(held.count(), 3)
+
+        later = self.now + datetime.timedelta(seconds=31)
+        scheduler.clock = lambda: later
+        with mock.patch.object(PostScheduler, 'fire', side_effect=RuntimeError('n8n down')):
+            scheduler.run_once()
+        self.assertEqual(
+            Post.objects.filter(locked_until=later + datetime.timedelta(seconds=60)).count(), 3
+        )
+
+
+class AutomationLogIngestTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.post = self.create_posts(1)[0]
+
+    def test_batch_inserts_all_entries(self):
+        entries = [
+            {'post_id': self.post.id, 'action': 'publish', 'status': 'success', 'message': 'ok'}
+            for _ in range(50)
+        ] + [{'token': 'batch-1', 'action': 'notify', 'status': 'failed', 'message': 'timeout'}]
+        # One query checks the posts exist, one inserts every entry.
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('automationlog-batch'), entries, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'created': 51})
+        self.assertEqual(AutomationLog.objects.filter(post=self.post).count(), 50)
+
+    def test_batch_rejects_unknown_posts(self):
+        entries = [{'post_id': 999999, 'action': 'publish', 'status': 'success', 'message': 'ok'}]
+        response = self.client.post(reverse('automationlog-batch'), entries, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(AutomationLog.objects.exists())
+
+    def test_rollup_counts_and_deletes_old_rows(self):
+        old = timezone.now() - datetime.timedelta(days=100)
+        AutomationLog.objects.bulk_create(
+            [AutomationLog(post=self.post, action='publish', status='success', message='') for _ in range(5)]
+            + [AutomationLog(post=self.post, action='retry', status='failed', message='') for _ in range(2)]
+        )
+        AutomationLog.objects.update(executed_at=old)
+        recent = AutomationLog.objects.create(post=self.post, action='publish', status='success', message='')
+
+        cutoff = timezone.now() - datetime.timedelta(days=90)
+        self.assertEqual(rollup_automation_logs(cutoff, chunk_size=3), 7)
+        self.assertEqual(list(AutomationLog.objects.values_list('id', flat=True)), [recent.id])
+        self.assertEqual(
+            dict(AutomationLogDailySummary.objects.values_list('action', 'count')),
+            {'publish': 5, 'retry': 2},
+        )
+
+
+class TemporaryMediaMixin:
+    def use_temporary_media_root(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ChunkedUploadTests(TemporaryMediaMixin, ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.post = self.create_posts(1)[0]
+        self.use_temporary_media_root()
+
+    def upload(self, content, chunk_size):
+        response = self.client.post(reverse('upload-session-create'), {
+            'post': self.post.id, 'type': 'video', 'filename': 'clip.MP4', 'size': len(content),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        url = reverse('upload-session', args=[response.data['token']])
+        for offset in range(0, len(content), chunk_size):
+            response = self.client.put(
+                url, content[offset:offset + chunk_size],
+                content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+            )
+            self.assertEqual(response.status_code, 200)
+        return url, response
+
+    def test_chunks_assemble_into_attachment(self):
+        content = bytes(range(256)) * 1000
+        url, response = self.upload(content, 100000)
+        self.assertEqual(response.data['received'], len(content))
+        attachment = Attachment.objects.get(id=response.data['attachment'])
+        self.assertTrue(attachment.file.name.endswith('.mp4'))
+        with attachment.file.open('rb') as fh:
+            self.assertEqual(fh.read(), content)
+
+    def test_identical_content_is_stored_once(self):
+        content = b'same bytes' * 5000
+        self.upload(content, 7000)
+        self.upload(content, 20000)
+        self.assertEqual(Blob.objects.count(), 1)
+        self.assertEqual(len(set(Attachment.objects.values_list('file', flat=True))), 1)
+
+    def test_wrong_offset_reports_received_bytes(self):
+        response = self.client.post(reverse('upload-session-create'), {
+            'post': self.post.id, 'type': 'image', 'filename': 'a.png', 'size': 10,
+        }, format='json')
+        url = reverse('upload-session', args=[response.data['token']])
+        self.client.put(url, b'abcd', content_type='application/octet-stream', HTTP_UPLOAD_OFFSET='0')
+        response = self.client.put(url, b'ijkl', content_type='application/octet-stream', HTTP_UPLOAD_OFFSET='8')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['received'], 4)
+
+    def test_stale_session_cannot_append_at_an_old_offset(self):
+        response = self.client.post(reverse('upload-session-create'), {
+            'post': self.post.id, 'type': 'image', 'filename': 'a.png', 'size': 10,
+        }, format='json')
+        session = UploadSession.objects.get(token=response.data['token'])
+        stale = UploadSession.objects.get(pk=session.pk)
+        uploads.append_chunk(session, io.BytesIO(b'abcd'), 0, 4)
+        # A second request read the session before the first chunk landed.
+        with self.assertRaises(uploads.UploadOffsetMismatch):
+            uploads.append_chunk(stale, io.BytesIO(b'wxyz'), 0, 4)
+        self.assertEqual(stale.received, 4)
+        self.assertEqual(uploads.partial_path(session).read_bytes(), b'abcd')
+
+    def test_abandoned_uploads_expire(self):
+        response = self.client.post(reverse('upload-session-create'), {
+            'post': self.post.id, 'type': 'image', 'filename': 'a.png', 'size': 10,
+        }, format='json')
+        url = reverse('upload-session', args=[response.data['token']])
+        self.client.put(url, b'abcd', content_type='application/octet-stream', HTTP_UPLOAD_OFFSET='0')
+        session = UploadSession.objects.get(token=response.data['token'])
+        self.assertTrue(uploads.partial_path(session).exists())
+
+        self.assertEqual(uploads.expire_uploads(timezone.now() - datetime.timedelta(hours=1)), 0)
+        self.assertEqual(uploads.expire_uploads(timezone.now() + datetime.timedelta(seconds=1)), 1)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(uploads.partial_path(session).exists())
+        self.assertNotIn(session.token, uploads._hashers)
+
+
+class ConcurrentChunkTests(TemporaryMediaMixin, ContentFixturesMixin, TransactionTestCase):
+    class SlowStream(io.BytesIO):
+        """Holds its first read until every racing request has started reading."""
+
+        def __init__(self, data, barrier):
+            super().__init__(data)
+            self.barrier = barrier
+
+        def read(self, size=-1):
+            if self.barrier is not None:
+                self.barrier.wait(timeout=10)
+                self.barrier = None
+            return super().read(size)
+
+    def setUp(self):
+        self.create_lookups()
+        self.post = self.create_posts(1)[0]
+        self.use_temporary_media_root()
+
+    def test_racing_chunks_at_the_same_offset_land_once(self):
+        session = UploadSession.objects.create(post=self.post, type='image', filename='a.png', size=8)
+        barrier = threading.Barrier(2)
+        outcomes = []
+
+        def put(data):
+            try:
+                stale = UploadSession.objects.get(pk=session.pk)
+                outcomes.append(uploads.append_chunk(stale, self.SlowStream(data, barrier), 0, 4))
+            except uploads.UploadOffsetMismatch:
+                outcomes.append('mismatch')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=put, args=(data,)) for data in (b'aaaa', b'bbbb')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        self.assertEqual(sorted(outcomes, key=str), [4, 'mismatch'])
+        self.assertIn(uploads.partial_path(session).read_bytes(), (b'aaaa', b'bbbb'))
+        session.refresh_from_db()
+        self.assertEqual(session.received, 4)
+
+
+class AttachmentRenditionTests(TemporaryMediaMixin, ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.post = self.create_posts(1)[0]
+        self.use_temporary_media_root()
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (2000, 1500), 'teal').save(buffer, 'PNG')
+        upload = SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+        response = self.client.post(
+            reverse('attachment-list'), {'post': self.post.id, 'type': 'image', 'file': upload}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.attachment = Attachment.objects.get(id=response.data['id'])
+        self.url = response.data['renditions']['linkedin']
+
+    def test_rendition_is_generated_then_served_from_cache(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 202)
+        renditions.schedule_rendition(self.attachment.blob, 'linkedin').result(timeout=10)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+        image = Image.open(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual((image.format, image.size), ('JPEG', (1200, 627)))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn(self.attachment.blob.sha256, response['ETag'])
+
+    def test_replacing_the_file_stores_a_new_blob(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (400, 300), 'orange').save(buffer, 'PNG')
+        upload = SimpleUploadedFile('other.png', buffer.getvalue(), content_type='image/png')
+        response = self.client.patch(
+            reverse('attachment-detail', args=[self.attachment.id]), {'file': upload}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 200)
+        old_blob = self.attachment.blob
+        self.attachment.refresh_from_db()
+        self.assertNotEqual(self.attachment.blob_id, old_blob.id)
+        self.assertEqual(self.attachment.file.name, self.attachment.blob.file.name)
+        with self.attachment.blob.file.open('rb') as fh:
+            self.assertEqual(fh.read(), buffer.getvalue())
+
+    def test_unknown_rendition_is_not_found(self):
+        response = self.client.get(reverse('attachment-rendition', args=[self.attachment.id, 'poster']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_render_failure_is_reported(self):
+        with self.attachment.blob.file.open('wb') as fh:
+            fh.write(b'not an image')
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+        with self.assertRaises(Exception):
+            renditions.schedule_rendition(self.attachment.blob, 'linkedin').result(timeout=10)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 422)
+        self.assertIn('UnidentifiedImageError', response.data['error'])
+
+    def test_legacy_attachment_is_hashed_in_the_background(self):
+        Attachment.objects.filter(pk=self.attachment.pk).update(blob=None)
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+        renditions._digests[self.attachment.file.name].result(timeout=10)
+
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+        self.attachment.refresh_from_db()
+        self.assertIsNotNone(self.attachment.blob_id)
+        self.assertNotIn(self.attachment.file.name, renditions._digests)
+
+    def test_missing_legacy_file_is_reported(self):
+        Attachment.objects.filter(pk=self.attachment.pk).update(blob=None)
+        self.attachment.file.storage.delete(self.attachment.file.name)
+        # Hashing a missing file can fail before the first request checks on it.
+        self.assertIn(self.client.get(self.url).status_code, (202, 422))
+        future = renditions._digests.get(self.attachment.file.name)
+        if future is not None:
+            with self.assertRaises(FileNotFoundError):
+                future.result(timeout=10)
+
+        for _ in range(2):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 422)
+            self.assertIn('FileNotFoundError', response.data['error'])
+        self.assertNotIn(self.attachment.file.name, renditions._digests)
+
+    def test_tracked_digests_are_bounded(self):
+        Attachment.objects.filter(pk=self.attachment.pk).update(blob=None)
+        self.attachment.refresh_from_db()
+        with mock.patch.object(renditions, 'MAX_TRACKED_DIGESTS', 1), \
+                mock.patch.object(renditions, '_digests', renditions.OrderedDict()):
+            renditions._digests['older.png'] = mock.Mock()
+            renditions.source_blob(self.attachment)
+            self.assertEqual(list(renditions._digests), [self.attachment.file.name])
+
+
+class PostSearchTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        fulltext._index = None
+        self.addCleanup(setattr, fulltext, '_index', None)
+        posts = self.create_posts(3)
+        posts[0].title, posts[0].body = 'Django performance tips', 'Use select_related to avoid extra queries.'
+        posts[1].title, posts[1].body = 'Weekly update', 'We shipped a faster Django admin and new docs.'
+        posts[2].title, posts[2].body = 'Hiring', 'Join our team in Berlin.'
+        Post.objects.bulk_update(posts, ['title', 'body'])
+        self.posts = posts
+
+    def search(self, q):
+        response = self.client.get(reverse('post-search'), {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_ranks_title_matches_first_with_snippets(self):
+        results = self.search('django')
+        self.assertEqual([r['id'] for r in results], [self.posts[0].id, self.posts[1].id])
+        self.assertIn('<mark>Django</mark>', results[1]['snippet'])
+
+    def test_snippets_escape_post_text(self):
+        post = self.posts[1]
+        post.body = 'Django <script>alert(1)</script> & friends'
+        post.save()
+        snippet = self.search('django')[1]['snippet']
+        self.assertNotIn('<script>', snippet)
+        self.assertIn('<mark>Django</mark> &lt;script&gt;', snippet)
+        hits = fulltext.InMemoryIndex().search('django', 10, 0)
+        self.assertIn('&lt;script&gt;alert(1)&lt;/script&gt; &amp; friends', hits[1].snippet)
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.search('berl'), [self.search('berlin')[0]])
+        post = self.posts[2]
+        post.body = 'Join our team in Tehran.'
+        post.save()
+        self.assertEqual(self.search('berlin'), [])
+        self.assertEqual(len(self.search('tehran')), 1)
+        post.delete()
+        self.assertEqual(self.search('tehran'), [])
+
+    def test_missing_query_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('post-search')).status_code, 400)
+
+    def test_in_memory_index_matches(self):
+        index = fulltext.InMemoryIndex()
+        hits = index.search('django', limit=10, offset=0)
+        self.assertEqual([hit.post_id for hit in hits], [self.posts[0].id, self.posts[1].id])
+        self.assertEqual([hit.post_id for hit in index.search('fast', 10, 0)], [self.posts[1].id])
+        index.remove(self.posts[1].id)
+        self.assertEqual(index.search('faster', 10, 0), [])
+
+
+class TagAutocompleteTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        tags = [Tag.objects.create(name=name) for name in ['Django', 'django-rest', 'Docker', 'Python']]
+        self.create_posts(3, tags=[tags[1]])
+        self.create_posts(1, tags=[tags[0], tags[2]])
+
+    def autocomplete(self, q, **params):
+        response = self.client.get(reverse('tag-autocomplete'), {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(tag['name'], tag['usage']) for tag in response.data]
+
+    def test_prefix_matches_ranked_by_usage(self):
+        self.assertEqual(self.autocomplete('d'), [('django-rest', 3), ('Django', 1), ('Docker', 1)])
+        self.assertEqual(self.autocomplete('DJA'), [('django-rest', 3), ('Django', 1)])
+        self.assertEqual(self.autocomplete('d', limit=1), [('django-rest', 3)])
+        self.assertEqual(self.autocomplete('ruby'), [])
+
+    def test_index_is_served_from_memory_until_tags_change(self):
+        self.autocomplete('py')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.autocomplete('py'), [('Python', 0)])
+        Tag.objects.create(name='pytest')
+        self.assertEqual(self.autocomplete('py'), [('pytest', 0), ('Python', 0)])
+
+    def test_usage_changes_rebuild_at_most_once_per_interval(self):
+        post = Post.objects.first()
+        python = Tag.objects.get(name='Python')
+        self.autocomplete('py')
+        with override_settings(TAG_INDEX_USAGE_INTERVAL=60), self.assertNumQueries(1):
+            PostTag.objects.create(post=post, tag=python)
+            self.assertEqual(self.autocomplete('py'), [('Python', 0)])
+        with override_settings(TAG_INDEX_USAGE_INTERVAL=0):
+            self.assertEqual(self.autocomplete('py'), [('Python', 1)])
+
+    def test_large_prefix_range_uses_bisect(self):
+        index = tag_index.TagPrefixIndex([(i, f'tag-{i:05d}', i % 7) for i in range(20000)])
+        self.assertEqual([name for _, name, _ in index.search('tag-1999', 3)], ['tag-19991', 'tag-19998', 'tag-19990'])
+
+
+class ConditionalGetTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.tag = Tag.objects.create(name='news')
+        self.posts = self.create_posts(3, tags=[self.tag])
+
+    def assertRevalidates(self, url, queries, last_modified=False):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual('Last-Modified' in response, last_modified)
+        with self.assertNumQueries(queries):
+            unchanged = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged['ETag'], etag)
+        return etag
+
+    def assertChanged(self, url, etag):
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_post_list_and_detail_return_not_modified(self):
+        self.assertRevalidates(reverse('post-list'), queries=2)
+        self.assertRevalidates(reverse('post-detail', args=[self.posts[0].id]), queries=2)
+
+    def test_changes_produce_new_etag(self):
+        list_url = reverse('post-list')
+        detail_url = reverse('post-detail', args=[self.posts[0].id])
+        list_etag = self.assertRevalidates(list_url, queries=2)
+        detail_etag = self.assertRevalidates(detail_url, queries=2)
+
+        PostTag.objects.filter(post=self.posts[0]).delete()
+        self.assertChanged(list_url, list_etag)
+        self.assertChanged(detail_url, detail_etag)
+
+    def test_renamed_lookups_and_retargeted_tags_invalidate(self):
+        url = reverse('post-list')
+        etag = self.assertRevalidates(url, queries=2)
+        self.platform.name = 'Instagram'
+        self.platform.save()
+        self.assertChanged(url, etag)
+
+        etag = self.assertRevalidates(url, queries=2)
+        self.published.name = 'Live'
+        self.published.save()
+        self.assertChanged(url, etag)
+
+        etag = self.assertRevalidates(url, queries=2)
+        link = PostTag.objects.filter(post=self.posts[0]).first()
+        link.tag = Tag.objects.create(name='other')
+        link.save()
+        self.assertChanged(url, etag)
+
+    def test_expanded_relations_are_fingerprinted(self):
+        url = reverse('post-list') + '?expand=post_type'
+        etag = self.assertRevalidates(url, queries=2)
+        self.post_type.description = 'Longer text post'
+        self.post_type.save()
+        self.assertChanged(url, etag)
+
+    def test_collections_are_not_revalidated_by_date(self):
+        # A deletion leaves every updated_at alone, so If-Modified-Since
+        # alone must never turn a collection into a 304.
+        url = reverse('tag-list')
+        self.assertNotIn('Last-Modified', self.client.get(url))
+        self.tag.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_tag_detail_keeps_last_modified(self):
+        self.assertRevalidates(reverse('tag-detail', args=[self.tag.id]), queries=1, last_modified=True)
+
+    def test_query_string_is_part_of_etag(self):
+        etag = self.assertRevalidates(reverse('tag-list'), queries=1)
+        response = self.client.get(reverse('tag-list') + '?page_size=1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_campaign_rename_invalidates(self):
+        url = reverse('campaign-list')
+        etag = self.assertRevalidates(url, queries=1)
+        self.campaign.name = 'Relaunch'
+        self.campaign.save()
+        self.assertChanged(url, etag)
+
+
+class PostTransitionTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.url = reverse('post-transition')
+
+    def test_moves_ids_in_one_update_and_logs(self):
+        drafts = self.create_posts(4, status=self.draft)
+        already = self.create_posts(1, status=self.published)[0]
+        ids = [post.id for post in drafts[:3]] + [already.id]
+        published_at = timezone.now().replace(microsecond=0)
+        analytics.rebuild()
+        lookups.get_tables()
+
+        # savepoint, select, update, one update per moved summary row (draft,
+        # published, and the new published week with its insert under a
+        # savepoint), log insert, release
+        with self.assertNumQueries(11):
+            response = self.client.post(self.url, {
+                'ids': ids,
+                'status': self.published.id,
+                'published_at': published_at.isoformat(),
+                'log_action': 'publish',
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['changed'], [post.id for post in drafts[:3]])
+        moved = Post.objects.filter(id__in=response.data['changed'])
+        self.assertTrue(all(post.status_id == self.published.id for post in moved))
+        self.assertTrue(all(post.published_at == published_at for post in moved))
+        self.assertEqual(Post.objects.get(id=drafts[3].id).status_id, self.draft.id)
+        self.assertEqual(AutomationLog.objects.filter(action='publish').count(), 3)
+
+    def test_filter_selection_leaves_published_at(self):
+        self.create_posts(3, status=self.draft)
+        response = self.client.post(self.url, {
+            'filter': {'campaign': self.campaign.id, 'status': self.draft.id},
+            'status': self.published.id,
+        }, format='json')
+        self.assertEqual(len(response.data['changed']), 3)
+        self.assertFalse(Post.objects.filter(published_at__isnull=False).exists())
+        self.assertFalse(AutomationLog.objects.exists())
+
+    def test_requires_exactly_one_selection(self):
+        response = self.client.post(self.url, {'status': self.published.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_empty_filter(self):
+        self.create_posts(2, status=self.draft)
+        response = self.client.post(self.url, {'filter': {}, 'status': self.published.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('filter', response.data)
+        self.assertFalse(Post.objects.filter(status=self.published).exists())
+
+    def test_rejects_oversized_selection(self):
+        self.create_posts(3, status=self.draft)
+        with mock.patch.object(PostViewSet, 'transition_max_size', 2):
+            response = self.client.post(self.url, {
+                'filter': {'status': self.draft.id}, 'status': self.published.id,
+            }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Post.objects.filter(status=self.published).exists())
+
+
+class PostCommentTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.post, self.other = self.create_posts(2)
+        self.authors = [User.objects.create(username=f'author-{i}') for i in range(3)]
+        self.url = reverse('post-comments', args=[self.post.id])
+
+    def test_thread_is_paginated_by_created_at_with_authors(self):
+        for i in range(5):
+            Comment.objects.create(post=self.post, author=self.authors[i % 3], text=f'Comment {i}')
+        Comment.objects.create(post=self.other, author=self.authors[0], text='Elsewhere')
+
+        # post lookup, then the page with its authors joined in
+        with self.assertNumQueries(2):
+            first = self.client.get(self.url + '?page_size=3')
+        self.assertEqual([c['text'] for c in first.data['results']], ['Comment 0', 'Comment 1', 'Comment 2'])
+        self.assertEqual(first.data['results'][1]['author_username'], 'author-1')
+        second = self.client.get(first.data['next'])
+        self.assertEqual([c['text'] for c in second.data['results']], ['Comment 3', 'Comment 4'])
+        self.assertIsNone(second.data['next'])
+
+    def test_unknown_post_is_404(self):
+        self.assertEqual(self.client.get(reverse('post-comments', args=[0])).status_code, 404)
+
+    def test_comment_count_follows_creates_and_deletes(self):
+        response = self.client.post(self.url, {'author': self.authors[0].id, 'text': 'First'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['post'], self.post.id)
+        Comment.objects.create(post=self.post, author=self.authors[1], text='Second')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+
+        Comment.objects.filter(text='First').delete()
+        detail = self.client.get(reverse('post-detail', args=[self.post.id]))
+        self.assertEqual(detail.data['comment_count'], 1)
+
+    def test_comments_cannot_move_between_posts(self):
+        comment = Comment.objects.create(post=self.post, author=self.authors[0], text='Stay')
+        response = self.client.patch(
+            reverse('comment-detail', args=[comment.id]), {'post': self.other.id}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_recount_repairs_bulk_inserts(self):
+        Comment.objects.bulk_create([
+            Comment(post=self.post, author=self.authors[0], text=f'Bulk {i}') for i in range(4)
+        ])
+        recount_comments()
+        self.assertEqual(
+            dict(Post.objects.values_list('id', 'comment_count')), {self.post.id: 4, self.other.id: 0}
+        )
+
+
+class CampaignAnalyticsTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.url = reverse('campaign-analytics', args=[self.campaign.id])
+
+    def make_post(self, **fields):
+        values = {
+            'campaign': self.campaign, 'platform': self.platform, 'post_type': self.post_type,
+            'status': self.draft, 'title': 'Post', 'body': 'Body',
+        }
+        values.update(fields)
+        return Post.objects.create(**values)
+
+    def summary(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_saves_and_deletes_are_counted_incrementally(self):
+        monday = timezone.make_aware(datetime.datetime(2026, 10, 12, 9))
+        post = self.make_post(scheduled_at=monday + datetime.timedelta(days=2))
+        self.make_post()
+        data = self.summary()
+        self.assertEqual(data['status'], {str(self.draft.id): 2})
+        self.assertEqual(data['platform'], {str(self.platform.id): 2})
+        self.assertEqual(data['scheduled_week'], {'2026-10-12': 1})
+
+        post.status = self.published
+        post.published_at = monday + datetime.timedelta(days=7)
+        post.save()
+        data = self.summary()
+        self.assertEqual(data['status'], {str(self.draft.id): 1, str(self.published.id): 1})
+        self.assertEqual(data['published_week'], {'2026-10-19': 1})
+
+        post.delete()
+        data = self.summary()
+        self.assertEqual(data['status'], {str(self.draft.id): 1})
+        self.assertEqual(data['scheduled_week'], {})
+        self.assertEqual(data['published_week'], {})
+
+    def test_unrelated_updates_do_not_touch_the_summary(self):
+        post = self.make_post()
+        post.title = 'Renamed'
+        # post lookup before the save, then the UPDATE itself
+        with self.assertNumQueries(2):
+            post.save()
+        with self.assertNumQueries(1):
+            post.save(update_fields=['title'])
+
+    def test_rebuild_repairs_drift(self):
+        self.make_post()
+        self.create_posts(3)
+        self.assertEqual(self.summary()['status'], {str(self.draft.id): 1})
+        call_command('rebuild_campaign_analytics', '--campaign', str(self.campaign.id), stdout=io.StringIO())
+        self.assertEqual(self.summary()['status'], {str(self.draft.id): 4})
+
+    def test_unknown_campaign_is_404(self):
+        self.assertEqual(self.client.get(reverse('campaign-analytics', args=[0])).status_code, 404)
+
+
+class LookupCacheTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_lookups()
+
+    def test_resolves_ids_and_names_from_memory(self):
+        lookups.get_tables()
+        with self.assertNumQueries(0):
+            self.assertEqual(lookups.get(PostStatus, self.draft.id), self.draft)
+            self.assertEqual(lookups.get_or_create(Platform, 'LinkedIn'), (self.platform, False))
+            self.assertEqual([s.name for s in lookups.all_rows(PostStatus)], ['Draft', 'Published'])
+
+    def test_writes_invalidate_the_snapshot(self):
+        lookups.get_tables()
+        self.platform.name = 'Instagram'
+        self.platform.save()
+        self.assertIsNone(lookups.get_by_name(Platform, 'LinkedIn'))
+        self.assertEqual(lookups.get_by_name(Platform, 'Instagram'), self.platform)
+
+        created = lookups.get_or_create(PostType, 'Video', defaults={'description': 'Clip'})
+        self.assertTrue(created[1])
+        self.assertEqual(lookups.get_or_create(PostType, 'Video'), (created[0], False))
+
+    def test_rows_missing_from_the_snapshot_are_read_from_the_database(self):
+        lookups.get_tables()
+        # As if another worker created it and the bump has not arrived yet.
+        with mock.patch.object(lookups, 'bump_on_commit'):
+            other = PostStatus.objects.create(name='Review', order=3)
+        self.assertNotIn(other.id, lookups.get_tables().by_id[PostStatus])
+        with self.assertNumQueries(1):
+            self.assertEqual(lookups.get(PostStatus, other.id), other)
+        self.assertEqual(lookups.get_by_name(PostStatus, 'Review'), other)
+        self.assertIsNone(lookups.get(PostStatus, 0))
+
+    @override_settings(VERSIONED_CACHE_CHECK_INTERVAL=60)
+    def test_version_is_read_once_per_interval(self):
+        lookups.get_tables()
+        with mock.patch.object(versioned_cache, 'current_version') as current_version:
+            lookups.get_tables()
+            lookups.get_tables()
+        current_version.assert_not_called()
+
+        # A write elsewhere shows up once the interval has passed.
+        versioned_cache.cache.incr(lookups.VERSION_KEY)
+        before = lookups.get_tables()
+        self.assertIs(lookups.get_tables(), before)
+        with override_settings(VERSIONED_CACHE_CHECK_INTERVAL=0):
+            self.assertIsNot(lookups.get_tables(), before)
+
+    def test_bump_recreates_a_missing_version(self):
+        versioned_cache.cache.delete(lookups.VERSION_KEY)
+        with mock.patch.object(versioned_cache.cache, 'add', return_value=False) as add, \
+                mock.patch.object(versioned_cache.cache, 'incr', side_effect=[ValueError, 7]) as incr:
+            versioned_cache.bump(lookups.VERSION_KEY)
+        add.assert_called_once()
+        self.assertEqual(incr.call_count, 2)
+
+    def test_post_serializer_validates_lookups_without_queries(self):
+        lookups.get_tables()
+        data = {
+            'campaign': self.campaign.id, 'platform': self.platform.id,
+            'post_type': self.post_type.id, 'status': self.draft.id,
+            'title': 'Hello', 'body': 'World', 'tags': [],
+        }
+        with self.assertNumQueries(0):
+            serializer = PostSerializer(data=data)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['status'], self.draft)
+
+        serializer = PostSerializer(data={**data, 'status': 0})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('status', serializer.errors)
+
+
+class SparseFieldsetTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.tags = [Tag.objects.create(name=f'tag-{i}') for i in range(2)]
+        self.create_posts(5, tags=self.tags)
+
+    def get(self, query):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('post-list') + query)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries.captured_queries]
+
+    def test_fields_limit_output_and_columns(self):
+        response, queries = self.get('?fields=id,title,status_name')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'status_name'})
+        page_query = queries[-1]
+        self.assertIn('"content_post"."title"', page_query)
+        self.assertNotIn('"content_post"."body"', page_query)
+        self.assertNotIn('"content_campaign"', page_query)
+        # No tag prefetch when tags are not requested.
+        self.assertFalse(any('content_posttag' in sql for sql in queries[2:]))
+
+    def test_expand_loads_relations_in_bulk(self):
+        response, queries = self.get('?fields=id,campaign,tags&expand=campaign,tags')
+        row = response.data['results'][0]
+        self.assertEqual(row['campaign']['name'], 'Launch')
+        self.assertEqual(sorted(tag['name'] for tag in row['tags']), ['tag-0', 'tag-1'])
+        # Two ETag aggregate queries, the joined page and one tag prefetch.
+        self.assertEqual(len(queries), 4)
+
+    def test_expanded_post_loads_its_own_relations_in_bulk(self):
+        author = User.objects.create(username='author')
+        for post in Post.objects.all():
+            Comment.objects.create(post=post, author=author, text='Nice')
+            Attachment.objects.create(post=post, type='image', file=f'attachments/{post.id}.png')
+        # The joined page and one tag prefetch, however many rows.
+        for name in ('comment-list', 'attachment-list'):
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse(name) + '?expand=post')
+            self.assertEqual(response.status_code, 200)
+            row = response.data['results'][0]
+            self.assertEqual(row['post']['campaign_name'], 'Launch')
+            self.assertEqual(len(row['post']['tags']), 2)
+
+    def test_unknown_names_are_rejected(self):
+        self.assertEqual(self.client.get(reverse('post-list') + '?fields=nope').status_code, 400)
+        self.assertEqual(self.client.get(reverse('post-list') + '?expand=body').status_code, 400)
+
+    def test_writes_ignore_fieldsets(self):
+        post = Post.objects.first()
+        response = self.client.patch(
+            reverse('post-detail', args=[post.id]) + '?fields=id', {'title': 'Renamed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Renamed')
+
+
+class FastJSONAndCompressionTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_lookups()
+        self.create_posts(30, tags=[Tag.objects.create(name='news line')])
+
+    def test_fast_renderer_matches_stdlib_output(self):
+        data = PostSerializer(Post.objects.all(), many=True).data
+        fast = FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+        self.assertTrue(json.loads(fast)[0]['created_at'].endswith('Z'))
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(fast)), json.loads(fast))
+
+    def test_large_responses_are_gzipped_for_clients_that_accept_it(self):
+        response = self.client.get(reverse('post-list'), HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))['results']), 30)
+
+        plain = self.client.get(reverse('post-list'), HTTP_ACCEPT_ENCODING='identity')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        small = self.client.get(reverse('poststatus-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+    def test_brotli_is_preferred_when_available(self):
+        fake_brotli = mock.Mock()
+        fake_brotli.compress.return_value = b'compressed'
+        with mock.patch('campaign_manager.middleware.brotli', fake_brotli):
+            response = self.client.get(reverse('post-list'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(response.content, b'compressed')
+
+    def test_renderer_benchmark_runs(self):
+        out = io.StringIO()
+        call_command('benchmark_renderers', '--dataset', 'post', '--rows', '10', '--repeat', '1', stdout=out)
+        self.assertIn('post: 10 rows', out.getvalue())
+
+
+class BulkSeedDataTests(TestCase):
+    def seed(self, *args):
+        call_command(
+            'seed_data', '--bulk', '--clean', '--seed', '7', '--number', '25', '--change-items', '12',
+            '--discovered', '15', '--fetch-logs', '10', '--batch-size', '4', *args, stdout=io.StringIO(),
+        )
+        return {
+            'posts': list(Post.objects.order_by('id').values_list('title', 'scheduled_at', 'comment_count')),
+            'tags': PostTag.objects.count(),
+            'discovered': list(DiscoveredContent.objects.order_by('id').values_list('canonical_url', flat=True)),
+            'change_items': ChangeItem.objects.count(),
+            'fetch_logs': FetchLog.objects.count(),
+        }
+
+    def test_same_seed_gives_the_same_rows(self):
+        first = self.seed()
+        self.assertEqual(len(first['posts']), 25)
+        self.assertEqual(len(first['discovered']), 15)
+        self.assertEqual((first['change_items'], first['fetch_logs']), (12, 10))
+        self.assertEqual(first, self.seed('--workers', '2'))
+
+    def test_runs_without_a_seed_differ(self):
+        titles = []
+        for _ in range(2):
+            call_command(
+                'seed_data', '--bulk', '--clean', '--number', '5', '--batch-size', '4', stdout=io.StringIO()
+            )
+            titles.append(list(Post.objects.order_by('id').values_list('title', flat=True)))
+        self.assertNotEqual(titles[0], titles[1])
+
+    def test_fetch_logs_keep_their_generated_start(self):
+        self.seed()
+        self.assertFalse(FetchLog.objects.filter(started_at__gte=timezone.now() - datetime.timedelta(days=1)).exists())
+
+    def test_bulk_rows_keep_counts_and_analytics_current(self):
+        self.seed()
+        for post in Post.objects.all()[:5]:
+            self.assertEqual(post.comment_count, post.comments.count())
+        campaign = Post.objects.first().campaign
+        summary = analytics.campaign_summary(campaign.id)
+        self.assertEqual(sum(summary['status'].values()), Post.objects.filter(campaign=campaign).count())
+
+    def test_scale_options_require_bulk(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_data', '--discovered', '10', stdout=io.StringIO())
+
+
+class BenchmarkApiTests(ContentFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_lookups()
+        self.create_posts(5)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def benchmark(self, *args):
+        call_command(
+            'benchmark_api', '--current-db', '--endpoint', 'content:posts', '--requests', '3', '--warmup', '1',
+            *args, stdout=io.StringIO(),
+        )
+
+    def test_results_are_saved_and_compared_with_a_baseline(self):
+        output = f'{self.tmp_dir}/baseline.json'
+        self.benchmark('--output', output)
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual(sorted(results['endpoints']), ['content:posts-detail', 'content:posts-list'])
+        listing = results['endpoints']['content:posts-list']
+        self.assertEqual(listing['requests'], 3)
+        self.assertEqual(listing['queries'], 4)
+        self.assertLessEqual(listing['p50_ms'], listing['p95_ms'])
+        self.assertLessEqual(listing['p95_ms'], listing['p99_ms'])
+
+        # Latency may wobble, queries may not.
+        self.benchmark('--baseline', output, '--threshold', '100')
+        listing['queries'] = 3
+        with open(output, 'w') as f:
+            json.dump(results, f)
+        with self.assertRaisesMessage(CommandError, '1 regression(s)'):
+            self.benchmark('--baseline', output, '--threshold', '100')
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Attachment, Blob, UploadSession
+
+BLOCK_SIZE = 64 * 1024
+MAX_TRACKED_UPLOADS = 256
+
+# Running SHA-256 of the uploads this process handled last, keyed by token,
+# as (hasher, bytes hashed). When a chunk lands on another worker, or the
+# entry is evicted, it goes stale and the finished file is hashed from disk
+# instead. Least recently used entries are dropped past MAX_TRACKED_UPLOADS,
+# so abandoned uploads do not pile up.
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+# Stands in for the per-session file lock where fcntl is unavailable.
+_append_lock = threading.Lock()
+
+
+class UploadOffsetMismatch(Exception):
+    """The chunk does not start where the previous one ended."""
+
+
+def partial_path(session):
+    root = getattr(settings, "UPLOAD_PARTIAL_DIR", None) or Path(settings.MEDIA_ROOT) / "uploads" / "partial"
+    return Path(root) / f"{session.token}.part"
+
+
+def lock_path(session):
+    return partial_path(session).with_suffix(".lock")
+
+
+@contextmanager
+def session_lock(session):
+    """
+    Holds an exclusive lock on the upload across threads and processes.
+    Row locks cannot be relied on for this: SQLite ignores
+    ``select_for_update``.
+    """
+    path = lock_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        with _append_lock:
+            yield
+        return
+    with open(path, "a+b") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def blob_name(digest, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    return f"blobs/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+def hash_file(fh):
+    hasher = hashlib.sha256()
+    for block in iter(lambda: fh.read(BLOCK_SIZE), b""):
+        hasher.update(block)
+    return hasher.hexdigest()
+
+
+def store_blob(fh, filename, digest=None):
+    """
+    Returns the Blob holding the content of ``fh``, storing it if it is new.
+
+    ``fh`` is read in blocks, never as a whole. Pass ``digest`` when the
+    SHA-256 is already known to skip hashing.
+    """
+    if digest is None:
+        digest = hash_file(fh)
+    blob = Blob.objects.filter(sha256=digest).first()
+    if blob is not None:
+        return blob
+
+    fh.seek(0)
+    name = default_storage.save(blob_name(digest, filename), File(fh))
+    blob, created = Blob.objects.get_or_create(
+        sha256=digest, defaults={"file": name, "size": default_storage.size(name)}
+    )
+    if not created:
+        # Another upload stored the same content first.
+        default_storage.delete(name)
+    return blob
+
+
+def track_hasher(token, hasher, hashed):
+    with _hashers_lock:
+        _hashers[token] = (hasher, hashed)
+        _hashers.move_to_end(token)
+        while len(_hashers) > MAX_TRACKED_UPLOADS:
+            _hashers.popitem(last=False)
+
+
+def pop_hasher(token):
+    with _hashers_lock:
+        return _hashers.pop(token, (None, None))
+
+
+def append_chunk(session, stream, offset, length):
+    """
+    Streams ``length`` bytes from ``stream`` onto the upload at ``offset``.
+
+    ``offset`` must equal the bytes received so far; anything a previously
+    interrupted chunk left beyond it is discarded. The chunk is first read
+    into a file of its own, then appended under ``session_lock`` after
+    ``received`` is checked again, so two requests racing for the same
+    offset cannot both land. Returns the new offset.
+    """
+    if offset != session.received:
+        raise UploadOffsetMismatch
+    if offset + length > session.size:
+        raise ValueError("Chunk extends past the declared upload size.")
+
+    path = partial_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunk_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.chunk")
+    try:
+        with open(chunk_path, "wb") as fh:
+            remaining = length
+            while remaining:
+                block = stream.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                fh.write(block)
+                remaining -= len(block)
+        with session_lock(session), transaction.atomic():
+            return _append(session, path, chunk_path, offset, offset + length - remaining)
+    finally:
+        chunk_path.unlink(missing_ok=True)
+
+
+def _append(session, path, chunk_path, offset, received):
+    session.received = (
+        UploadSession.objects.select_for_update().values_list("received", flat=True).get(pk=session.pk)
+    )
+    if offset != session.received:
+        raise UploadOffsetMismatch
+
+    hasher, hashed = pop_hasher(session.token)
+    if offset == 0:
+        hasher, hashed = hashlib.sha256(), 0
+    tracking = hasher is not None and hashed == offset
+
+    with open(path, "r+b" if path.exists() else "wb") as fh, open(chunk_path, "rb") as chunk:
+        fh.seek(offset)
+        fh.truncate()
+        for block in iter(lambda: chunk.read(BLOCK_SIZE), b""):
+            fh.write(block)
+            if tracking:
+                hasher.update(block)
+
+    UploadSession.objects.filter(pk=session.pk).update(received=received, updated_at=timezone.now())
+    session.received = received
+    if tracking:
+        track_hasher(session.token, hasher, received)
+    return received
+
+
+def expire_uploads(cutoff):
+    """
+    Deletes the unfinished uploads not touched since ``cutoff``, with their
+    partial files. Returns the number of sessions deleted.
+    """
+    sessions = list(UploadSession.objects.filter(attachment__isnull=True, updated_at__lt=cutoff))
+    for session in sessions:
+        partial_path(session).unlink(missing_ok=True)
+        lock_path(session).unlink(missing_ok=True)
+        pop_hasher(session.token)
+    UploadSession.objects.filter(id__in=[session.id for session in sessions]).delete()
+    return len(sessions)
+
+
+def finish_upload(session):
+    """Turns a fully received upload into an Attachment backed by a shared Blob."""
+    path = partial_path(session)
+    hasher, hashed = pop_hasher(session.token)
+    digest = hasher.hexdigest() if hasher is not None and hashed == session.size else None
+
+    with open(path, "rb") as fh:
+        blob = store_blob(fh, session.filename, digest=digest)
+
+    with transaction.atomic():
+        attachment = Attachment.objects.create(
+            post_id=session.post_id, type=session.type, file=blob.file.name, blob=blob
+        )
+        session.attachment = attachment
+        session.save(update_fields=["attachment", "updated_at"])
+    path.unlink(missing_ok=True)
+    lock_path(session).unlink(missing_ok=True)
+    return attachment
+
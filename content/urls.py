@@ -10,10 +10,16 @@ from .views import (
     PostTagViewSet,
     AttachmentViewSet,
     CommentViewSet,
+    PostCommentListView,
     AutomationLogViewSet,
     DraftBatchCreateView,
     DraftBatchApproveView,
     DraftBatchReviseView,
+    PublishResultView,
+    PostBoardView,
+    OutboxStatsView,
+    UploadSessionCreateView,
+    UploadSessionView,
 )
 
 router = DefaultRouter()
@@ -33,4 +39,10 @@ urlpatterns = [
     path('drafts/', DraftBatchCreateView.as_view(), name='draft-batch-create'),
     path('approve/', DraftBatchApproveView.as_view(), name='draft-batch-approve'),
     path('revise/', DraftBatchReviseView.as_view(), name='draft-batch-revise'),
+    path('publish-result/', PublishResultView.as_view(), name='publish-result'),
+    path('posts/<int:post_id>/comments/', PostCommentListView.as_view(), name='post-comments'),
+    path('board/', PostBoardView.as_view(), name='post-board'),
+    path('outbox/stats/', OutboxStatsView.as_view(), name='outbox-stats'),
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('uploads/<str:token>/', UploadSessionView.as_view(), name='upload-session'),
 ]
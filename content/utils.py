@@ -1,25 +1,176 @@
 # content/utils.py
+import datetime
+
 import requests
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .models import OutboxEvent, AutomationLog, AutomationLogDailySummary
+
 
 def notify_n8n(batch, event="approved"):
     """
-    Sends a webhook to n8n when a batch changes status (e.g. approved or revised).
-    """
-    n8n_url = getattr(settings, "N8N_WEBHOOK_URL", None)
-    if not n8n_url:
-        print("⚠️ N8N_WEBHOOK_URL not set in settings.py")
-        return
+    Queues a webhook to n8n when a batch changes status (e.g. approved or revised).
 
+    The event is written to the outbox, so calling this inside the transaction
+    that changes the batch makes the notification commit (or roll back) with
+    it. The dispatch_outbox command delivers it.
+    """
     payload = {
         "token": batch.token,
         "status": batch.status,
         "chapter_id": batch.chapter_id,
         "event": event,
     }
+    return OutboxEvent.objects.create(event=event, payload=payload)
+
+
+def build_webhook_session(pool_size=10):
+    """Returns a requests session that keeps connections to n8n alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def retry_delay(attempts):
+    """Exponential backoff for the given number of failed attempts."""
+    base = getattr(settings, "OUTBOX_RETRY_BASE_SECONDS", 5)
+    cap = getattr(settings, "OUTBOX_RETRY_MAX_SECONDS", 3600)
+    return datetime.timedelta(seconds=min(cap, base * 2 ** (attempts - 1)))
+
+
+def claim_outbox_events(batch_size, lease_seconds=60):
+    """
+    Claims up to ``batch_size`` due events.
+
+    Claimed events get their ``available_at`` pushed forward by a lease, so
+    several dispatchers can run side by side without delivering an event
+    twice; an event whose dispatcher died becomes due again once the lease
+    expires. Returns ``(events, lease_expiry)``.
+    """
+    now = timezone.now()
+    lease_expiry = now + datetime.timedelta(seconds=lease_seconds)
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", available_at__lte=now)
+            .order_by("available_at", "id")[:batch_size]
+        )
+        OutboxEvent.objects.filter(id__in=[e.id for e in events]).update(available_at=lease_expiry)
+    return events, lease_expiry
+
+
+def dispatch_outbox(session, batch_size=100, max_attempts=8, timeout=5):
+    """
+    Delivers one batch of due outbox events and records the outcomes.
+
+    Returns a dict with the number of ``delivered``, ``retried`` and
+    ``failed`` events. Events that keep failing are given up on after
+    ``max_attempts`` tries and left with status ``failed``.
+
+    The lease covers every event of the batch timing out on both connect
+    and read. Each outcome is saved as soon as it is known, and events whose
+    turn comes after the lease has run out are left for the next claim
+    instead of risking a second delivery.
+    """
+    n8n_url = getattr(settings, "N8N_WEBHOOK_URL", None)
+    result = {"delivered": 0, "retried": 0, "failed": 0}
+    if not n8n_url:
+        return result
+
+    events, lease_expiry = claim_outbox_events(batch_size, lease_seconds=batch_size * timeout * 2 + 30)
+    for event in events:
+        if timezone.now() + datetime.timedelta(seconds=timeout * 2) > lease_expiry:
+            break
+        event.attempts += 1
+        try:
+            resp = session.post(n8n_url, json=event.payload, timeout=timeout)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            event.last_error = str(e)
+            if event.attempts >= max_attempts:
+                event.status = "failed"
+                result["failed"] += 1
+            else:
+                event.available_at = timezone.now() + retry_delay(event.attempts)
+                result["retried"] += 1
+        else:
+            event.status = "delivered"
+            event.delivered_at = timezone.now()
+            event.last_error = None
+            result["delivered"] += 1
+        event.save(update_fields=["status", "attempts", "available_at", "last_error", "delivered_at"])
+    return result
+
+
+def outbox_stats():
+    """
+    Returns outbox counts per status and the lag of the oldest pending event.
+
+    ``lag_seconds`` is how long the oldest undelivered event has been waiting,
+    or 0 when the outbox is drained.
+    """
+    counts = dict(OutboxEvent.objects.values_list("status").annotate(total=Count("id")))
+    oldest = OutboxEvent.objects.filter(status="pending").aggregate(oldest=Min("created_at"))["oldest"]
+    return {
+        "pending": counts.get("pending", 0),
+        "delivered": counts.get("delivered", 0),
+        "failed": counts.get("failed", 0),
+        "lag_seconds": (timezone.now() - oldest).total_seconds() if oldest else 0,
+    }
+
+
+def rollup_automation_logs(cutoff, chunk_size=5000):
+    """
+    Folds AutomationLog rows executed before ``cutoff`` into daily summaries.
+
+    Rows are processed ``chunk_size`` at a time; each chunk is counted into
+    AutomationLogDailySummary and deleted in the same transaction, so an
+    interrupted run never counts a row twice. Returns the number of rows
+    rolled up.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                AutomationLog.objects.filter(executed_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[:chunk_size]
+            )
+            if not ids:
+                return total
+
+            counts = (
+                AutomationLog.objects.filter(id__in=ids)
+                .annotate(date=TruncDate("executed_at"))
+                .values_list("date", "action", "status")
+                .annotate(total=Count("id"))
+                .order_by()
+            )
+            counts = {(date, action, status): n for date, action, status, n in counts}
+            existing = {
+                (summary.date, summary.action, summary.status): summary
+                for summary in AutomationLogDailySummary.objects.select_for_update().filter(
+                    date__in={key[0] for key in counts}
+                )
+            }
+            created, updated = [], []
+            for key, n in counts.items():
+                if key in existing:
+                    existing[key].count += n
+                    updated.append(existing[key])
+                else:
+                    created.append(AutomationLogDailySummary(
+                        date=key[0], action=key[1], status=key[2], count=n
+                    ))
+            AutomationLogDailySummary.objects.bulk_update(updated, ["count"])
+            AutomationLogDailySummary.objects.bulk_create(created)
 
-    try:
-        resp = requests.post(n8n_url, json=payload, timeout=5)
-        print(f"✅ Notified n8n ({event}):", resp.status_code)
-    except Exception as e:
-        print("❌ Failed to notify n8n:", e)
+            AutomationLog.objects.filter(id__in=ids).delete()
+            total += len(ids)
@@ -0,0 +1,113 @@
+"""
+Process-local snapshots invalidated through version counters in the Django
+cache.
+
+Each process builds a snapshot once and serves it from memory until one of
+its version counters moves or it is older than its TTL. Writers bump the
+counters from signals: once straight away, so the writing process sees its
+own change, and again when the transaction commits, so no process keeps a
+snapshot it rebuilt from the database before the commit.
+
+Reading the counters costs a cache round trip, so a snapshot reads them at
+most once per ``VERSIONED_CACHE_CHECK_INTERVAL`` seconds; a bump made in
+this process is seen on the next call.
+
+The bump only reaches other processes through a cache backend they share
+(see ``CACHES`` in the settings); with a per-process ``LocMemCache`` other
+workers pick up changes only when the TTL expires.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def current_version(key):
+    # Seed a missing counter with the clock, so an evicted key can never
+    # come back as a version some process already built from.
+    return cache.get_or_set(key, time.time_ns, timeout=None)
+
+
+# How many times this process bumped each key, so its own writes are seen
+# without waiting for the next read of the shared counters.
+_local_bumps = {}
+
+
+def bump(key):
+    _local_bumps[key] = _local_bumps.get(key, 0) + 1
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter is missing. Seeding it with the clock is a move for
+        # every reader; if another writer seeded it first, count this bump
+        # on top so neither is lost.
+        if not cache.add(key, time.time_ns(), timeout=None):
+            cache.incr(key)
+
+
+def bump_on_commit(key):
+    """Bump ``key`` now and again once the current transaction commits."""
+    bump(key)
+    transaction.on_commit(lambda: bump(key))
+
+
+class VersionedSnapshot:
+    """
+    The result of ``build()``, rebuilt when a version key moves or after
+    ``ttl()`` seconds.
+
+    ``keys`` maps each version key to the number of seconds a snapshot is
+    kept after that key moved, or a callable returning it: 0 rebuilds on
+    the next call, more throttles rebuilds for changes that may be served
+    stale for a while.
+    """
+
+    def __init__(self, build, keys, ttl):
+        self.build = build
+        self.keys = keys
+        self.ttl = ttl
+        self.value = None
+        self.versions = None
+        self.built_at = None
+        self.seen = None
+        self.local_bumps = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    def stale(self, versions):
+        if self.value is None:
+            return True
+        age = time.monotonic() - self.built_at
+        if age > self.ttl():
+            return True
+        return any(
+            versions[key] != self.versions[key] and age >= (delay() if callable(delay) else delay)
+            for key, delay in self.keys.items()
+        )
+
+    def current_versions(self):
+        """The version of each key, read from the cache at most once per interval."""
+        now = time.monotonic()
+        local_bumps = {key: _local_bumps.get(key, 0) for key in self.keys}
+        interval = getattr(settings, 'VERSIONED_CACHE_CHECK_INTERVAL', 1)
+        if (
+            self.checked_at is None
+            or now - self.checked_at >= interval
+            or local_bumps != self.local_bumps
+        ):
+            self.seen = {key: current_version(key) for key in self.keys}
+            self.local_bumps = local_bumps
+            self.checked_at = now
+        return self.seen
+
+    def get(self):
+        versions = self.current_versions()
+        if self.stale(versions):
+            with self.lock:
+                if self.stale(versions):
+                    self.value = self.build()
+                    self.versions = versions
+                    self.built_at = time.monotonic()
+        return self.value
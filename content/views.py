@@ -1,5 +1,17 @@
-from rest_framework import viewsets, views, status
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from rest_framework import generics, serializers, viewsets, views, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from campaign_manager.conditional import ConditionalGetMixin
+from campaign_manager.fieldsets import FieldsetViewMixin
+from campaign_manager.pagination import KeysetPagination
 from .models import (
     Campaign,
     Platform,
@@ -12,6 +24,7 @@ from .models import (
     Comment,
     AutomationLog,
     DraftBatch,
+    UploadSession,
 )
 from .serializers import (
     CampaignSerializer,
@@ -27,7 +40,15 @@ from .serializers import (
     DraftBatchCreateSerializer,
     DraftBatchApproveSerializer,
     DraftBatchReviseSerializer,
+    PublishResultSerializer,
     AutomationLogCreateSerializer,
+    AutomationLogBatchSerializer,
+    PostBoardQuerySerializer,
+    PostCommentSerializer,
+    PostSearchQuerySerializer,
+    PostTransitionSerializer,
+    TagAutocompleteQuerySerializer,
+    UploadSessionSerializer,
 )
 
 class DraftBatchCreateView(views.APIView):
@@ -45,38 +66,57 @@ class DraftBatchApproveView(views.APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         token = serializer.validated_data['token']
-        try:
-            draft_batch = DraftBatch.objects.get(token=token)
-        except DraftBatch.DoesNotExist:
-            return Response({'error': 'DraftBatch not found.'}, status=status.HTTP_404_NOT_FOUND)
-
-        # Create Post objects
-        campaign, _ = Campaign.objects.get_or_create(name='Default Campaign')
-        platform, _ = Platform.objects.get_or_create(name='Default Platform')
-        post_type, _ = PostType.objects.get_or_create(name='Text')
-        status_obj, _ = PostStatus.objects.get_or_create(name='Approved', defaults={'order': 1})
-
-        for post_data in draft_batch.posts:
-            Post.objects.create(
-                title=post_data['title'],
-                body=post_data['body'],
-                campaign=campaign,
-                platform=platform,
-                post_type=post_type,
-                status=status_obj,
-            )
+        with transaction.atomic():
+            try:
+                draft_batch = DraftBatch.objects.select_for_update().get(token=token)
+            except DraftBatch.DoesNotExist:
+                return Response({'error': 'DraftBatch not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+            # n8n retries approvals; a batch that is already approved has its
+            # posts already, so answer without touching anything else.
+            if draft_batch.status == 'approved':
+                return Response({'status': 'approved'}, status=status.HTTP_200_OK)
+
+            from . import lookups
+            campaign, _ = lookups.get_or_create(Campaign, 'Default Campaign')
+            platform, _ = lookups.get_or_create(Platform, 'Default Platform')
+            post_type, _ = lookups.get_or_create(PostType, 'Text')
+            status_obj, _ = lookups.get_or_create(PostStatus, 'Approved', defaults={'order': 1})
+
+            # Posts may name their lesson; a single-lesson batch applies to all.
+            lesson_ids = set(draft_batch.lessons.values_list('id', flat=True))
+            default_lesson_id = next(iter(lesson_ids)) if len(lesson_ids) == 1 else None
+
+            posts = Post.objects.bulk_create([
+                Post(
+                    title=post_data['title'],
+                    body=post_data['body'],
+                    campaign=campaign,
+                    platform=platform,
+                    post_type=post_type,
+                    status=status_obj,
+                    lesson_id=(
+                        post_data['lesson_id']
+                        if post_data.get('lesson_id') in lesson_ids
+                        else default_lesson_id
+                    ),
+                )
+                for post_data in draft_batch.posts
+            ], batch_size=500)
+            from .analytics import record_changes, row_of
+            record_changes(after=[row_of(post) for post in posts])
 
-        draft_batch.status = 'approved'
-        draft_batch.save()
+            draft_batch.status = 'approved'
+            draft_batch.save(update_fields=['status', 'updated_at'])
 
-        # Mark lessons and chapter as processed
-        draft_batch.lessons.update(processed=True)
-        if not draft_batch.chapter.lessons.filter(processed=False).exists():
-            draft_batch.chapter.processed = True
-            draft_batch.chapter.save()
+            # Mark lessons and chapter as processed
+            draft_batch.lessons.update(processed=True)
+            if not draft_batch.chapter.lessons.filter(processed=False).exists():
+                draft_batch.chapter.processed = True
+                draft_batch.chapter.save(update_fields=['processed'])
 
-        from .utils import notify_n8n
-        notify_n8n(draft_batch, event="approved")
+            from .utils import notify_n8n
+            notify_n8n(draft_batch, event="approved")
 
         return Response({'status': 'approved'}, status=status.HTTP_200_OK)
 
@@ -89,62 +129,456 @@ class DraftBatchReviseView(views.APIView):
 
         token = serializer.validated_data['token']
         feedback = serializer.validated_data['feedback']
-        try:
-            draft_batch = DraftBatch.objects.get(token=token)
-        except DraftBatch.DoesNotExist:
-            return Response({'error': 'DraftBatch not found.'}, status=status.HTTP_404_NOT_FOUND)
+        with transaction.atomic():
+            try:
+                draft_batch = DraftBatch.objects.select_for_update().get(token=token)
+            except DraftBatch.DoesNotExist:
+                return Response({'error': 'DraftBatch not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        draft_batch.status = 'revised'
-        draft_batch.feedback = feedback
-        draft_batch.save()
+            draft_batch.status = 'revised'
+            draft_batch.feedback = feedback
+            draft_batch.save()
 
-        from .utils import notify_n8n
-        notify_n8n(draft_batch, event="revised")
+            from .utils import notify_n8n
+            notify_n8n(draft_batch, event="revised")
 
         return Response({'status': 'revised'}, status=status.HTTP_200_OK)
 
 
-class CampaignViewSet(viewsets.ModelViewSet):
+class PublishResultView(views.APIView):
+    """n8n reports here whether it published a post the scheduler handed it."""
+    def post(self, request, *args, **kwargs):
+        serializer = PublishResultSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        if not Post.objects.filter(id=data['post_id']).exists():
+            return Response({'error': 'Post not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        from .scheduler import confirm_publish
+        confirm_publish(
+            data['post_id'],
+            data.get('published_at') or timezone.now(),
+            succeeded=data['status'] == 'success',
+            message=data['message'],
+        )
+        return Response({'status': data['status']}, status=status.HTTP_200_OK)
+
+
+class UploadSessionCreateView(views.APIView):
+    def post(self, request, *args, **kwargs):
+        serializer = UploadSessionSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UploadSessionView(views.APIView):
+    """
+    Resumable upload of one file.
+
+    ``GET`` reports how many bytes have been received. ``PUT`` appends the
+    raw request body at the byte offset given in the ``Upload-Offset``
+    header, streaming it to disk; the chunk that completes the file turns
+    the upload into an Attachment.
+    """
+
+    def get_session(self, token):
+        try:
+            return UploadSession.objects.get(token=token)
+        except UploadSession.DoesNotExist:
+            return None
+
+    def get(self, request, token, *args, **kwargs):
+        session = self.get_session(token)
+        if session is None:
+            return Response({'error': 'Upload not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_200_OK)
+
+    def put(self, request, token, *args, **kwargs):
+        from .uploads import UploadOffsetMismatch, append_chunk, finish_upload
+
+        session = self.get_session(token)
+        if session is None:
+            return Response({'error': 'Upload not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if session.attachment_id:
+            return Response(UploadSessionSerializer(session).data, status=status.HTTP_200_OK)
+
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'Upload-Offset and Content-Length headers are required.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            append_chunk(session, request.stream, offset, length)
+        except UploadOffsetMismatch:
+            return Response(
+                {'error': 'Offset does not match the bytes received.', 'received': session.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if session.received == session.size:
+            finish_upload(session)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_200_OK)
+
+
+class OutboxStatsView(views.APIView):
+    def get(self, request, *args, **kwargs):
+        from .utils import outbox_stats
+        return Response(outbox_stats(), status=status.HTTP_200_OK)
+
+
+class PostBoardPagination(KeysetPagination):
+    page_size = 20
+
+
+class PostBoardView(generics.GenericAPIView):
+    """
+    Kanban board of posts grouped by PostStatus.
+
+    Without a ``status`` parameter every column is returned with its total
+    count, the first ``page_size`` cards and a ``next`` link. The board is
+    built from the status list, one aggregate, one windowed query and the
+    tag prefetch, however many posts there are. Following a column's
+    ``next`` link (``?status=<id>&cursor=...``) pages through that single
+    column.
+    """
+    queryset = Post.objects.select_related(
+        'campaign', 'platform', 'status'
+    ).prefetch_related('tags')
+    serializer_class = PostSerializer
+    pagination_class = PostBoardPagination
+    ordering = ('scheduled_at', 'id')
+
+    def get(self, request, *args, **kwargs):
+        params = PostBoardQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = {
+            f'{name}_id': value for name, value in params.validated_data.items()
+        }
+        queryset = self.get_queryset().filter(**filters)
+
+        if 'status' in params.validated_data:
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        paginator = self.paginator
+        paginator.request = request
+        page_size = paginator.get_page_size(request)
+        paginator.keys = paginator.get_keys(queryset, self)
+
+        totals = dict(
+            queryset.order_by().values_list('status').annotate(total=Count('id'))
+        )
+        cards = queryset.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F('status_id'),
+                order_by=paginator.get_order_by(reverse=False),
+            )
+        ).filter(position__lte=page_size).order_by('status_id', 'position')
+
+        columns = {}
+        for card in cards:
+            columns.setdefault(card.status_id, []).append(card)
+
+        from .lookups import all_rows
+
+        board = []
+        for status_obj in all_rows(PostStatus):
+            column = columns.get(status_obj.id, [])
+            total = totals.get(status_obj.id, 0)
+            next_link = None
+            if total > len(column):
+                paginator.base_url = replace_query_param(
+                    request.build_absolute_uri(), 'status', status_obj.id
+                )
+                paginator.page, paginator.has_next = column, True
+                next_link = paginator.get_next_link()
+            board.append({
+                'id': status_obj.id,
+                'name': status_obj.name,
+                'order': status_obj.order,
+                'count': total,
+                'next': next_link,
+                'results': self.get_serializer(column, many=True).data,
+            })
+        return Response(board)
+
+
+class CampaignViewSet(ConditionalGetMixin, FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Campaign.objects.all()
     serializer_class = CampaignSerializer
 
-class PlatformViewSet(viewsets.ModelViewSet):
+    @action(detail=True)
+    def analytics(self, request, pk=None):
+        """
+        Post counts per status, platform and post type, and scheduled and
+        published posts per week, read from the CampaignStat summary table.
+        """
+        from .analytics import campaign_summary
+
+        summary = campaign_summary(pk)
+        if summary is None:
+            return Response({'error': 'Campaign not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'campaign': int(pk), **summary}, status=status.HTTP_200_OK)
+
+class PlatformViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Platform.objects.all()
     serializer_class = PlatformSerializer
 
-class PostTypeViewSet(viewsets.ModelViewSet):
+class PostTypeViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PostType.objects.all()
     serializer_class = PostTypeSerializer
 
-class PostStatusViewSet(viewsets.ModelViewSet):
+class PostStatusViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PostStatus.objects.all()
     serializer_class = PostStatusSerializer
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(ConditionalGetMixin, FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+    @action(detail=False)
+    def autocomplete(self, request, *args, **kwargs):
+        """Tags whose name starts with ``q``, most used first."""
+        from .tag_index import get_index
+
+        params = TagAutocompleteQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        matches = get_index().search(params.validated_data['q'], params.validated_data['limit'])
+        return Response(
+            [{'id': tag_id, 'name': name, 'usage': usage} for tag_id, name, usage in matches],
+            status=status.HTTP_200_OK,
+        )
+
+class PostViewSet(ConditionalGetMixin, FieldsetViewMixin, viewsets.ModelViewSet):
+    # The serializer reads campaign/platform/status names and the tag ids of
+    # every row, so load them up front instead of once per post.
+    queryset = Post.objects.select_related(
+        'campaign', 'platform', 'status'
+    ).prefetch_related('tags')
     serializer_class = PostSerializer
 
-class PostTagViewSet(viewsets.ModelViewSet):
+    # Names of these and the tag ids are part of each post's payload, but
+    # changing them does not touch Post.updated_at.
+    fingerprint_models = (Campaign, Platform, PostStatus, PostTag)
+
+    @action(detail=False)
+    def search(self, request, *args, **kwargs):
+        """Full-text search over title and body, best matches first, with snippets."""
+        from .fulltext import search_posts
+
+        params = PostSearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        hits = search_posts(
+            params.validated_data['q'],
+            limit=params.validated_data['limit'],
+            offset=params.validated_data['offset'],
+        )
+        posts = self.get_queryset().in_bulk([hit.post_id for hit in hits])
+
+        results = []
+        for hit in hits:
+            if hit.post_id not in posts:
+                continue
+            data = self.get_serializer(posts[hit.post_id]).data
+            data['rank'] = hit.rank
+            data['snippet'] = hit.snippet
+            results.append(data)
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    transition_max_size = 5000
+
+    @action(detail=False, methods=['post'])
+    def transition(self, request, *args, **kwargs):
+        """
+        Move many posts to another status with one UPDATE.
+
+        Posts are picked by ``ids`` or by ``filter``; those already in the
+        target status are left alone. ``published_at`` is written when given,
+        and ``log_action`` adds one AutomationLog per moved post. Returns the
+        ids that changed.
+        """
+        params = PostTransitionSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        target = data['status']
+
+        posts = Post.objects.exclude(status=target)
+        if 'ids' in data:
+            posts = posts.filter(id__in=data['ids'])
+        else:
+            selection = dict(data['filter'])
+            scheduled_before = selection.pop('scheduled_before', None)
+            posts = posts.filter(**{f'{field}_id': value for field, value in selection.items()})
+            if scheduled_before is not None:
+                posts = posts.filter(scheduled_at__lt=scheduled_before)
+
+        changes = {'status': target, 'updated_at': timezone.now()}
+        if 'published_at' in data:
+            changes['published_at'] = data['published_at']
+
+        from .analytics import FIELDS, record_bulk_update
+
+        with transaction.atomic():
+            rows = list(
+                posts.select_for_update().order_by('id').values_list('id', *FIELDS)[:self.transition_max_size + 1]
+            )
+            changed = [row[0] for row in rows]
+            if len(changed) > self.transition_max_size:
+                return Response(
+                    {'error': f"More than {self.transition_max_size} posts match; narrow the selection."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if changed:
+                Post.objects.filter(id__in=changed).update(**changes)
+                record_bulk_update(
+                    [row[1:] for row in rows],
+                    status_id=target.id,
+                    **({'published_at': changes['published_at']} if 'published_at' in changes else {}),
+                )
+                if 'log_action' in data:
+                    AutomationLog.objects.bulk_create(
+                        [
+                            AutomationLog(
+                                post_id=post_id,
+                                action=data['log_action'],
+                                status='success',
+                                message=f"Status changed to {target.name}",
+                            )
+                            for post_id in changed
+                        ],
+                        batch_size=1000,
+                    )
+        return Response({'changed': changed, 'status': target.id}, status=status.HTTP_200_OK)
+
+class PostTagViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PostTag.objects.all()
     serializer_class = PostTagSerializer
 
-class AttachmentViewSet(viewsets.ModelViewSet):
+class AttachmentViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Attachment.objects.all()
     serializer_class = AttachmentSerializer
 
-class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all()
+    @action(detail=True, url_path=r'renditions/(?P<name>[a-z_]+)')
+    def rendition(self, request, name, *args, **kwargs):
+        """
+        Serve a resized copy of an image attachment.
+
+        Renditions are cached on disk by source hash and size. A missing one
+        is generated on a background pool and ``202 Accepted`` is returned
+        with ``Retry-After``. The URL names the attachment, not its content,
+        so cached files are only fresh for ``RENDITION_MAX_AGE`` seconds and
+        then revalidated against an ``ETag`` of the source hash. A source
+        that could not be read or rendered answers ``422`` with the error.
+        """
+        from .renditions import (
+            CONTENT_TYPES, SourceUnavailable, get_renditions, open_rendition, rendition_failure,
+            rendition_path, schedule_rendition, source_blob,
+        )
+
+        attachment = self.get_object()
+        if attachment.type != 'image' or name not in get_renditions():
+            return Response({'error': 'Rendition not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            blob = source_blob(attachment)
+        except SourceUnavailable as e:
+            return self.unrenderable(e)
+        if blob is None:
+            return self.generating()
+        path = rendition_path(blob.sha256, name)
+        if not path.exists():
+            error = rendition_failure(path)
+            if error is not None:
+                return self.unrenderable(error)
+            schedule_rendition(blob, name)
+            return self.generating()
+
+        headers = {
+            'ETag': f'"{path.stem}"',
+            'Cache-Control': f"public, max-age={getattr(settings, 'RENDITION_MAX_AGE', 300)}",
+        }
+        response = get_conditional_response(request, etag=headers['ETag'])
+        if response is None:
+            response = FileResponse(
+                open_rendition(blob.sha256, name), content_type=CONTENT_TYPES[get_renditions()[name][3]]
+            )
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def unrenderable(self, error):
+        return Response(
+            {'error': f'The image could not be rendered: {error}'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+
+    def generating(self):
+        response = Response({'status': 'generating'}, status=status.HTTP_202_ACCEPTED)
+        response['Retry-After'] = '1'
+        return response
+
+class CommentViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializer
 
-class AutomationLogViewSet(viewsets.ModelViewSet):
+class PostCommentListView(generics.ListCreateAPIView):
+    """The comments of one post, oldest first, a cursor page at a time."""
+    serializer_class = PostCommentSerializer
+    ordering = ('created_at', 'id')
+
+    def get_post(self):
+        if not hasattr(self, '_post'):
+            self._post = generics.get_object_or_404(Post.objects.only('id'), pk=self.kwargs['post_id'])
+        return self._post
+
+    def get_queryset(self):
+        # The post is checked separately so an unknown id is a 404, not an empty page.
+        self.get_post()
+        return Comment.objects.filter(post_id=self.kwargs['post_id']).select_related('author')
+
+    def perform_create(self, serializer):
+        serializer.save(post=self.get_post())
+
+class AutomationLogViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = AutomationLog.objects.all()
     serializer_class = AutomationLogSerializer
 
+    batch_max_size = 5000
+
     def get_serializer_class(self):
         if self.action == 'create':
             return AutomationLogCreateSerializer
+        if self.action == 'batch':
+            return AutomationLogBatchSerializer
         return AutomationLogSerializer
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request, *args, **kwargs):
+        """Insert a list of log entries with a single bulk insert."""
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False, max_length=self.batch_max_size
+        )
+        serializer.is_valid(raise_exception=True)
+        entries = serializer.validated_data
+
+        post_ids = {entry['post_id'] for entry in entries if entry.get('post_id') is not None}
+        missing = post_ids - set(Post.objects.filter(id__in=post_ids).values_list('id', flat=True))
+        if missing:
+            raise serializers.ValidationError({'post_id': f"Unknown posts: {sorted(missing)}"})
+
+        logs = AutomationLog.objects.bulk_create(
+            [AutomationLog(**entry) for entry in entries], batch_size=1000
+        )
+        return Response({'created': len(logs)}, status=status.HTTP_201_CREATED)
@@ -6,6 +6,7 @@ import axios from 'axios';
 import { PlusCircle } from 'lucide-react';
 
 import { Button } from '@/components/ui/button';
+import { fetchAllPages } from '@/lib/api';
 import {
   AlertDialog,
   AlertDialogAction,
@@ -31,8 +32,7 @@ const CampaignsPage = () => {
   const fetchCampaigns = async () => {
     setLoading(true);
     try {
-      const response = await axios.get('/api/content/campaigns/');
-      setCampaigns(response.data);
+      setCampaigns(await fetchAllPages<Campaign>('/api/content/campaigns/'));
     } catch (err) {
       setError('Failed to fetch campaigns.');
       console.error(err);
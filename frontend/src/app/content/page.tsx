@@ -4,6 +4,8 @@ import { useState, useEffect } from 'react';
 import Link from 'next/link';
 import axios from 'axios';
 
+import { fetchAllPages } from '@/lib/api';
+
 // Interface for the Post data based on the Django model
 interface Post {
   id: number;
@@ -23,8 +25,7 @@ const ContentPage = () => {
   const fetchPosts = async () => {
     setLoading(true);
     try {
-      const response = await axios.get('/api/content/posts/');
-      setPosts(response.data);
+      setPosts(await fetchAllPages<Post>('/api/content/posts/'));
     } catch (err) {
       setError('Failed to fetch posts. Make sure the backend server is running.');
       console.error(err);
@@ -4,6 +4,8 @@ import { useState, useEffect } from 'react';
 import Link from 'next/link';
 import axios from 'axios';
 
+import { fetchAllPages } from '@/lib/api';
+
 interface Platform {
   id: number;
   name: string;
@@ -17,8 +19,7 @@ const PlatformsPage = () => {
   const fetchPlatforms = async () => {
     setLoading(true);
     try {
-      const response = await axios.get('/api/content/platforms/');
-      setPlatforms(response.data);
+      setPlatforms(await fetchAllPages<Platform>('/api/content/platforms/'));
     } catch (err) {
       setError('Failed to fetch platforms.');
       console.error(err);
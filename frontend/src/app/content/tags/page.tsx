@@ -6,6 +6,7 @@ import axios from "axios"
 import { PlusCircle } from "lucide-react"
 
 import { Button } from "@/components/ui/button"
+import { fetchAllPages } from "@/lib/api"
 import {
   AlertDialog,
   AlertDialogAction,
@@ -30,8 +31,7 @@ const TagsPage = () => {
   const fetchData = async () => {
     setLoading(true)
     try {
-      const response = await axios.get("/api/content/tags/")
-      setData(response.data)
+      setData(await fetchAllPages<Tag>("/api/content/tags/"))
     } catch (err) {
       setError("Failed to fetch tags.")
       console.error(err)
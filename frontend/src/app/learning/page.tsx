@@ -2,7 +2,8 @@
 
 import { useState, useEffect } from 'react';
 import Link from 'next/link';
-import axios from 'axios';
+
+import { fetchAllPages } from '@/lib/api';
 
 interface Topic {
   id: number;
@@ -18,8 +19,7 @@ const LearningPage = () => {
   useEffect(() => {
     const fetchTopics = async () => {
       try {
-        const response = await axios.get('/api/learning/topics/');
-        setTopics(response.data);
+        setTopics(await fetchAllPages<Topic>('/api/learning/topics/'));
       } catch (err) {
         setError('Failed to fetch topics.');
         console.error(err);
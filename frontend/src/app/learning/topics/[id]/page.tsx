@@ -4,6 +4,8 @@ import { useState, useEffect } from 'react';
 import { useParams } from 'next/navigation';
 import axios from 'axios';
 
+import { fetchAllPages } from '@/lib/api';
+
 interface Topic {
   id: number;
   title: string;
@@ -31,12 +33,12 @@ const TopicDetailPage = () => {
       const fetchData = async () => {
         try {
           const topicResponse = axios.get(`/api/learning/topics/${id}/`);
-          const chaptersResponse = axios.get(`/api/learning/chapters/?topic=${id}`);
+          const chaptersResponse = fetchAllPages<Chapter>(`/api/learning/chapters/?topic=${id}`);
 
           const [topicResult, chaptersResult] = await Promise.all([topicResponse, chaptersResponse]);
 
           setTopic(topicResult.data);
-          setChapters(chaptersResult.data);
+          setChapters(chaptersResult);
         } catch (err) {
           setError('Failed to fetch topic details.');
           console.error(err);
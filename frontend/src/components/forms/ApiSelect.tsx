@@ -1,7 +1,8 @@
 "use client";
 
 import { useState, useEffect } from 'react';
-import axios from 'axios';
+
+import { fetchAllPages } from '@/lib/api';
 
 interface SelectOption {
   id: number;
@@ -24,8 +25,7 @@ const ApiSelect = ({ endpoint, value, onChange, label, id }: ApiSelectProps) =>
   useEffect(() => {
     const fetchOptions = async () => {
       try {
-        const response = await axios.get(endpoint);
-        setOptions(response.data);
+        setOptions(await fetchAllPages<SelectOption>(endpoint));
       } catch (err) {
         setError(`Failed to load ${label.toLowerCase()}.`);
         console.error(`Error fetching from ${endpoint}:`, err);
@@ -0,0 +1,33 @@
+import axios from "axios"
+
+interface Page<T> {
+  next: string | null
+  previous: string | null
+  results: T[]
+}
+
+// The largest page the API serves (max_page_size), to keep round trips few.
+const PAGE_SIZE = 1000
+
+// The API builds absolute cursor links for its own host; keep only the path
+// and query so follow-up requests go through the same /api proxy.
+function relative(url: string) {
+  const { pathname, search } = new URL(url, window.location.origin)
+  return pathname + search
+}
+
+/**
+ * Fetches every page of a cursor-paginated list endpoint, following `next`
+ * until it is null, and returns the rows of all pages.
+ */
+export async function fetchAllPages<T>(url: string): Promise<T[]> {
+  const rows: T[] = []
+  const separator = url.includes("?") ? "&" : "?"
+  let next: string | null = `${url}${separator}page_size=${PAGE_SIZE}`
+  while (next) {
+    const response: { data: Page<T> } = await axios.get<Page<T>>(next)
+    rows.push(...response.data.results)
+    next = response.data.next ? relative(response.data.next) : null
+  }
+  return rows
+}
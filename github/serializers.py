@@ -1,20 +1,21 @@
-from rest_framework import serializers
+from campaign_manager.fieldsets import FieldsetModelSerializer
 from .models import Repository, ChangeItem, WorkflowState
 
 
-class RepositorySerializer(serializers.ModelSerializer):
+class RepositorySerializer(FieldsetModelSerializer):
     class Meta:
         model = Repository
         fields = '__all__'
 
 
-class ChangeItemSerializer(serializers.ModelSerializer):
+class ChangeItemSerializer(FieldsetModelSerializer):
     class Meta:
         model = ChangeItem
         fields = '__all__'
+        expandable_fields = {'repository': RepositorySerializer}
 
 
-class WorkflowStateSerializer(serializers.ModelSerializer):
+class WorkflowStateSerializer(FieldsetModelSerializer):
     class Meta:
         model = WorkflowState
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
@@ -1,18 +1,20 @@
 from rest_framework import viewsets
+from campaign_manager.fieldsets import FieldsetViewMixin
 from .models import Repository, ChangeItem, WorkflowState
 from .serializers import RepositorySerializer, ChangeItemSerializer, WorkflowStateSerializer
 
 
-class RepositoryViewSet(viewsets.ModelViewSet):
+class RepositoryViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Repository.objects.all()
     serializer_class = RepositorySerializer
 
 
-class ChangeItemViewSet(viewsets.ModelViewSet):
+class ChangeItemViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = ChangeItem.objects.all()
     serializer_class = ChangeItemSerializer
+    ordering = ('changed_at', 'id')
 
 
-class WorkflowStateViewSet(viewsets.ModelViewSet):
+class WorkflowStateViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = WorkflowState.objects.all()
     serializer_class = WorkflowStateSerializer
\ No newline at end of file
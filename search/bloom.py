@@ -0,0 +1,36 @@
+"""
+A Bloom filter over hex digests, stored as a plain ``bytearray``.
+
+Membership tests can return false positives (at about ``error_rate`` when
+the filter holds ``capacity`` items) but never false negatives. Bit
+positions are derived from the digest itself by double hashing, so adding or
+testing an item costs no further hashing.
+"""
+import math
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001, bits=None, hash_count=None, count=0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.bits = bytearray(bits) if bits is not None else bytearray((size + 7) // 8)
+        self.size = len(self.bits) * 8
+        self.hash_count = hash_count or max(1, round(self.size / capacity * math.log(2)))
+        self.count = count
+
+    def positions(self, digest):
+        first, second = int(digest[:16], 16), int(digest[16:32], 16) | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, digest):
+        for position in self.positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(digest))
+
+    @property
+    def is_full(self):
+        return self.count >= self.capacity
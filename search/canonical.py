@@ -0,0 +1,56 @@
+"""
+URL canonicalization for ``DiscoveredContent``.
+
+Two URLs that differ only in letter case of the scheme or host, a default
+port, a fragment, tracking parameters, query parameter order or a trailing
+slash canonicalize to the same string and so to the same ``url_hash``.
+"""
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Only parameters that never select content. Generic names such as ``ref``
+# stay: GitHub's ``?ref=<branch>`` points at a different page.
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_hsenc', '_hsmi',
+}
+TRACKING_PREFIXES = ('utm_',)
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url):
+    """Return the canonical form of an absolute URL."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f'[{host}]'
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host
+    if parts.username:
+        userinfo = parts.username + (f':{parts.password}' if parts.password else '')
+        netloc = f'{userinfo}@{netloc}'
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(name)
+    ))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def url_hash(canonical_url):
+    """SHA-256 hex digest of an already canonical URL."""
+    return hashlib.sha256(canonical_url.encode('utf-8')).hexdigest()
@@ -0,0 +1,239 @@
+"""
+Concurrent fetch engine behind ``run_crawl``.
+
+A crawl turns the active sources into fetch tasks: API sources are queried
+once per active topic query, other sources fetch their feed (or base) URL
+once. Tasks run on an asyncio loop; the blocking HTTP calls go to a thread
+pool, bounded by a global connection limit and a per-host limit so no site
+sees more than a few connections at a time.
+
+Each fetch becomes a ``FetchLog`` row. Rows are written with ``bulk_create``
+every ``batch_size`` fetches, together with one update of the job's
+``findings_count``, instead of a write per request.
+"""
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .models import ContentSource, CrawlJob, FetchLog, TopicQuery
+
+# How many error lines are kept on the CrawlJob.
+MAX_ERROR_LINES = 50
+
+
+class FetchTask:
+    def __init__(self, source, url, topic_query=None):
+        self.source = source
+        self.url = url
+        self.topic_query = topic_query
+        self.host = (urlsplit(url).hostname or '').lower()
+
+
+def build_tasks(source_types=None):
+    """Return ``(tasks, queries)`` for the active sources and topic queries."""
+    sources = ContentSource.objects.filter(is_active=True).order_by('id')
+    if source_types:
+        sources = sources.filter(source_type__in=source_types)
+    queries = list(
+        TopicQuery.objects.filter(is_active=True, topic__is_active=True)
+        .select_related('topic')
+        .order_by('topic__priority', 'id')
+    )
+    tasks = []
+    for source in sources:
+        if source.source_type == 'API':
+            separator = '&' if '?' in source.base_url else '?'
+            tasks.extend(
+                FetchTask(source, f"{source.base_url}{separator}{urlencode({'q': query.query_text})}", query)
+                for query in queries
+            )
+        else:
+            tasks.append(FetchTask(source, source.feed_url or source.base_url))
+    return tasks, queries
+
+
+def create_job(tasks, queries):
+    return CrawlJob.objects.create(
+        status='RUNNING',
+        started_at=timezone.now(),
+        topics_count=len({query.topic_id for query in queries}),
+        queries_count=len(queries),
+        sources_count=len({task.source.id for task in tasks}),
+    )
+
+
+def build_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = getattr(settings, 'CRAWLER_USER_AGENT', 'LinkPost crawler')
+    return session
+
+
+class FetchHandler:
+    """
+    Processes the responses of one source type; the base class ignores them.
+
+    ``prepare``, ``save`` and ``finish`` run on the calling thread, one at a time, and
+    may use the ORM. ``request_headers`` and ``parse`` run on the fetching
+    threads and must not. ``parse`` only sees successful responses, and reads
+    the body incrementally when ``stream`` is set.
+    """
+    stream = False
+
+    def prepare(self, tasks):
+        """Load whatever the handler needs for these tasks before fetching."""
+
+    def request_headers(self, task):
+        return {}
+
+    def parse(self, task, response):
+        return None
+
+    def save(self, task, response, parsed):
+        """Store ``parsed`` and return the number of items found."""
+        return 0
+
+    def finish(self):
+        """Called once after the last fetch."""
+
+
+class Crawler:
+    """
+    Runs fetch tasks for one ``CrawlJob``.
+
+    ``handlers`` maps a source type to the ``FetchHandler`` for its responses.
+    """
+
+    def __init__(self, job, session=None, max_connections=20, per_host=2, timeout=10,
+                 batch_size=100, handlers=None):
+        self.job = job
+        self.session = session or build_session(per_host)
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.handlers = handlers or {}
+        self.pending = []
+        self.errors = []
+        self.totals = {'fetched': 0, 'failed': 0, 'findings': 0}
+
+    def run(self, tasks):
+        """Fetch every task and finish the job; returns the totals."""
+        async_to_sync(self.crawl)(tasks)
+        return self.totals
+
+    async def crawl(self, tasks):
+        await sync_to_async(self.prepare)(tasks)
+        self.global_limit = asyncio.Semaphore(self.max_connections)
+        self.host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        with ThreadPoolExecutor(self.max_connections) as self.executor:
+            await asyncio.gather(*(self.fetch(task) for task in tasks))
+        await sync_to_async(self.finish)()
+
+    async def fetch(self, task):
+        # The host slot is taken first so tasks queued behind a busy host
+        # do not hold global connections.
+        async with self.host_limits[task.host], self.global_limit:
+            log = FetchLog(
+                crawl_job_id=self.job.id,
+                source_id=task.source.id,
+                topic_id=task.topic_query.topic_id if task.topic_query else None,
+                topic_query=task.topic_query,
+                request_signature=f'GET {task.url}'[:1024],
+                started_at=timezone.now(),
+            )
+            try:
+                response, parsed = await asyncio.get_running_loop().run_in_executor(self.executor, self.get, task)
+            except requests.RequestException as exc:
+                response = None
+                log.status, log.error_detail = 'ERROR', str(exc)
+            except Exception as exc:
+                response = None
+                log.status, log.error_detail = 'ERROR', f'{type(exc).__name__}: {exc}'
+        if response is not None:
+            await sync_to_async(self.handle_response)(task, response, parsed, log)
+        log.finished_at = timezone.now()
+        await self.record(log)
+
+    def prepare(self, tasks):
+        by_type = defaultdict(list)
+        for task in tasks:
+            by_type[task.source.source_type].append(task)
+        for source_type, handler in self.handlers.items():
+            handler.prepare(by_type[source_type])
+
+    def get(self, task):
+        """Fetch a task on a pool thread, returning ``(response, parsed)``."""
+        handler = self.handlers.get(task.source.source_type) or FetchHandler()
+        response = self.session.get(
+            task.url, headers=handler.request_headers(task), timeout=self.timeout, stream=handler.stream,
+        )
+        with response:
+            parsed = handler.parse(task, response) if 200 <= response.status_code < 300 else None
+        return response, parsed
+
+    def handle_response(self, task, response, parsed, log):
+        if response.status_code == 429:
+            log.status, log.error_detail = 'RATE_LIMITED', response.headers.get('Retry-After')
+        elif response.status_code >= 400:
+            log.status, log.error_detail = 'ERROR', f'HTTP {response.status_code}'
+        else:
+            log.status = 'SUCCESS'
+            handler = self.handlers.get(task.source.source_type)
+            if handler is not None and 200 <= response.status_code < 300:
+                try:
+                    log.items_found = handler.save(task, response, parsed)
+                except Exception as exc:
+                    log.status, log.error_detail = 'ERROR', f'{type(exc).__name__}: {exc}'
+
+    async def record(self, log):
+        self.totals['fetched'] += 1
+        self.totals['findings'] += log.items_found
+        if log.status != 'SUCCESS':
+            self.totals['failed'] += 1
+            self.errors.append(f'{log.request_signature}: {log.error_detail or log.status}')
+        self.pending.append(log)
+        if len(self.pending) >= self.batch_size:
+            batch, self.pending = self.pending, []
+            await sync_to_async(self.flush)(batch)
+
+    def flush(self, batch):
+        if not batch:
+            return
+        with transaction.atomic():
+            FetchLog.objects.bulk_create(batch)
+            CrawlJob.objects.filter(pk=self.job.pk).update(
+                findings_count=F('findings_count') + sum(log.items_found for log in batch)
+            )
+
+    def finish(self):
+        self.flush(self.pending)
+        self.pending = []
+        for handler in self.handlers.values():
+            handler.finish()
+        if not self.totals['failed']:
+            status = 'SUCCEEDED'
+        elif self.totals['failed'] == self.totals['fetched']:
+            status = 'FAILED'
+        else:
+            status = 'PARTIAL'
+        errors = self.errors[:MAX_ERROR_LINES]
+        if len(self.errors) > MAX_ERROR_LINES:
+            errors.append(f'... and {len(self.errors) - MAX_ERROR_LINES} more')
+        CrawlJob.objects.filter(pk=self.job.pk).update(
+            status=status,
+            errors='\n'.join(errors) or None,
+            finished_at=timezone.now(),
+        )
+        self.job.refresh_from_db()
@@ -0,0 +1,105 @@
+"""
+Bulk upsert of ``DiscoveredContent`` keyed on ``url_hash``.
+
+URLs are canonicalized and hashed up front, then checked against a Bloom
+filter of every hash already stored, persisted as a ``SeenUrlFilter`` row.
+A hash the filter has never seen is new for certain and goes straight into a
+bulk insert. Hashes the filter reports as seen are confirmed with one
+``url_hash__in`` query, so a false positive never drops new content. Known
+URLs are skipped without touching the unique indexes.
+
+The insert ignores conflicts on ``url_hash``. Rows added without going
+through the filter (the admin, ``seed_data``, a concurrent crawl whose filter
+save lost the race) are left as they are, like the rows the filter catches,
+and are not reported as new.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from .bloom import BloomFilter
+from .canonical import canonicalize_url, url_hash
+from .models import DiscoveredContent, SeenUrlFilter
+
+FILTER_NAME = 'discovered_content'
+
+
+def build_filter(capacity=None):
+    """Return a new filter holding every stored url_hash, with room to grow."""
+    stored = DiscoveredContent.objects.count()
+    capacity = max(capacity or 0, getattr(settings, 'SEEN_URL_FILTER_CAPACITY', 1_000_000), stored * 2)
+    bloom = BloomFilter(capacity, getattr(settings, 'SEEN_URL_FILTER_ERROR_RATE', 0.001))
+    for digest in DiscoveredContent.objects.values_list('url_hash', flat=True).iterator(chunk_size=10000):
+        bloom.add(digest)
+    return bloom
+
+
+def load_filter():
+    """Return the persisted filter, rebuilding it if missing or full."""
+    row = SeenUrlFilter.objects.filter(name=FILTER_NAME).first()
+    if row is None:
+        return build_filter()
+    bloom = BloomFilter(
+        row.capacity, row.error_rate, bits=row.bits, hash_count=row.hash_count, count=row.count,
+    )
+    if bloom.is_full:
+        return build_filter(row.capacity * 2)
+    return bloom
+
+
+def save_filter(bloom):
+    SeenUrlFilter.objects.update_or_create(
+        name=FILTER_NAME,
+        defaults={
+            'capacity': bloom.capacity,
+            'error_rate': bloom.error_rate,
+            'hash_count': bloom.hash_count,
+            'count': bloom.count,
+            'bits': bytes(bloom.bits),
+        },
+    )
+
+
+def upsert_discovered(items, bloom=None, batch_size=500):
+    """
+    Canonicalize and insert unsaved ``DiscoveredContent`` instances, skipping
+    URLs already stored; returns the instances inserted.
+
+    Pass a ``bloom`` from ``load_filter`` to share one filter across calls
+    and ``save_filter`` it when done; without one the filter is loaded and
+    saved around this call.
+    """
+    batch = {}
+    for item in items:
+        item.canonical_url = canonicalize_url(item.canonical_url)[:2048]
+        item.url_hash = url_hash(item.canonical_url)
+        batch.setdefault(item.url_hash, item)
+    if not batch:
+        return []
+
+    owns_filter = bloom is None
+    if owns_filter:
+        bloom = load_filter()
+    maybe_seen = [digest for digest in batch if digest in bloom]
+    seen = set()
+    if maybe_seen:
+        seen = set(DiscoveredContent.objects.filter(url_hash__in=maybe_seen).values_list('url_hash', flat=True))
+    new = [item for digest, item in batch.items() if digest not in seen]
+
+    with transaction.atomic():
+        last_id = DiscoveredContent.objects.aggregate(last=Max('id'))['last'] or 0
+        DiscoveredContent.objects.bulk_create(new, batch_size=batch_size, ignore_conflicts=True)
+        # Ignored rows get no id, so read back the ids past the previous
+        # maximum: only the rows just inserted, whatever the table's size.
+        inserted = dict(DiscoveredContent.objects.filter(id__gt=last_id).values_list('url_hash', 'id'))
+        created = []
+        for item in new:
+            if item.url_hash not in bloom:
+                bloom.add(item.url_hash)
+            if item.url_hash in inserted:
+                item.pk = inserted[item.url_hash]
+                item._state.adding = False
+                created.append(item)
+        if owns_filter:
+            save_filter(bloom)
+    return created
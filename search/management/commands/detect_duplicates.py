@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search.duplicates import mark_duplicates, reset
+
+
+class Command(BaseCommand):
+    """
+    Marks near-duplicate discovered content using MinHash signatures and LSH.
+    Usage: python manage.py detect_duplicates [--threshold 0.8] [--rebuild]
+    """
+    help = 'Signs discovered content that has no signature yet and flags near-duplicates of earlier items.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Items signed and checked per batch.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            help='Estimated Jaccard similarity at which an item counts as a duplicate '
+                 '(DUPLICATE_THRESHOLD, 0.8 by default).',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Drop all signatures and duplicate flags and check the whole corpus again.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if options['rebuild']:
+            reset()
+            self.stdout.write(self.style.WARNING("Signatures and duplicate flags cleared."))
+        checked, duplicates = mark_duplicates(options['batch_size'], options['threshold'])
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} items: {duplicates} near-duplicates."))
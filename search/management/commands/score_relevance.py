@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search.relevance import score_content
+
+
+class Command(BaseCommand):
+    """
+    Scores discovered content against the active topic queries with TF-IDF.
+    Usage: python manage.py score_relevance [--batch-size 2000] [--rescore]
+    """
+    help = 'Computes relevance_score for unscored discovered content, or for all of it after queries change, and re-applies recency decay.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Items scored per matrix operation.',
+        )
+        parser.add_argument(
+            '--rescore',
+            action='store_true',
+            help='Recount term frequencies and rescore every item, e.g. after deleting a query.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        scored = score_content(options['batch_size'], options['rescore'])
+        self.stdout.write(self.style.SUCCESS(f"Scored {scored} items."))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='discoveredcontent',
+            index=models.Index(fields=['-published_at', '-created_at', 'id'], name='search_disc_publish_f95527_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fetchlog',
+            index=models.Index(fields=['-started_at', 'id'], name='search_fetc_started_712cd5_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_discoveredcontent_search_disc_publish_f95527_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentsource',
+            name='etag',
+            field=models.CharField(blank=True, editable=False, help_text='ETag of the last feed response.', max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='contentsource',
+            name='last_modified',
+            field=models.CharField(blank=True, editable=False, help_text='Last-Modified of the last feed response.', max_length=64, null=True),
+        ),
+    ]
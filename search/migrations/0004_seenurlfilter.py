@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0003_contentsource_feed_validators'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeenUrlFilter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('capacity', models.PositiveIntegerField()),
+                ('error_rate', models.FloatField()),
+                ('hash_count', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0, help_text='Hashes added so far.')),
+                ('bits', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0004_seenurlfilter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentSignature',
+            fields=[
+                ('content', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='search.discoveredcontent')),
+                ('minhash', models.BinaryField(help_text='Packed 32-bit MinHash values; empty when the content has no text.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SignatureBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signature_bands', to='search.discoveredcontent')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='search_sign_band_3755a4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0005_contentsignature_signatureband'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelevanceTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100, unique=True)),
+                ('document_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='discoveredcontent',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='When relevance_score was last computed.', null=True),
+        ),
+    ]
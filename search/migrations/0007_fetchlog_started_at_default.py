@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0006_relevance_scoring'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fetchlog',
+            name='started_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
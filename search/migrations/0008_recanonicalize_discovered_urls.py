@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:20
+
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.db import migrations
+
+# A copy of search.canonical as of this migration; later changes to that
+# module must not change what this migration does.
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_hsenc', '_hsmi',
+}
+TRACKING_PREFIXES = ('utm_',)
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f'[{host}]'
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host
+    if parts.username:
+        userinfo = parts.username + (f':{parts.password}' if parts.password else '')
+        netloc = f'{userinfo}@{netloc}'
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not (name.lower() in TRACKING_PARAMS or name.lower().startswith(TRACKING_PREFIXES))
+    ))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def recanonicalize(apps, schema_editor):
+    """
+    Re-canonicalize every stored URL and recompute its hash. Rows that now
+    share a URL are merged into the oldest one: their candidates move to it,
+    as does an enrichment it lacks, and the rest are deleted.
+    """
+    DiscoveredContent = apps.get_model('search', 'DiscoveredContent')
+    ContentEnrichment = apps.get_model('search', 'ContentEnrichment')
+    PostCandidate = apps.get_model('search', 'PostCandidate')
+    SeenUrlFilter = apps.get_model('search', 'SeenUrlFilter')
+
+    keepers, duplicates, changed = {}, {}, []
+    rows = DiscoveredContent.objects.order_by('id').values_list('id', 'canonical_url', 'url_hash')
+    for pk, url, digest in rows.iterator(chunk_size=10000):
+        canonical_url = canonicalize_url(url)
+        new_digest = hashlib.sha256(canonical_url.encode('utf-8')).hexdigest()
+        if new_digest in keepers:
+            duplicates.setdefault(keepers[new_digest], []).append(pk)
+            continue
+        keepers[new_digest] = pk
+        if (canonical_url, new_digest) != (url, digest):
+            changed.append(DiscoveredContent(id=pk, canonical_url=canonical_url, url_hash=new_digest))
+
+    for keeper, others in duplicates.items():
+        PostCandidate.objects.filter(content_id__in=others).update(content_id=keeper)
+        if not ContentEnrichment.objects.filter(content_id=keeper).exists():
+            enrichment = ContentEnrichment.objects.filter(content_id__in=others).order_by('content_id').first()
+            if enrichment is not None:
+                ContentEnrichment.objects.filter(pk=enrichment.pk).update(content_id=keeper)
+        DiscoveredContent.objects.filter(id__in=others).delete()
+
+    # Duplicates are gone first, so no updated URL collides with a stored one.
+    DiscoveredContent.objects.bulk_update(changed, ['canonical_url', 'url_hash'], batch_size=1000)
+    if changed or duplicates:
+        # The Bloom filter holds the old hashes; it is rebuilt on next use.
+        SeenUrlFilter.objects.filter(name='discovered_content').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0007_fetchlog_started_at_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(recanonicalize, migrations.RunPython.noop),
+    ]
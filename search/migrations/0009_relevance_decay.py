@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+def unscore_content(apps, schema_editor):
+    # Scores stored so far have no query_scores to decay; clearing scored_at
+    # makes the next scoring run rescore the whole corpus.
+    DiscoveredContent = apps.get_model('search', 'DiscoveredContent')
+    DiscoveredContent.objects.filter(scored_at__isnull=False).update(scored_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0008_recanonicalize_discovered_urls'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='discoveredcontent',
+            name='decayed_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='When the recency decay of relevance_score was last applied.', null=True),
+        ),
+        migrations.AddField(
+            model_name='discoveredcontent',
+            name='query_scores',
+            field=models.JSONField(blank=True, editable=False, help_text='Weighted similarity to each topic query id, before recency decay.', null=True),
+        ),
+        migrations.RunPython(unscore_content, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
 
+from . import canonical
+
 class Topic(models.Model):
     """Represents a subject area to search for, e.g., 'Python', 'Django'."""
     name = models.CharField(max_length=255, unique=True, help_text="Title of the topic (e.g., 'Python')")
@@ -51,6 +54,8 @@ class ContentSource(models.Model):
     base_url = models.URLField(max_length=500, help_text="Main URL of the source.")
     feed_url = models.URLField(max_length=500, blank=True, null=True, help_text="URL for the RSS/Atom feed, if applicable.")
     reliability_score = models.FloatField(default=0.8, help_text="A score from 0.0 to 1.0 indicating source reliability.")
+    etag = models.CharField(max_length=255, blank=True, null=True, editable=False, help_text="ETag of the last feed response.")
+    last_modified = models.CharField(max_length=64, blank=True, null=True, editable=False, help_text="Last-Modified of the last feed response.")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -80,6 +85,9 @@ class DiscoveredContent(models.Model):
     content_type = models.CharField(max_length=10, choices=CONTENT_TYPES, default='ARTICLE')
 
     relevance_score = models.FloatField(default=0.0, help_text="Score of relevance to the query/topic.")
+    scored_at = models.DateTimeField(blank=True, null=True, db_index=True, editable=False, help_text="When relevance_score was last computed.")
+    query_scores = models.JSONField(blank=True, null=True, editable=False, help_text="Weighted similarity to each topic query id, before recency decay.")
+    decayed_at = models.DateTimeField(blank=True, null=True, db_index=True, editable=False, help_text="When the recency decay of relevance_score was last applied.")
     quality_score = models.FloatField(default=0.0, help_text="Overall quality score based on various metrics.")
     is_duplicate = models.BooleanField(default=False)
 
@@ -87,9 +95,8 @@ class DiscoveredContent(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def save(self, *args, **kwargs):
-        if not self.url_hash:
-            import hashlib
-            self.url_hash = hashlib.sha256(self.canonical_url.encode('utf-8')).hexdigest()
+        self.canonical_url = canonical.canonicalize_url(self.canonical_url)
+        self.url_hash = canonical.url_hash(self.canonical_url)
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -98,6 +105,54 @@ class DiscoveredContent(models.Model):
     class Meta:
         ordering = ['-published_at', '-created_at']
         verbose_name_plural = "Discovered Content"
+        indexes = [
+            models.Index(fields=['-published_at', '-created_at', 'id']),
+        ]
+
+
+class ContentSignature(models.Model):
+    """MinHash signature of a DiscoveredContent's title and excerpt."""
+    content = models.OneToOneField(DiscoveredContent, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField(help_text="Packed 32-bit MinHash values; empty when the content has no text.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Signature for: {self.content_id}"
+
+
+class SignatureBand(models.Model):
+    """One LSH band of a signature; content sharing a bucket in any band are duplicate candidates."""
+    content = models.ForeignKey(DiscoveredContent, on_delete=models.CASCADE, related_name='signature_bands')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket']),
+        ]
+
+
+class RelevanceTerm(models.Model):
+    """Number of scored DiscoveredContent items containing a topic query term."""
+    term = models.CharField(max_length=100, unique=True)
+    document_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.term} ({self.document_count})"
+
+
+class SeenUrlFilter(models.Model):
+    """A persisted Bloom filter of the url_hash values already discovered."""
+    name = models.CharField(max_length=50, unique=True)
+    capacity = models.PositiveIntegerField()
+    error_rate = models.FloatField()
+    hash_count = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0, help_text="Hashes added so far.")
+    bits = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.count}/{self.capacity})"
 
 
 class ContentEnrichment(models.Model):
@@ -193,7 +248,9 @@ class FetchLog(models.Model):
     status = models.CharField(max_length=15, choices=STATUS_CHOICES)
     items_found = models.PositiveIntegerField(default=0)
 
-    started_at = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add, so bulk inserts can record when
+    # each fetch actually started.
+    started_at = models.DateTimeField(default=timezone.now, editable=False)
     finished_at = models.DateTimeField(blank=True, null=True)
     error_detail = models.TextField(blank=True, null=True)
 
@@ -203,6 +260,9 @@ class FetchLog(models.Model):
     class Meta:
         ordering = ['-started_at']
         verbose_name_plural = "Fetch Logs"
+        indexes = [
+            models.Index(fields=['-started_at', 'id']),
+        ]
 
 
 class ModerationLog(models.Model):
@@ -0,0 +1,267 @@
+"""
+TF-IDF relevance scoring of ``DiscoveredContent`` against the active topic
+queries.
+
+Content and queries become sparse TF-IDF vectors (sublinear term frequency)
+over the query vocabulary. A batch of items is scored against every query in
+one sparse matrix product, which yields the cosine similarity of each
+(item, query) pair. Each column is multiplied by its query's ``weight`` and
+the nonzero products are stored in ``query_scores``. ``relevance_score`` then
+applies a recency decay that halves every ``recency_window`` days of the
+item's age: it is the best decayed query score divided by the largest
+weight, which keeps it between 0 and 1.
+
+Document frequencies of the query terms are kept in ``RelevanceTerm``.
+Terms outside the vocabulary only count towards an item's vector length, at
+the weight of the rarest term. A run scores only the items without a
+``scored_at`` and adds them to the document frequencies. When a query or
+topic has changed since the last scoring, the frequencies are recounted and
+the whole corpus is rescored.
+
+Items age without being rescored, so each run also re-applies the decay to
+the stored ``query_scores`` of items whose ``decayed_at`` is more than
+``RELEVANCE_DECAY_INTERVAL`` seconds old. That needs no text processing.
+"""
+import datetime
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from scipy import sparse
+
+from .models import DiscoveredContent, RelevanceTerm, TopicQuery
+
+WORD_RE = re.compile(r'\w\w+')
+STOP_WORDS = frozenset(
+    'a an and are as at be but by for from has have how in into is it its of on or that the this to was '
+    'were what when where which who why will with you your'.split()
+)
+
+
+def tokenize(text):
+    return [word for word in WORD_RE.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def active_queries():
+    """Return ``(ids, query_texts, weights, windows)`` of the active topic queries."""
+    rows = list(
+        TopicQuery.objects.filter(is_active=True, topic__is_active=True)
+        .order_by('id')
+        .values_list('id', 'query_text', 'weight', 'recency_window')
+    )
+    ids = [pk for pk, _, _, _ in rows]
+    texts = [text for _, text, _, _ in rows]
+    weights = np.array([max(weight, 0.0) for _, _, weight, _ in rows])
+    windows = np.array([max(window, 1) for _, _, _, window in rows], dtype=float)
+    return ids, texts, weights, windows
+
+
+def queries_changed():
+    last_scored = DiscoveredContent.objects.aggregate(last=Max('scored_at'))['last']
+    if last_scored is None:
+        return True
+    return TopicQuery.objects.filter(Q(updated_at__gt=last_scored) | Q(topic__updated_at__gt=last_scored)).exists()
+
+
+def term_counts(rows):
+    return [Counter(tokenize(f"{title} {excerpt or ''}")) for title, excerpt in rows]
+
+
+def document_frequencies(docs, column):
+    frequencies = Counter()
+    for doc in docs:
+        frequencies.update(term for term in doc if term in column)
+    return frequencies
+
+
+def tf_matrix(docs, column):
+    """
+    Return the ``docs x vocabulary`` matrix of sublinear term frequencies and,
+    per document, the sum of squared frequencies of terms outside it.
+    """
+    rows, cols, values = [], [], []
+    outside = np.zeros(len(docs))
+    for i, doc in enumerate(docs):
+        for term, count in doc.items():
+            weight = 1.0 + math.log(count)
+            j = column.get(term)
+            if j is None:
+                outside[i] += weight * weight
+            else:
+                rows.append(i)
+                cols.append(j)
+                values.append(weight)
+    matrix = sparse.csr_matrix((values, (rows, cols)), shape=(len(docs), len(column)))
+    return matrix, outside
+
+
+def normalize_rows(matrix, squared_extra=0.0):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel() + squared_extra)
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def score_matrix(docs, query_docs, weights, column, idf, rare_idf):
+    """Return the weighted similarity of every (document, query) pair at once."""
+    weighting = sparse.diags(idf)
+    doc_tf, outside = tf_matrix(docs, column)
+    doc_vectors = normalize_rows(doc_tf @ weighting, outside * rare_idf ** 2)
+    query_tf, _ = tf_matrix(query_docs, column)
+    query_vectors = normalize_rows(query_tf @ weighting)
+    return (doc_vectors @ query_vectors.T).toarray() * weights
+
+
+def decayed_relevance(scores, ages, weights, windows):
+    """Return each document's best query score after recency decay, from 0 to 1."""
+    if weights.max(initial=0.0) <= 0:
+        return np.zeros(len(scores))
+    decay = np.power(0.5, ages[:, np.newaxis] / windows[np.newaxis, :])
+    return (scores * decay).max(axis=1) / weights.max()
+
+
+def ages_in_days(rows, now):
+    """Ages of ``(..., published_at, created_at)`` rows, the dates coming last."""
+    return np.array([
+        max((now - (row[-2] or row[-1])).total_seconds(), 0.0) / 86400 for row in rows
+    ])
+
+
+def rebuild_terms(column, chunk_size=5000):
+    """Recount the document frequencies of the vocabulary over the whole corpus."""
+    frequencies = Counter()
+    batch = []
+    for row in DiscoveredContent.objects.values_list('title', 'excerpt').iterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            frequencies.update(document_frequencies(term_counts(batch), column))
+            batch = []
+    frequencies.update(document_frequencies(term_counts(batch), column))
+    with transaction.atomic():
+        RelevanceTerm.objects.all().delete()
+        RelevanceTerm.objects.bulk_create(
+            [RelevanceTerm(term=term, document_count=frequencies[term]) for term in column],
+            batch_size=1000,
+        )
+
+
+def add_terms(frequencies):
+    existing = {row.term: row for row in RelevanceTerm.objects.filter(term__in=list(frequencies))}
+    for term, row in existing.items():
+        row.document_count += frequencies[term]
+    RelevanceTerm.objects.bulk_update(existing.values(), ['document_count'], batch_size=1000)
+    RelevanceTerm.objects.bulk_create(
+        [RelevanceTerm(term=term, document_count=n) for term, n in frequencies.items() if term not in existing],
+        batch_size=1000,
+    )
+
+
+def score_content(batch_size=2000, rescore=False, now=None):
+    """
+    Score the items that need it in batches, then refresh the decay of the
+    others; returns the number scored. ``rescore`` recounts the term
+    frequencies and rescores everything. Ages are measured up to ``now``,
+    the current time by default.
+    """
+    started = timezone.now()
+    now = now or started
+    ids, texts, weights, windows = active_queries()
+    if not texts:
+        return 0
+    query_docs = [Counter(tokenize(text)) for text in texts]
+    column = {term: j for j, term in enumerate(sorted(set().union(*query_docs)))}
+    if not column:
+        return 0
+
+    full = rescore or queries_changed()
+    if full:
+        rebuild_terms(column)
+        pending = DiscoveredContent.objects.all()
+        corpus_size = pending.count()
+    else:
+        pending = DiscoveredContent.objects.filter(scored_at__isnull=True)
+        corpus_size = DiscoveredContent.objects.filter(scored_at__isnull=False).count()
+
+    scored, last_id = 0, 0
+    while True:
+        rows = list(
+            pending.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'title', 'excerpt', 'published_at', 'created_at')[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        docs = term_counts([(title, excerpt) for _, title, excerpt, _, _ in rows])
+
+        with transaction.atomic():
+            if not full:
+                add_terms(document_frequencies(docs, column))
+                corpus_size += len(rows)
+            counts = dict(RelevanceTerm.objects.filter(term__in=list(column)).values_list('term', 'document_count'))
+            frequencies = np.array([counts.get(term, 0) for term in column], dtype=float)
+            idf = np.log((1 + corpus_size) / (1 + frequencies)) + 1
+            rare_idf = math.log(1 + corpus_size) + 1
+            scores = score_matrix(docs, query_docs, weights, column, idf, rare_idf)
+            relevance = decayed_relevance(scores, ages_in_days(rows, now), weights, windows)
+
+            DiscoveredContent.objects.bulk_update(
+                [
+                    DiscoveredContent(
+                        id=row[0],
+                        query_scores={
+                            str(pk): round(float(score), 6) for pk, score in zip(ids, item_scores) if score > 0
+                        },
+                        relevance_score=round(float(value), 6),
+                        scored_at=started,
+                        decayed_at=now,
+                    )
+                    for row, item_scores, value in zip(rows, scores, relevance)
+                ],
+                ['query_scores', 'relevance_score', 'scored_at', 'decayed_at'],
+                batch_size=500,
+            )
+        scored += len(rows)
+
+    refresh_decay(ids, weights, windows, now, batch_size)
+    return scored
+
+
+def refresh_decay(ids, weights, windows, now, batch_size=2000):
+    """
+    Re-apply the recency decay to the stored ``query_scores`` of items last
+    decayed over ``RELEVANCE_DECAY_INTERVAL`` seconds before ``now``; returns
+    the number updated.
+    """
+    interval = getattr(settings, 'RELEVANCE_DECAY_INTERVAL', 3600)
+    pending = DiscoveredContent.objects.filter(scored_at__isnull=False).filter(
+        Q(decayed_at__isnull=True) | Q(decayed_at__lt=now - datetime.timedelta(seconds=interval))
+    )
+    index = {str(pk): j for j, pk in enumerate(ids)}
+    refreshed, last_id = 0, 0
+    while True:
+        rows = list(
+            pending.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'query_scores', 'published_at', 'created_at')[:batch_size]
+        )
+        if not rows:
+            return refreshed
+        last_id = rows[-1][0]
+        scores = np.zeros((len(rows), len(ids)))
+        for i, (_, query_scores, _, _) in enumerate(rows):
+            for pk, score in (query_scores or {}).items():
+                if pk in index:
+                    scores[i, index[pk]] = score
+        relevance = decayed_relevance(scores, ages_in_days(rows, now), weights, windows)
+        DiscoveredContent.objects.bulk_update(
+            [
+                DiscoveredContent(id=row[0], relevance_score=round(float(value), 6), decayed_at=now)
+                for row, value in zip(rows, relevance)
+            ],
+            ['relevance_score', 'decayed_at'],
+            batch_size=500,
+        )
+        refreshed += len(rows)
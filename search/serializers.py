@@ -1,60 +1,75 @@
-from rest_framework import serializers
+from campaign_manager.fieldsets import FieldsetModelSerializer
 from .models import (
     Topic, TopicQuery, ContentSource, DiscoveredContent, ContentEnrichment,
     PostCandidate, CrawlJob, FetchLog, ModerationLog
 )
 
 
-class TopicSerializer(serializers.ModelSerializer):
+class TopicSerializer(FieldsetModelSerializer):
     class Meta:
         model = Topic
         fields = '__all__'
         ref_name = "SearchTopic"
 
 
-class TopicQuerySerializer(serializers.ModelSerializer):
+class TopicQuerySerializer(FieldsetModelSerializer):
     class Meta:
         model = TopicQuery
         fields = '__all__'
+        expandable_fields = {'topic': TopicSerializer}
 
 
-class ContentSourceSerializer(serializers.ModelSerializer):
+class ContentSourceSerializer(FieldsetModelSerializer):
     class Meta:
         model = ContentSource
         fields = '__all__'
 
 
-class DiscoveredContentSerializer(serializers.ModelSerializer):
+class DiscoveredContentSerializer(FieldsetModelSerializer):
     class Meta:
         model = DiscoveredContent
         fields = '__all__'
+        expandable_fields = {
+            'source': ContentSourceSerializer,
+            'topic': TopicSerializer,
+            'topic_query': TopicQuerySerializer,
+        }
 
 
-class ContentEnrichmentSerializer(serializers.ModelSerializer):
+class ContentEnrichmentSerializer(FieldsetModelSerializer):
     class Meta:
         model = ContentEnrichment
         fields = '__all__'
+        expandable_fields = {'content': DiscoveredContentSerializer}
 
 
-class PostCandidateSerializer(serializers.ModelSerializer):
+class PostCandidateSerializer(FieldsetModelSerializer):
     class Meta:
         model = PostCandidate
         fields = '__all__'
+        expandable_fields = {'content': DiscoveredContentSerializer, 'topics': TopicSerializer}
 
 
-class CrawlJobSerializer(serializers.ModelSerializer):
+class CrawlJobSerializer(FieldsetModelSerializer):
     class Meta:
         model = CrawlJob
         fields = '__all__'
 
 
-class FetchLogSerializer(serializers.ModelSerializer):
+class FetchLogSerializer(FieldsetModelSerializer):
     class Meta:
         model = FetchLog
         fields = '__all__'
+        expandable_fields = {
+            'crawl_job': CrawlJobSerializer,
+            'topic': TopicSerializer,
+            'topic_query': TopicQuerySerializer,
+            'source': ContentSourceSerializer,
+        }
 
 
-class ModerationLogSerializer(serializers.ModelSerializer):
+class ModerationLogSerializer(FieldsetModelSerializer):
     class Meta:
         model = ModerationLog
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        expandable_fields = {'post_candidate': PostCandidateSerializer}
@@ -1,3 +1,486 @@
+import datetime
+import importlib
+import io
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .crawler import Crawler, FetchHandler, build_tasks, create_job
+from .canonical import canonicalize_url, url_hash
+from .discovery import load_filter, save_filter, upsert_discovered
+from .duplicates import band_buckets, mark_duplicates, signature_of, similarity
+from .relevance import score_content
+from .feeds import iter_entries
+from .models import (
+    ContentEnrichment, ContentSignature, ContentSource, CrawlJob, DiscoveredContent, FetchLog, PostCandidate,
+    RelevanceTerm, SeenUrlFilter, SignatureBand, Topic, TopicQuery,
+)
+
+
+class DiscoveredContentPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        now = timezone.now()
+        # Several rows share a publication date and some have none, so the
+        # cursor has to fall through to created_at and id to break ties.
+        for i in range(12):
+            published_at = None if i % 4 == 0 else now - datetime.timedelta(days=i // 3)
+            DiscoveredContent.objects.create(
+                canonical_url=f'https://example.com/{i}',
+                title=f'Item {i}',
+                published_at=published_at,
+            )
+
+    def expected_ids(self):
+        return list(DiscoveredContent.objects.order_by(
+            *DiscoveredContent._meta.ordering, 'id'
+        ).values_list('id', flat=True))
+
+    def walk(self, url):
+        ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids, pages
+
+    def test_forward_pages_follow_natural_ordering(self):
+        ids, pages = self.walk(reverse('discoveredcontent-list') + '?page_size=5')
+        self.assertEqual(ids, self.expected_ids())
+        self.assertEqual([len(page['results']) for page in pages], [5, 5, 2])
+        self.assertNotIn('count', pages[0])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_link_returns_prior_page(self):
+        _, pages = self.walk(reverse('discoveredcontent-list') + '?page_size=5')
+        response = self.client.get(pages[2]['previous'])
+        self.assertEqual(
+            [row['id'] for row in response.data['results']],
+            [row['id'] for row in pages[1]['results']],
+        )
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse('discoveredcontent-list') + '?cursor=bogus')
+        self.assertEqual(response.status_code, 404)
+
+
+class DiscoveredContentFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        source = ContentSource.objects.create(name='Django News', source_type='RSS', base_url='https://example.com')
+        for i in range(3):
+            DiscoveredContent.objects.create(
+                canonical_url=f'https://example.com/{i}',
+                title=f'Item {i}',
+                source=source,
+                raw_payload={'html': 'x' * 1000},
+            )
+
+    def test_list_skips_unrequested_payloads(self):
+        url = reverse('discoveredcontent-list') + '?fields=id,title,source&expand=source'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('raw_payload', queries[0]['sql'])
+        row = response.data['results'][0]
+        self.assertEqual(set(row), {'id', 'title', 'source'})
+        self.assertEqual(row['source']['name'], 'Django News')
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Answers by path: ``/slow`` after a pause, ``/limited`` with 429,
+    ``/missing`` with 404 and paths in ``feeds`` with that body, honouring
+    ``If-None-Match``.
+    """
+    active = Counter()
+    peaks = Counter()
+    feeds = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        host = self.headers['Host']
+        with self.lock:
+            self.active[host] += 1
+            self.peaks[host] = max(self.peaks[host], self.active[host])
+        try:
+            if self.path.startswith('/slow'):
+                time.sleep(0.05)
+            status = {'/limited': 429, '/missing': 404}.get(self.path, 200)
+            body, headers = b'<html>ok</html>', {}
+            if self.path in self.feeds:
+                body, etag = self.feeds[self.path]
+                headers = {'ETag': etag, 'Content-Type': 'application/rss+xml'}
+                if self.headers.get('If-None-Match') == etag:
+                    status, body = 304, b''
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServerMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        cls.port = cls.server.server_address[1]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StandInHandler.active.clear()
+        StandInHandler.peaks.clear()
+        StandInHandler.feeds.clear()
+
+    def source(self, path, source_type='WEB', host='127.0.0.1'):
+        return ContentSource.objects.create(
+            name=path, source_type=source_type, base_url=f'http://{host}:{self.port}{path}',
+        )
+
+
+class CountingHandler(FetchHandler):
+    def save(self, task, response, parsed):
+        return 1
+
+
+class CrawlerTests(StandInServerMixin, TestCase):
+    def test_fetches_are_capped_per_host_and_logged_in_batches(self):
+        for i in range(6):
+            self.source(f'/slow/{i}')
+            self.source(f'/slow/{i}', host='localhost')
+        tasks, queries = build_tasks()
+        job = create_job(tasks, queries)
+
+        crawler = Crawler(job, max_connections=3, per_host=2, batch_size=5, handlers={'WEB': CountingHandler()})
+        with CaptureQueriesContext(connection) as captured:
+            totals = crawler.run(tasks)
+
+        self.assertEqual(totals, {'fetched': 12, 'failed': 0, 'findings': 12})
+        self.assertEqual(StandInHandler.peaks[f'127.0.0.1:{self.port}'], 2)
+        self.assertLessEqual(StandInHandler.peaks[f'localhost:{self.port}'], 2)
+        inserts = [q for q in captured if q['sql'].startswith('INSERT INTO "search_fetchlog"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(FetchLog.objects.filter(crawl_job=job, status='SUCCESS').count(), 12)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.findings_count, job.sources_count), ('SUCCEEDED', 12, 12))
+
+    def test_run_crawl_records_failures_and_queries(self):
+        topic = Topic.objects.create(name='Python')
+        TopicQuery.objects.create(topic=topic, query_text='asyncio')
+        TopicQuery.objects.create(topic=topic, query_text='django')
+        TopicQuery.objects.create(topic=topic, query_text='retired', is_active=False)
+        self.source('/api', source_type='API')
+        self.source('/limited')
+        self.source('/missing')
+        ContentSource.objects.create(
+            name='Closed', source_type='WEB', base_url=f'http://127.0.0.1:{self.port}/', is_active=False,
+        )
+
+        call_command('run_crawl', '--batch-size', '2', stdout=io.StringIO())
+
+        job = CrawlJob.objects.get()
+        self.assertEqual(job.status, 'PARTIAL')
+        self.assertEqual((job.topics_count, job.queries_count, job.sources_count), (1, 2, 3))
+        self.assertIsNotNone(job.finished_at)
+        logs = FetchLog.objects.filter(crawl_job=job)
+        self.assertEqual(
+            Counter(logs.values_list('status', flat=True)), Counter({'SUCCESS': 2, 'RATE_LIMITED': 1, 'ERROR': 1}),
+        )
+        self.assertEqual(
+            set(logs.filter(topic_query__isnull=False).values_list('request_signature', flat=True)),
+            {f'GET http://127.0.0.1:{self.port}/api?q=asyncio', f'GET http://127.0.0.1:{self.port}/api?q=django'},
+        )
+        self.assertIn('HTTP 404', job.errors)
+
+
+RSS_ITEM = """<item><title>Post {n}</title><link>https://blog.example.com/{n}</link>
+<description>&lt;p&gt;Body {n}&lt;/p&gt;</description><pubDate>{date}</pubDate></item>"""
+
+
+def rss(*numbers):
+    items = ''.join(
+        RSS_ITEM.format(n=n, date=f'Mon, {n:02d} Jun 2026 12:00:00 GMT') for n in sorted(numbers, reverse=True)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Blog</title>{items}</channel></rss>'.encode()
+
+
+class FeedIngestionTests(StandInServerMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.feed = self.source('/feed.xml', source_type='RSS')
+
+    def crawl(self):
+        call_command('run_crawl', '--source-type', 'RSS', stdout=io.StringIO())
+        return CrawlJob.objects.order_by('-id').first()
+
+    def test_unchanged_feed_costs_a_304(self):
+        StandInHandler.feeds['/feed.xml'] = (rss(1, 2, 3), '"v1"')
+        job = self.crawl()
+        self.assertEqual(job.findings_count, 3)
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.etag, '"v1"')
+        item = DiscoveredContent.objects.get(canonical_url='https://blog.example.com/3')
+        self.assertEqual((item.title, item.excerpt, item.source_id), ('Post 3', 'Body 3', self.feed.id))
+        self.assertEqual(item.published_at, datetime.datetime(2026, 6, 3, 12, tzinfo=datetime.timezone.utc))
+
+        job = self.crawl()
+        self.assertEqual(job.findings_count, 0)
+        self.assertEqual(DiscoveredContent.objects.count(), 3)
+
+    def test_parsing_stops_at_entries_already_seen(self):
+        StandInHandler.feeds['/feed.xml'] = (rss(1, 2, 3), '"v1"')
+        self.crawl()
+        StandInHandler.feeds['/feed.xml'] = (rss(1, 2, 3, 4, 5), '"v2"')
+        job = self.crawl()
+        # 3 is the newest stored item: it is re-read and skipped as known.
+        # 1 and 2 are never parsed.
+        self.assertEqual(job.findings_count, 2)
+        self.assertEqual(DiscoveredContent.objects.count(), 5)
+
+    def test_atom_entries_are_streamed(self):
+        atom = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">
+        <entry><title>New</title><link rel="alternate" href="https://a.example.com/new"/>
+        <id>urn:new</id><updated>2026-06-02T10:00:00Z</updated><summary>Fresh</summary></entry>
+        <entry><title>Old</title><link href="https://a.example.com/old"/><updated>2026-05-01T10:00:00Z</updated></entry>
+        </feed>"""
+        entries = list(iter_entries(io.BytesIO(atom), datetime.datetime(2026, 6, 1, tzinfo=datetime.timezone.utc)))
+        self.assertEqual(
+            [(entry['link'], entry['guid'], entry['summary']) for entry in entries],
+            [('https://a.example.com/new', 'urn:new', 'Fresh')],
+        )
+
+    def links(self, items):
+        document = f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'.encode()
+        return [entry['link'] for entry in iter_entries(io.BytesIO(document), base_url='https://blog.example.com/feed/')]
+
+    def test_relative_links_are_resolved_against_the_feed(self):
+        self.assertEqual(
+            self.links('<item><title>A</title><link>/posts/a</link></item>'),
+            ['https://blog.example.com/posts/a'],
+        )
+
+    def test_guids_that_are_not_permalinks_are_not_links(self):
+        self.assertEqual(self.links('<item><title>A</title><guid isPermaLink="false">1</guid></item>'), [])
+        self.assertEqual(
+            self.links('<item><guid isPermaLink="false">https://blog.example.com/?p=1</guid></item>'), [],
+        )
+
+    def test_permalink_guids_must_be_absolute(self):
+        self.assertEqual(self.links('<item><title>A</title><guid>post-123</guid></item>'), [])
+        self.assertEqual(
+            self.links('<item><title>A</title><guid>https://blog.example.com/a</guid></item>'),
+            ['https://blog.example.com/a'],
+        )
+
+    def test_entries_without_an_absolute_url_are_skipped(self):
+        self.assertEqual(self.links('<item><title>A</title><link>mailto:someone@example.com</link></item>'), [])
+        self.assertEqual(self.links('<item><title>A</title></item>'), [])
+
+
+class DiscoveredContentUpsertTests(TestCase):
+    def test_urls_are_canonicalized(self):
+        self.assertEqual(
+            canonicalize_url(' HTTPS://Blog.Example.COM:443/a/post/?utm_source=x&b=2&a=1&fbclid=y#top'),
+            'https://blog.example.com/a/post?a=1&b=2',
+        )
+        self.assertEqual(canonicalize_url('http://example.com'), 'http://example.com/')
+        self.assertEqual(canonicalize_url('http://example.com:8080/x/'), 'http://example.com:8080/x')
+        item = DiscoveredContent.objects.create(canonical_url='https://Example.com/x/?utm_medium=rss', title='x')
+        self.assertEqual(item.canonical_url, 'https://example.com/x')
+
+    def test_only_tracking_params_are_stripped(self):
+        self.assertEqual(
+            canonicalize_url('https://github.com/org/repo/blob/main/README.md?ref=dev&spm=a1'),
+            'https://github.com/org/repo/blob/main/README.md?ref=dev&spm=a1',
+        )
+
+    def test_migration_recanonicalizes_and_merges_stored_urls(self):
+        migration = importlib.import_module('search.migrations.0008_recanonicalize_discovered_urls')
+        # bulk_create skips save(), leaving the URLs as they were stored before.
+        first, second, third = DiscoveredContent.objects.bulk_create([
+            DiscoveredContent(canonical_url='https://Example.com/a/?utm_source=x', url_hash='1' * 64, title='A'),
+            DiscoveredContent(canonical_url='https://example.com/a', url_hash='2' * 64, title='A again'),
+            DiscoveredContent(canonical_url='https://example.com/b?ref=dev', url_hash='3' * 64, title='B'),
+        ])
+        PostCandidate.objects.create(content=second, platform='X', body_text='text')
+        ContentEnrichment.objects.create(content=second, summary='s', simple_explanation='e', key_points=[])
+        save_filter(load_filter())
+
+        migration.recanonicalize(apps, None)
+
+        self.assertEqual(
+            list(DiscoveredContent.objects.order_by('id').values_list('id', 'canonical_url', 'url_hash')),
+            [
+                (first.id, 'https://example.com/a', url_hash('https://example.com/a')),
+                (third.id, 'https://example.com/b?ref=dev', url_hash('https://example.com/b?ref=dev')),
+            ],
+        )
+        self.assertEqual(PostCandidate.objects.get().content_id, first.id)
+        self.assertEqual(ContentEnrichment.objects.get().content_id, first.id)
+        self.assertFalse(SeenUrlFilter.objects.exists())
+
+    def test_known_urls_are_skipped_and_new_ones_inserted_in_bulk(self):
+        upsert_discovered([
+            DiscoveredContent(canonical_url='https://example.com/a', title='A'),
+            DiscoveredContent(canonical_url='https://example.com/b/?utm_source=feed', title='B'),
+        ])
+        self.assertEqual(SeenUrlFilter.objects.get().count, 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            created = upsert_discovered([
+                DiscoveredContent(canonical_url='https://EXAMPLE.com/b', title='B again'),
+                DiscoveredContent(canonical_url='https://example.com/c', title='C'),
+                DiscoveredContent(canonical_url='https://example.com/c#comments', title='C twice'),
+            ])
+        self.assertEqual([item.canonical_url for item in created], ['https://example.com/c'])
+        lookups = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and '"url_hash" IN' in q['sql']]
+        # Only the URL the filter has seen is looked up by hash.
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(DiscoveredContent.objects.get(canonical_url='https://example.com/b').title, 'B')
+        self.assertEqual(DiscoveredContent.objects.count(), 3)
+
+    def test_rows_missing_from_the_filter_are_left_alone(self):
+        save_filter(load_filter())
+        DiscoveredContent.objects.create(canonical_url='https://example.com/a', title='Old')
+        created = upsert_discovered([
+            DiscoveredContent(canonical_url='https://example.com/a', title='New'),
+            DiscoveredContent(canonical_url='https://example.com/b', title='B'),
+        ])
+        self.assertEqual([item.canonical_url for item in created], ['https://example.com/b'])
+        self.assertEqual(created[0].pk, DiscoveredContent.objects.get(canonical_url='https://example.com/b').pk)
+        self.assertEqual(DiscoveredContent.objects.get(canonical_url='https://example.com/a').title, 'Old')
+        self.assertIn(url_hash('https://example.com/a'), load_filter())
+
+
+STORY = (
+    'Django 6.0 released with background tasks and template partials',
+    'The Django team announced version 6.0 today, adding a built-in background task framework, '
+    'template partials, a content security policy middleware and many smaller improvements.',
+)
+
+
+class NearDuplicateTests(TestCase):
+    def content(self, url, title, excerpt):
+        return DiscoveredContent.objects.create(canonical_url=url, title=title, excerpt=excerpt)
+
+    def test_similar_texts_share_signatures_and_buckets(self):
+        original = signature_of(*STORY)
+        syndicated = signature_of(STORY[0] + ' | Python Weekly', STORY[1])
+        unrelated = signature_of('Rust 2.0 roadmap', 'The Rust project outlined its plans for the next edition.')
+        self.assertGreater(similarity(original, syndicated), 0.8)
+        self.assertLess(similarity(original, unrelated), 0.2)
+        self.assertTrue(set(band_buckets(original)) & set(band_buckets(syndicated)))
+        self.assertEqual(signature_of('', None), ())
+
+    def test_later_copies_are_marked_incrementally(self):
+        first = self.content('https://a.example.com/django-6', *STORY)
+        other = self.content('https://a.example.com/rust', 'Rust 2.0 roadmap', 'Plans for the next edition.')
+        self.assertEqual(mark_duplicates(), (2, 0))
+        self.assertEqual(ContentSignature.objects.count(), 2)
+        self.assertEqual(SignatureBand.objects.filter(content=first).count(), 16)
+
+        copy = self.content('https://b.example.com/news/django', STORY[0] + ' | Python Weekly', STORY[1])
+        same_batch = self.content('https://c.example.com/django', STORY[0], STORY[1] + ' Read more.')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(mark_duplicates(), (2, 2))
+        # Only buckets and signatures of candidates are read, not the corpus.
+        self.assertLessEqual(len([q for q in queries if q['sql'].startswith('SELECT')]), 4)
+        self.assertEqual(
+            set(DiscoveredContent.objects.filter(is_duplicate=True).values_list('id', flat=True)),
+            {copy.id, same_batch.id},
+        )
+        other.refresh_from_db()
+        first.refresh_from_db()
+        self.assertFalse(first.is_duplicate or other.is_duplicate)
+        self.assertEqual(mark_duplicates(), (0, 0))
+
+
+class RelevanceScoringTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        topic = Topic.objects.create(name='Django')
+        self.query = TopicQuery.objects.create(topic=topic, query_text='Django ORM performance', recency_window=30)
+        TopicQuery.objects.create(topic=topic, query_text='asyncio tutorial', weight=0.5, recency_window=30)
+
+    def content(self, slug, title, excerpt='', days_old=0):
+        return DiscoveredContent.objects.create(
+            canonical_url=f'https://example.com/{slug}', title=title, excerpt=excerpt,
+            published_at=self.now - datetime.timedelta(days=days_old),
+        )
+
+    def scores(self):
+        return dict(DiscoveredContent.objects.values_list('canonical_url', 'relevance_score'))
+
+    def test_scores_are_weighted_and_decayed(self):
+        self.content('fresh', 'Django ORM performance tips', 'Faster queries with the ORM.')
+        self.content('old', 'Django ORM performance tips', 'Faster queries with the ORM.', days_old=30)
+        self.content('async', 'asyncio tutorial', 'An asyncio tutorial for beginners.')
+        self.content('rust', 'Rust borrow checker', 'Lifetimes explained.')
+
+        self.assertEqual(score_content(batch_size=3, now=self.now), 4)
+        scores = self.scores()
+        fresh, old = scores['https://example.com/fresh'], scores['https://example.com/old']
+        self.assertGreater(fresh, 0.5)
+        self.assertLessEqual(fresh, 1.0)
+        # One recency window halves the score.
+        self.assertAlmostEqual(old, fresh / 2, places=4)
+        self.assertLess(scores['https://example.com/async'], 0.5 + 1e-6)
+        self.assertGreater(scores['https://example.com/async'], 0)
+        self.assertEqual(scores['https://example.com/rust'], 0)
+
+    def test_decay_advances_on_later_runs(self):
+        self.content('a', 'Django ORM performance tips', 'Faster queries with the ORM.')
+        score_content(now=self.now)
+        fresh = self.scores()['https://example.com/a']
+
+        # Within the refresh interval the stored score is left alone.
+        self.assertEqual(score_content(now=self.now + datetime.timedelta(minutes=5)), 0)
+        self.assertEqual(self.scores()['https://example.com/a'], fresh)
+
+        self.assertEqual(score_content(now=self.now + datetime.timedelta(days=30)), 0)
+        self.assertAlmostEqual(self.scores()['https://example.com/a'], fresh / 2, places=4)
+
+    def test_only_new_items_are_scored_until_queries_change(self):
+        self.content('a', 'Django ORM performance', 'Indexes and select_related.')
+        score_content(now=self.now)
+        self.assertEqual(RelevanceTerm.objects.get(term='django').document_count, 1)
+
+        self.assertEqual(score_content(now=self.now), 0)
+        self.content('b', 'Django ORM tricks', 'Annotations.')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(score_content(now=self.now), 1)
+        self.assertLessEqual(len(queries), 13)
+        self.assertEqual(RelevanceTerm.objects.get(term='django').document_count, 2)
 
-# Create your tests here.
+        self.query.query_text = 'Django migrations'
+        self.query.save()
+        self.assertEqual(score_content(), 2)
+        self.assertEqual(RelevanceTerm.objects.get(term='migrations').document_count, 0)
+        self.assertFalse(RelevanceTerm.objects.filter(term='orm').exists())
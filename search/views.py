@@ -1,4 +1,5 @@
 from rest_framework import viewsets
+from campaign_manager.fieldsets import FieldsetViewMixin
 from .models import (
     Topic, TopicQuery, ContentSource, DiscoveredContent, ContentEnrichment,
     PostCandidate, CrawlJob, FetchLog, ModerationLog
@@ -10,46 +11,46 @@ from .serializers import (
 )
 
 
-class TopicViewSet(viewsets.ModelViewSet):
+class TopicViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Topic.objects.all()
     serializer_class = TopicSerializer
 
 
-class TopicQueryViewSet(viewsets.ModelViewSet):
+class TopicQueryViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = TopicQuery.objects.all()
     serializer_class = TopicQuerySerializer
 
 
-class ContentSourceViewSet(viewsets.ModelViewSet):
+class ContentSourceViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = ContentSource.objects.all()
     serializer_class = ContentSourceSerializer
 
 
-class DiscoveredContentViewSet(viewsets.ModelViewSet):
+class DiscoveredContentViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = DiscoveredContent.objects.all()
     serializer_class = DiscoveredContentSerializer
 
 
-class ContentEnrichmentViewSet(viewsets.ModelViewSet):
+class ContentEnrichmentViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = ContentEnrichment.objects.all()
     serializer_class = ContentEnrichmentSerializer
 
 
-class PostCandidateViewSet(viewsets.ModelViewSet):
+class PostCandidateViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PostCandidate.objects.all()
     serializer_class = PostCandidateSerializer
 
 
-class CrawlJobViewSet(viewsets.ModelViewSet):
+class CrawlJobViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = CrawlJob.objects.all()
     serializer_class = CrawlJobSerializer
 
 
-class FetchLogViewSet(viewsets.ModelViewSet):
+class FetchLogViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = FetchLog.objects.all()
     serializer_class = FetchLogSerializer
 
 
-class ModerationLogViewSet(viewsets.ModelViewSet):
+class ModerationLogViewSet(FieldsetViewMixin, viewsets.ModelViewSet):
     queryset = ModerationLog.objects.all()
     serializer_class = ModerationLogSerializer
\ No newline at end of file